@@ -1,3 +1,6 @@
+# Imported first so the startup breakdown includes the imports below
+from startup import startup_timer, warm_up, WarmUpTask
+import logging
 import math
 import numpy as np
 from PyQt5 import QtCore, QtGui, QtWidgets
@@ -8,40 +11,48 @@ from PyQt5.QtCore import Qt, QRectF, QPointF
 from PyQt5.QtGui import QPen, QColor
 from PyQt5.QtWidgets import QGraphicsRectItem
 import fitz  # PyMuPDF
-import cv2
 import os
 import sys
-from utils import resource_path  # Add import for resource_path
+from app_logging import setup_logging, Lazy
 
-# Set up model path before importing YOLO
-model_path = os.path.abspath(resource_path('best.pt'))
+# Start logging before the other modules are imported, so their import-time messages are kept
+setup_logging()
+logger = logging.getLogger('SmartMetrology_Design_new')
+
+# Model path for the detector, which is loaded lazily by model_loader
+from model_loader import yolo_models
+model_path = yolo_models.model_path
 model_dir = os.path.dirname(model_path)
 os.environ['YOLO_MODEL_PATH'] = model_path
 os.environ['YOLO_MODEL_DIR'] = model_dir
 
-from ultralytics import YOLO
 from ui_smart_metrology import Ui_MainWindow
 from dialogs import DimensionDialog, PDFPreviewDialog, PartNumberDialog, LoginDialog, OperationsDialog, MeasurementInstrumentDialog, ReportFolderDialog , DeviceDetailsDialog
 from events import EventHandler, ViewEvents, TableEvents, VisualizationEvents
 from graphics import CustomGraphicsView
-from algorithms import DimensionParser, ImageProcessor, BoundingBoxUtils, ClusterDetector,ZoneDetector
+from algorithms import DimensionParser, ImageProcessor, BoundingBoxUtils, ClusterDetector, ZoneDetector, PageProcessor
+from save_worker import SavePipelineThread, SaveStage
+from offline_queue import OfflineQueueFlusher, submission_queue
+from prefetcher import OperationPrefetcher, prefetch_store
 import requests
 from PyQt5.QtWidgets import QGraphicsPolygonItem, QGraphicsPathItem, QGraphicsTextItem, QGraphicsEllipseItem
-from api_endpoints import APIEndpoints, api
+from api_endpoints import APIEndpoints, api, inventory, api_config_error
+from instrument_resolver import extract_instrument_code
 import json
-import asyncio
-from bleak import BleakClient
 import tempfile
 import uuid
-from PyQt5 import QtPrintSupport
 from collections import namedtuple
 import sys
 import time
-import nest_asyncio
 from PyQt5.QtCore import QThread, pyqtSignal
+from ble_service import ble_service, SessionState
+from gauge_connections import gauge_connections
+from measurement_ingest import MeasurementIngestor, parse_reading, VALID_COLOR, INVALID_COLOR
+from measurement_store import MeasurementStore
+from perf_metrics import perf
+from profiling import profiler
 
-# Apply nest_asyncio to allow running asyncio in a non-async context
-nest_asyncio.apply()
+startup_timer.mark('imports')
 
 class PDFProcessStatus:
     PREPARING = "Preparing document..."
@@ -135,33 +146,7 @@ class MainWindow(QMainWindow):
         self.pdf_results = None
         self.bbox_data = {'ocr': [], 'yolo': []}  # Dictionary to store bbox data
 
-        # Initialize YOLO model
-        try:
-            # Use the environment variable we set earlier
-            model_path = os.environ['YOLO_MODEL_PATH']
-            print(f"Attempting to load YOLO model from: {model_path}")
-            print(f"File exists: {os.path.exists(model_path)}")
-            print(f"Current working directory: {os.getcwd()}")
-            print(f"Model directory: {os.environ['YOLO_MODEL_DIR']}")
-            
-            # List directory contents for debugging
-            print("Directory contents:")
-            model_dir = os.environ['YOLO_MODEL_DIR']
-            for root, dirs, files in os.walk(model_dir):
-                for file in files:
-                    if file.endswith('.pt'):
-                        print(f"Found model file: {os.path.join(root, file)}")
-            
-            # Initialize YOLO with absolute path
-            self.yolo_model = YOLO(model_path)
-            print("Successfully loaded YOLO model")
-            
-        except Exception as e:
-            print(f"Error loading YOLO model: {str(e)}")
-            print(f"Error type: {type(e)}")
-            import traceback
-            traceback.print_exc()
-            self.yolo_model = None
+        # The YOLO model is loaded on first use (see the yolo_model property), or warmed up after login
 
         # Set the main window reference
         self.ui.pdf_view.main_window = self
@@ -231,6 +216,41 @@ class MainWindow(QMainWindow):
         # Initialize attributes
         self.current_order_details = {}
 
+        # Background save pipeline and its progress dialog
+        self.save_thread = None
+        self.save_progress = None
+
+        # Flusher for rows that could not be sent straight away
+        self.queue_flusher = None
+
+        # Background fetch of the next operation, and the hash of the open drawing
+        self.prefetcher = None
+        self.current_drawing_hash = None
+
+        # Gauge readings arrive in batches from the shared BLE service thread
+        # Address -> progress dialog of a connect still in progress; gauges connect side by side
+        self.bluetooth_progress = {}
+        ble_service.connection_status.connect(self.on_bluetooth_connection_status)
+        ble_service.readings_received.connect(self.on_bluetooth_readings)
+        ble_service.session_state_changed.connect(self.on_bluetooth_session_state)
+
+        # Background fetches and model loading started at login
+        warm_up.task_finished.connect(self.on_warm_up_task_finished)
+        self.measurement_store = MeasurementStore()
+        self.measurement_ingestor = MeasurementIngestor(
+            self.ui.dimtable, self.set_row_color, self.measurement_store, self.current_quantity_index
+        )
+
+        # Hidden timing readout in the status bar (Ctrl+Shift+T); histograms go to perf_metrics.jsonl
+        self.perf_label = QLabel()
+        self.perf_label.setVisible(False)
+        self.ui.statusbar.addPermanentWidget(self.perf_label)
+        self.perf_timer = QtCore.QTimer(self)
+        self.perf_timer.setInterval(1000)
+        self.perf_timer.timeout.connect(self.update_perf_readout)
+        QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+Shift+T"), self, self.toggle_perf_readout)
+        perf.start_export()
+
         # Add these attributes to store the current image
         self.current_image = None
         self.vertical_lines = None
@@ -361,7 +381,7 @@ class MainWindow(QMainWindow):
                     label.setText("-")
 
         except Exception as e:
-            print(f"Error updating order details: {str(e)}")
+            logger.error("Error updating order details: %s", e)
             # Clear labels on error
             for label in self.header_labels.values():
                 label.setText("-")
@@ -407,47 +427,39 @@ class MainWindow(QMainWindow):
         """
         return ImageProcessor.find_innermost_boundary(image)
 
+    def toggle_perf_readout(self):
+        """Show or hide the latest span timings in the status bar"""
+        visible = not self.perf_label.isVisible()
+        self.perf_label.setVisible(visible)
+        if visible:
+            self.update_perf_readout()
+            self.perf_timer.start()
+        else:
+            self.perf_timer.stop()
+
+    def update_perf_readout(self):
+        self.perf_label.setText(perf.summary() or "No timings yet")
+        self.perf_label.setToolTip("\n".join(
+            f"{name}: n={stats['count']}  p50 {stats['p50_ms']:.0f} ms  p95 {stats['p95_ms']:.0f} ms  max {stats['max_ms']:.0f} ms"
+            for name, stats in perf.snapshot().items()
+        ))
+
+    @property
+    def yolo_model(self):
+        """The shared YOLO model; the first access loads it if warm-up hasn't yet"""
+        return yolo_models.get()
+
+    @perf.timed('pdf.process_page')
     def process_pdf_page(self, page):
         """Process PDF page with text extraction and YOLO detection"""
         try:
-            # Create rotation matrix based on selected rotation
-            rotation_matrix = fitz.Matrix(300 / 72, 300 / 72).prerotate(self.rotation)
-
-            # Get pixmap with selected rotation
-            pix = page.get_pixmap(matrix=rotation_matrix)
-            img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+            img = PageProcessor.render_page_image(page, self.rotation)
 
             # Store the original rotated image
             processed_img = img.copy()
 
             # Get text using PyMuPDF
-            fitz_dict = page.get_text("dict")['blocks']
-            pdf_results = []
-
-            # Process text blocks
-            for block in fitz_dict:
-                if 'lines' in block:
-                    for line in block['lines']:
-                        for span in line['spans']:
-                            dimension = span['text'].strip()
-                            if not dimension:  # Skip empty text
-                                continue
-                            bound_box = span['bbox']
-                            # Scale coordinates
-                            bound_box = [i * 2 for i in bound_box]
-                            # Convert to our standard format
-                            scene_box = [
-                                [bound_box[0], bound_box[1]],  # top-left
-                                [bound_box[2], bound_box[1]],  # top-right
-                                [bound_box[2], bound_box[3]],  # bottom-right
-                                [bound_box[0], bound_box[3]]  # bottom-left
-                            ]
-                            pdf_results.append({
-                                'text': dimension,
-                                'box': scene_box,
-                                'confidence': 1.0,  # PyMuPDF doesn't provide confidence
-                                'rotation': 0
-                            })
+            pdf_results = PageProcessor.extract_text_spans(page)
 
             # Store results
             self.all_detections['ocr'][0] = pdf_results
@@ -455,23 +467,15 @@ class MainWindow(QMainWindow):
 
             # Process YOLO if model exists
             if self.yolo_model:
+                import cv2
+
                 marked_image = img.copy()
                 mask, _ = self.find_innermost_boundary(img)
                 if mask is not None:
                     contours, _ = cv2.findContours(mask, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
                     cv2.drawContours(marked_image, contours, -1, (0, 255, 0), 2)
 
-                    detections = self.yolo_model(marked_image)[0]
-                    yolo_results = [
-                        {
-                            'box': [int(x1), int(y1), int(x2), int(y2)],
-                            'confidence': float(conf),
-                            'class': int(cls),
-                            'class_name': detections.names[int(cls)]
-                        }
-                        for x1, y1, x2, y2, conf, cls in detections.boxes.data
-                        if conf >= 0.75
-                    ]
+                    yolo_results = PageProcessor.yolo_results(self.yolo_model(marked_image)[0])
 
                     self.all_detections['yolo'] = yolo_results
                     self.yolo_detections = yolo_results
@@ -480,9 +484,7 @@ class MainWindow(QMainWindow):
             return self.convert_to_pixmap(processed_img)
 
         except Exception as e:
-            print(f"Error in process_pdf_page: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in process_pdf_page: %s", e)
             return None
 
     def is_valid_detection(self, result):
@@ -516,6 +518,8 @@ class MainWindow(QMainWindow):
         if img is None:
             return None
 
+        import cv2
+
         rgb_img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB) if len(img.shape) == 3 else img
         height, width = rgb_img.shape[:2]
         bytes_per_line = 3 * width
@@ -571,7 +575,7 @@ class MainWindow(QMainWindow):
             self.ui.pdf_view.highlight_bbox(bbox, row + 1)
 
         except Exception as e:
-            print(f"Error highlighting bbox: {str(e)}")
+            logger.error("Error highlighting bbox: %s", e)
 
     def is_dimensional_value(self, text):
         return DimensionParser.is_dimensional_value(text)
@@ -601,10 +605,11 @@ class MainWindow(QMainWindow):
                 if preview_dialog.exec_() == QDialog.Accepted:
                     page_number = preview_dialog.get_selected_page()
                     rotation = preview_dialog.get_rotation()
-                    self.process_pdf(file_path, page_number, rotation)
+                    # Reuse the document the preview already opened
+                    self.process_pdf(preview_dialog.get_document(), page_number, rotation)
 
         except Exception as e:
-            print(f"Error opening PDF: {str(e)}")
+            logger.error("Error opening PDF: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to open PDF: {str(e)}")
 
     def fetch_existing_bboxes(self):
@@ -630,7 +635,7 @@ class MainWindow(QMainWindow):
                             break
 
             if not order_id:
-                print("Could not find order_id")
+                logger.debug("Could not find order_id")
                 return []
 
             # Get operation number
@@ -641,82 +646,88 @@ class MainWindow(QMainWindow):
             response = api._make_request(endpoint)
 
             if response:
-                print(f"Loaded {len(response)} bounding boxes from database")
+                logger.info("Loaded %s bounding boxes from database", len(response))
                 return response
             else:
-                print("No bounding box data found")
+                logger.debug("No bounding box data found")
                 return []
 
         except Exception as e:
-            print(f"Error fetching bounding boxes: {str(e)}")
+            logger.error("Error fetching bounding boxes: %s", e)
             return []
 
-    def process_pdf(self, file_path, page_number, rotation):
-        """Process PDF file with given parameters"""
+    @perf.timed('pdf.process')
+    @profiler.action('open_drawing')
+    def process_pdf(self, file_path, page_number, rotation, drawing_hash=None):
+        """Process PDF file with given parameters
+
+        file_path may also be an open fitz.Document, e.g. the one a preview dialog
+        downloaded into memory; it is then used as is instead of being reopened.
+        drawing_hash identifies downloaded drawings so prefetched page renders can be used.
+        """
         try:
+            self.current_drawing_hash = drawing_hash
+            pdf_doc = file_path if isinstance(file_path, fitz.Document) else None
+            if pdf_doc is not None:
+                file_path = pdf_doc.name or "<memory>"
             
-            print("\n=== VIEW DRAWING DETAILS ===")
-            print(f"Current order details: {self.current_order_details}")
-            print(f"User: {getattr(self, 'user_role', 'unknown')}")
-            print(f"File: {file_path}")
-            print(f"Page: {page_number}")
-            print(f"Rotation: {rotation}")
+            logger.debug("=== VIEW DRAWING DETAILS ===")
+            logger.debug("Current order details: %s", self.current_order_details)
+            logger.debug("User: %s", getattr(self, 'user_role', 'unknown'))
+            logger.debug("File: %s", file_path)
+            logger.debug("Page: %s", page_number)
+            logger.debug("Rotation: %s", rotation)
             
-            print("\n=== PROCESSING PDF ===")
-            print(f"File: {file_path}")
-            print(f"Page: {page_number}")
-            print(f"Rotation: {rotation}")
+            logger.debug("=== PROCESSING PDF ===")
+            logger.debug("File: %s", file_path)
+            logger.debug("Page: %s", page_number)
+            logger.debug("Rotation: %s", rotation)
             # Make sure to close any existing PDF document first
-            if hasattr(self, 'current_pdf') and self.current_pdf is not None:
+            if getattr(self, 'current_pdf', None) is not None and self.current_pdf is not pdf_doc:
                 try:
-                    print("Closing existing PDF document")
+                    logger.debug("Closing existing PDF document")
                     self.current_pdf.close()
                 except Exception as e:
-                    print(f"Error closing current PDF: {str(e)}")
+                    logger.error("Error closing current PDF: %s", e)
             
             # Reset the dimension table to clear any existing data
-            print("Resetting dimension table")
+            logger.debug("Resetting dimension table")
             self.reset_dimension_table()
             
             # Completely reset the graphics view
-            print("Resetting graphics view")
+            logger.debug("Resetting graphics view")
             self.ui.pdf_view.reset_view()
             
             # Create a new scene
-            print("Creating new scene")
+            logger.debug("Creating new scene")
             self.scene = QtWidgets.QGraphicsScene()
             self.ui.pdf_view.setScene(self.scene)
             
-            print(f"New scene created: {self.scene}")
+            logger.debug("New scene created: %s", self.scene)
             
             # Force a scene update and process events to ensure UI updates
-            print("Forcing scene update")
+            logger.debug("Forcing scene update")
             QtWidgets.QApplication.processEvents()
             
             # Open the PDF document
-            print("Opening PDF document")
-            self.current_pdf = fitz.open(file_path)
+            logger.debug("Opening PDF document")
+            self.current_pdf = pdf_doc if pdf_doc is not None else fitz.open(file_path)
             
             # Load the specified page
             self.current_page = self.current_pdf[page_number]
             self.rotation = rotation
             self.loaded_page = self.current_page 
 
-            # Create rotation matrix based on selected rotation
-            rotation_matrix = fitz.Matrix(2, 2).prerotate(rotation)
-
             # Get the page pixmap with rotation
-            pix = self.current_page.get_pixmap(matrix=rotation_matrix)
-            img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(img)
+            pixmap = self.render_page_pixmap(self.current_page, rotation)
 
             # Add new pixmap to the scene
-            print("Getting page pixmap and adding it to scene")
+            logger.debug("Getting page pixmap and adding it to scene")
             pixmap_item = self.scene.addPixmap(pixmap)
             self.scene.setSceneRect(QRectF(pixmap.rect()))
             
             # Ensure the pixmap is visible
-            print(f"Scene items after adding pixmap: {len(self.scene.items())}")
+            logger.debug("Scene items after adding pixmap: %s", len(self.scene.items()))
             pixmap_item.setZValue(0)
             self.ui.pdf_view.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio)
             self.ui.pdf_view.centerOn(pixmap_item)
@@ -734,6 +745,7 @@ class MainWindow(QMainWindow):
                 if existing_bboxes:
                     # Clear existing table data
                     self.ui.dimtable.setRowCount(0)
+                    self.measurement_ingestor.reset()
                     
                     # Process each dimension and its bbox
                     for dimension in existing_bboxes:
@@ -783,8 +795,8 @@ class MainWindow(QMainWindow):
                                         nominal_item.setData(Qt.UserRole, points)
 
                             except Exception as bbox_error:
-                                print(f"Error processing bbox for row {row}: {bbox_error}")
-                                print(f"Original bbox data: {bbox}")
+                                logger.error("Error processing bbox for row %s: %s", row, bbox_error)
+                                logger.debug("Original bbox data: %s", bbox)
 
                 # Process the page with OCR/YOLO
                 self.process_page()
@@ -798,9 +810,50 @@ class MainWindow(QMainWindow):
             QtWidgets.QApplication.processEvents()
 
         except Exception as e:
-            print(f"Error processing PDF: {str(e)}")
+            logger.error("Error processing PDF: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to process PDF: {str(e)}")
 
+    def render_page_pixmap(self, page, rotation):
+        """Render a page at 2x, reusing a prefetched render of the same drawing when there is one"""
+        if self.current_drawing_hash:
+            render = prefetch_store.get_render(self.current_drawing_hash, page.number, rotation)
+            if render:
+                samples, width, height, stride = render
+                return QPixmap.fromImage(QImage(samples, width, height, stride, QImage.Format_RGB888))
+
+        # Render with a rotation matrix based on selected rotation
+        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2).prerotate(rotation))
+        if self.current_drawing_hash:
+            prefetch_store.put_render(self.current_drawing_hash, page.number, rotation, pix)
+        img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
+        return QPixmap.fromImage(img)
+
+    def start_prefetch(self):
+        """Prefetch the next operation's drawing and master BOC in the background"""
+        try:
+            if not getattr(self, 'operations_dialog', None) or not self.operations_dialog.selected_operation:
+                return
+            if self.prefetcher and self.prefetcher.isRunning():
+                return
+
+            production_order = self.operations_dialog.production_order
+            order_id = None
+            for order in self.operations_dialog.selected_operation.get('order_data') or []:
+                if str(order.get('production_order')) == str(production_order):
+                    order_id = order.get('id')
+                    break
+
+            self.prefetcher = OperationPrefetcher(
+                self.operations_dialog.part_number,
+                production_order,
+                order_id,
+                self.operations_dialog.get_operation_number(),
+                self
+            )
+            self.prefetcher.start()
+        except Exception as e:
+            logger.error("Error starting prefetch: %s", e)
+
     def is_admin_or_supervisor(self):
         """Helper method to check if user has admin or supervisor privileges"""
         return self.user_role in ['admin', 'supervisor']
@@ -853,7 +906,7 @@ class MainWindow(QMainWindow):
             self.ui.pdf_view.clearYOLODetections()
             return True
         except Exception as e:
-            print(f"Error in prepare_document: {str(e)}")
+            logger.error("Error in prepare_document: %s", e)
             return False
 
     def open_document(self):
@@ -863,7 +916,7 @@ class MainWindow(QMainWindow):
             self.current_file = self.loading_params['file_path']
             return True
         except Exception as e:
-            print(f"Error in open_document: {str(e)}")
+            logger.error("Error in open_document: %s", e)
             return False
 
     def load_page(self):
@@ -875,7 +928,7 @@ class MainWindow(QMainWindow):
                 return True
             return False
         except Exception as e:
-            print(f"Error in load_page: {str(e)}")
+            logger.error("Error in load_page: %s", e)
             return False
 
     def process_page(self):
@@ -900,7 +953,7 @@ class MainWindow(QMainWindow):
             return True
 
         except Exception as e:
-            print(f"Error processing page: {str(e)}")
+            logger.error("Error processing page: %s", e)
             return False
 
     def finalize_loading(self):
@@ -910,7 +963,7 @@ class MainWindow(QMainWindow):
             self.loading_params = None
             return True
         except Exception as e:
-            print(f"Error in finalize_loading: {str(e)}")
+            logger.error("Error in finalize_loading: %s", e)
             return False
 
     def start_loading(self):
@@ -962,6 +1015,7 @@ class MainWindow(QMainWindow):
         """Clear all rows in the dimension table and clean up graphics items."""
         # Clear table rows
         self.ui.dimtable.setRowCount(0)
+        self.measurement_ingestor.reset()
 
         # Clear any existing highlights
         self.clear_highlighted_bbox()
@@ -1146,176 +1200,35 @@ class MainWindow(QMainWindow):
                 )
                 return
             
-            # The instrument column might contain the name, but we need the code
-            # Try to extract the code which typically follows a pattern like L02-8087
             instrument_text = instrument_item.text()
-            print(f"Instrument text from table: {instrument_text}")
-            
-            # Try to extract the instrument code using a regex pattern
-            import re
-            # Look for patterns like L02-8087 or similar instrument codes
-            code_match = re.search(r'([A-Z][0-9]{2}-[0-9]{4})', instrument_text)
+            instrument_code = extract_instrument_code(instrument_text)
+            logger.debug("Instrument text from table: %s, code: %s", instrument_text, instrument_code)
             
-            if code_match:
-                instrument_code = code_match.group(1)
-                print(f"Extracted instrument code: {instrument_code}")
-            else:
-                # If no code pattern is found, check if it's in the format 'Name (Code)'
-                name_code_match = re.search(r'(.*?)\s*\(([^)]+)\)', instrument_text)
-                if name_code_match:
-                    instrument_code = name_code_match.group(2).strip()
-                    print(f"Extracted instrument code from parentheses: {instrument_code}")
-                else:
-                    # If no code pattern is found, use the text as is
-                    instrument_code = instrument_text
-                    print(f"Using full text as instrument code: {instrument_code}")
+            # A gauge that is already connected for this instrument is simply reused
+            match = gauge_connections.cached(instrument_text)
+            if match and gauge_connections.is_connected(match.bluetooth_address):
+                self.ui.statusbar.showMessage(f"{match.instrument_code} is already connected ({match.bluetooth_address})")
+                return
             
             # Show status message
             self.ui.statusbar.showMessage(f"Connecting to device for {instrument_code}...")
             
-            # Get the Bluetooth address from the API using the endpoint from api_endpoints.py
-            api_url = api.base_url + APIEndpoints.INVENTORY_ITEMS
-            print(f"API URL: {api_url}")
-            response = requests.get(api_url)
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get inventory items: {response.status_code}")
-                
-            items = response.json()
-            print(f"Found {len(items)} items from API")
-            bluetooth_address = None
-            
-            # Find the item with matching instrument code or name
-            print(f"Looking for instrument: {instrument_code}")
-            
-            # First try to find an exact match on instrument code
-            exact_match_found = False
-            
-            # Check if the instrument_code is actually a subcategory name (like 'Plug Gauge Box')
-            is_subcategory_name = False
-            
-            # Look for L02-xxxx pattern to determine if it's an instrument code or subcategory name
-            import re
-            if not re.search(r'([A-Z][0-9]{2}-[0-9]{4})', instrument_code):
-                # If it doesn't match the pattern, it might be a subcategory name
-                is_subcategory_name = True
-                print(f"{instrument_code} appears to be a subcategory name rather than an instrument code")
-            
-            # First pass: look for exact instrument code match
-            for item in items:
-                dynamic_data = item.get('dynamic_data', {})
-                item_code = item.get('item_code', 'Unknown')
-                item_instrument_code = dynamic_data.get('Instrument code')
-                item_bluetooth = dynamic_data.get('Bluetooth Address')
-                print(f"Checking item {item_code} with instrument code {item_instrument_code} and bluetooth {item_bluetooth}")
-                
-                # Check for exact match on instrument code
-                if item_instrument_code and item_instrument_code == instrument_code and item_bluetooth:
-                    bluetooth_address = item_bluetooth
-                    exact_match_found = True
-                    print(f"EXACT MATCH FOUND for {instrument_code}: {bluetooth_address}")
-                    break
-                    
-                # If we're looking for a subcategory name, also check the row text for the instrument code
-                if is_subcategory_name and item_bluetooth:
-                    # Get the full row text to check for instrument code in the row
-                    row_text = ""
-                    for col in range(self.ui.dimtable.columnCount()):
-                        cell_item = self.ui.dimtable.item(row, col)
-                        if cell_item:
-                            row_text += cell_item.text() + " "
-                    
-                    # If the row contains the instrument code from this item, use it
-                    if item_instrument_code and item_instrument_code in row_text:
-                        bluetooth_address = item_bluetooth
-                        exact_match_found = True
-                        print(f"ROW TEXT MATCH FOUND for {item_instrument_code} in row text: {bluetooth_address}")
-                        break
-                    
-            # If no exact match, try to find a match based on subcategory name
-            if not bluetooth_address:
-                print("No exact match found, trying to match by name...")
-                
-                # Fetch subcategories once and cache them
-                subcategories = {}
-                try:
-                    # Get all subcategories for instruments (category_id=2)
-                    all_subcategories = api.get_inventory_subcategories(2)
-                    for subcategory in all_subcategories:
-                        subcategories[subcategory.get('id')] = subcategory.get('name')
-                    print(f"Cached {len(subcategories)} subcategories")
-                except Exception as e:
-                    print(f"Error fetching subcategories: {str(e)}")
-                
-                # Try to find a match based on the instrument name or code
-                # This is a more specific search to ensure we get the right instrument
-                for item in items:
-                    dynamic_data = item.get('dynamic_data', {})
-                    item_bluetooth = dynamic_data.get('Bluetooth Address')
-                    item_instrument_code = dynamic_data.get('Instrument code')
-                    item_name = item.get('name', '')
-                    item_code = item.get('item_code', '')
-                    
-                    # Skip items without Bluetooth address
-                    if not item_bluetooth:
-                        continue
-                        
-                    # Try to match by instrument code (more specific)
-                    if item_instrument_code and instrument_code:
-                        # Check for partial code match (e.g., L02-81 in L02-8123)
-                        if (instrument_code in item_instrument_code or 
-                            item_instrument_code in instrument_code):
-                            bluetooth_address = item_bluetooth
-                            print(f"PARTIAL CODE MATCH FOUND for {item_instrument_code}: {bluetooth_address}")
-                            break
-                    
-                    # Try to match by item name
-                    if item_name and instrument_code:
-                        if (instrument_code.lower() in item_name.lower() or 
-                            item_name.lower() in instrument_code.lower()):
-                            bluetooth_address = item_bluetooth
-                            print(f"NAME MATCH FOUND for {item_name} ({item_instrument_code}): {bluetooth_address}")
-                            break
-                
-                # Print the selected row's text for debugging purposes
-                if not bluetooth_address:
-                    print("Checking selected row text for additional context...")
-                    
-                    # Get the selected row's full text to use for matching
-                    selected_row_text = ""
-                    if row < self.ui.dimtable.rowCount():
-                        for col in range(self.ui.dimtable.columnCount()):
-                            item = self.ui.dimtable.item(row, col)
-                            if item:
-                                selected_row_text += item.text() + " "
-                    
-                    print(f"Selected row text: {selected_row_text}")
-                        
-            # Also check if the item has a Bluetooth address and the instrument code matches
-            # any part of the dynamic data
-            if not bluetooth_address:
-                for item in items:
-                    dynamic_data = item.get('dynamic_data', {})
-                    item_bluetooth = dynamic_data.get('Bluetooth Address')
-                    
-                    if item_bluetooth:
-                        match_found = False
-                        for key, value in dynamic_data.items():
-                            if isinstance(value, str) and instrument_code.lower() in value.lower():
-                                bluetooth_address = item_bluetooth
-                                print(f"DYNAMIC DATA MATCH FOUND in {key}: {bluetooth_address}")
-                                match_found = True
-                                break
-                        
-                        if match_found:
-                            break
+            # The full row text lets a subcategory name in the cell resolve through a code elsewhere in the row
+            row_text = " ".join(
+                self.ui.dimtable.item(row, col).text()
+                for col in range(self.ui.dimtable.columnCount())
+                if self.ui.dimtable.item(row, col)
+            )
+            match = gauge_connections.resolve(instrument_text, row_text)
+            bluetooth_address = match.bluetooth_address if match else None
             
             # Only connect if we have an exact match for this specific instrument code
             # This prevents connecting to a device that's associated with a different instrument
-            if exact_match_found:
-                print(f"Using exact match Bluetooth address {bluetooth_address} for instrument {instrument_code}")
+            exact_match_found = bool(match and match.exact)
+            if match:
+                logger.debug("Bluetooth address %s for %s by %s (exact: %s)", bluetooth_address, instrument_code, match.reason, match.exact)
             else:
-                print(f"No exact match found for instrument {instrument_code}")
+                logger.warning("No Bluetooth address found for instrument %s", instrument_code)
             
             if not bluetooth_address or not exact_match_found:
                 # Show a more helpful message with instructions
@@ -1334,36 +1247,34 @@ class MainWindow(QMainWindow):
                     
                     # After dialog closes, try to get the address again
                     # Refresh the data from API
-                    response = requests.get(api_url)
-                    if response.status_code == 200:
-                        items = response.json()
-                        for item in items:
-                            dynamic_data = item.get('dynamic_data', {})
-                            item_instrument_code = dynamic_data.get('Instrument code')
-                            if item_instrument_code == instrument_code:
-                                bluetooth_address = dynamic_data.get('Bluetooth Address')
-                                if bluetooth_address:
-                                    print(f"Found newly associated address: {bluetooth_address}")
-                                    exact_match = True
-                                    break
+                    inventory.invalidate()
+                    gauge_connections.forget(instrument_text)
+                    match = gauge_connections.resolve(instrument_text, row_text)
+                    if match and match.exact:
+                        bluetooth_address = match.bluetooth_address
+                        logger.debug("Found newly associated address: %s", bluetooth_address)
+                        exact_match_found = True
                 
                 # If we still don't have an exact match, return without connecting
-                if not bluetooth_address or not exact_match:
+                if not bluetooth_address or not exact_match_found:
                     self.ui.statusbar.showMessage(f"No exact Bluetooth match for {instrument_code}. Please associate a device first.")
                     return
             
-            # Create a progress dialog
-            progress = QtWidgets.QProgressDialog("Connecting to Bluetooth device...", "Cancel", 0, 0, self)
+            # Create a progress dialog, closed once the service reports the outcome for this gauge
+            self.close_bluetooth_progress(bluetooth_address)
+            progress = QtWidgets.QProgressDialog(f"Connecting to {instrument_text}...", "Cancel", 0, 0, self)
             progress.setWindowTitle("Connecting")
             progress.setWindowModality(QtCore.Qt.WindowModal)
+            progress.canceled.connect(lambda address=bluetooth_address: self.disconnect_bluetooth_device(address))
+            self.bluetooth_progress[bluetooth_address] = progress
             progress.show()
             
-            # Create a thread to handle the Bluetooth connection
-            self.bluetooth_thread = BluetoothMonitorThread(bluetooth_address, self)
-            self.bluetooth_thread.connection_status.connect(self.on_bluetooth_connection_status)
-            self.bluetooth_thread.data_received.connect(self.on_bluetooth_data_received)
-            self.bluetooth_thread.finished.connect(progress.close)  # Close progress dialog when thread finishes
-            self.bluetooth_thread.start()
+            # Gauges stay connected side by side; readings are routed by instrument
+            try:
+                gauge_connections.connect(match, instrument_text)
+            except Exception:
+                self.close_bluetooth_progress(bluetooth_address)
+                raise
             
             # Update status
             self.ui.statusbar.showMessage(f"Connecting to Bluetooth device {bluetooth_address}...")
@@ -1375,10 +1286,46 @@ class MainWindow(QMainWindow):
                 f"Error connecting to Bluetooth device: {str(e)}"
             )
             self.ui.statusbar.showMessage("Bluetooth connection failed")
-            print(f"Error connecting to Bluetooth device: {str(e)}")
+            logger.error("Error connecting to Bluetooth device: %s", e)
     
-    def on_bluetooth_connection_status(self, status, message):
-        """Handle Bluetooth connection status updates"""
+    def disconnect_bluetooth_device(self, address):
+        """Close one gauge session"""
+        self.close_bluetooth_progress(address)
+        gauge_connections.disconnect(address)
+
+    def close_bluetooth_progress(self, address):
+        """Close the connect progress dialog of one gauge, if it has one"""
+        progress = self.bluetooth_progress.pop(address, None)
+        if progress is None:
+            return
+        # QProgressDialog emits canceled when closed, which would disconnect the gauge
+        progress.canceled.disconnect()
+        progress.close()
+
+    def on_warm_up_task_finished(self, name, succeeded):
+        """Show how much of the post-login warm-up is left"""
+        pending = warm_up.pending()
+        if pending:
+            self.ui.statusbar.showMessage(f"Getting ready: {', '.join(pending)}...")
+        else:
+            self.ui.statusbar.showMessage("Ready", 3000)
+        if not succeeded:
+            logger.debug("Warm-up task %s failed, it will run again on first use", name)
+
+    def on_bluetooth_session_state(self, address, state):
+        """Show reconnects in the status bar and forget sessions the service gave up on"""
+        instrument_code = gauge_connections.sessions.get(address, (address, ""))[0]
+        if state in (SessionState.CONNECTED, SessionState.CLOSED):
+            self.close_bluetooth_progress(address)
+        if state == SessionState.RECONNECTING:
+            self.ui.statusbar.showMessage(f"{instrument_code} dropped out, reconnecting...")
+        elif state == SessionState.CLOSED:
+            gauge_connections.session_closed(address)
+
+    def on_bluetooth_connection_status(self, address, status, message):
+        """Handle Bluetooth connection status updates of one gauge"""
+        if not status:
+            self.close_bluetooth_progress(address)
         if status:
             self.ui.statusbar.showMessage(f"Bluetooth connected: {message}")
         else:
@@ -1389,67 +1336,90 @@ class MainWindow(QMainWindow):
                 f"Error connecting to Bluetooth device: {message}"
             )
             
-    def on_bluetooth_data_received(self, data):
-        """Handle data received from Bluetooth device"""
+    def on_bluetooth_readings(self, readings):
+        """Handle a batch of (address, instrument_code, text, value, timestamp) readings from the BLE service"""
+        logger.debug("Received %s Bluetooth reading(s)", len(readings))
+        entries = []
+        for address, instrument_code, data, value, _timestamp in readings:
+            if value is None:
+                self.ui.statusbar.showMessage(f"Error processing measurement: {data.strip()}")
+                continue
+            instrument_text = gauge_connections.sessions.get(address, (instrument_code, ""))[1]
+            row = self.row_for_instrument(instrument_code, instrument_text)
+            if row is None:
+                if len(gauge_connections.sessions) > 1:
+                    self.ui.statusbar.showMessage(f"No row measured with {instrument_code} for reading {value}")
+                    continue
+                row = self.selected_measurement_row(value)
+                if row is None:
+                    continue
+            entries.append((row, value))
+        self.show_ingested_measurement(self.measurement_ingestor.ingest(entries), len(entries))
+
+    def selected_measurement_row(self, value):
+        """Row of the current selection, or None after telling the operator to select one"""
+        selected_rows = self.ui.dimtable.selectedItems()
+        if not selected_rows:
+            logger.debug("No row selected, can't populate measurement: %s", value)
+            self.ui.statusbar.showMessage(f"Please select a row to add measurement: {value}")
+            return None
+        return selected_rows[0].row()
+
+    def show_ingested_measurement(self, last, count):
+        """One status bar update per batch of readings"""
+        if not last:
+            return
+        row, column, value, started_new_set = last
+        col_name = ['M1', 'M2', 'M3'][column - 8]  # Convert column index to name
+        message = f"Measurement {value} added to {col_name} in row {row+1}"
+        if started_new_set:
+            message = f"Starting new measurement set for row {row+1}. {message}"
+        if count > 1:
+            message += f" ({count} readings)"
+        self.ui.statusbar.showMessage(message)
+
+    def row_for_instrument(self, instrument_code, instrument_text=""):
+        """Row a reading from this instrument belongs to, matched on the Instrument column (6)
+
+        The selected row wins if it uses the instrument; otherwise the first visible
+        row using it that still has a free M1-M3 cell, or the first one using it.
+        """
+        table = self.ui.dimtable
+        matching_rows = []
+        for row in range(table.rowCount()):
+            if table.isRowHidden(row):
+                continue
+            item = table.item(row, 6)
+            text = item.text().strip() if item else ""
+            if text and (text == instrument_text or extract_instrument_code(text) == instrument_code):
+                matching_rows.append(row)
+        if not matching_rows:
+            return None
+
+        selected_items = table.selectedItems()
+        if selected_items and selected_items[0].row() in matching_rows:
+            return selected_items[0].row()
+
+        for row in matching_rows:
+            if self.measurement_ingestor.has_free_column(row):
+                return row
+        return matching_rows[0]
+
+    def on_bluetooth_data_received(self, data, row=None):
+        """Handle data received from Bluetooth device, for row or else the selected row"""
         try:
-            # Parse the measurement value
-            measurement = None
-            if 'Measured value:' in data:
-                measurement = data.split('Measured value:')[-1].strip()
-            else:
-                measurement = data.strip()
-                
-            # Try to convert to float to ensure it's a valid measurement
-            measurement_value = float(measurement)
-            
-            # Find the currently selected row
-            selected_rows = self.ui.dimtable.selectedItems()
-            if not selected_rows:
-                print(f"No row selected, can't populate measurement: {measurement_value}")
-                self.ui.statusbar.showMessage(f"Please select a row to add measurement: {measurement_value}")
-                return
-                
-            # Get the row of the first selected item
-            row = selected_rows[0].row()
-            
-            # Store the current measurement value for this row
-            if not hasattr(self, 'current_measurement_columns'):
-                self.current_measurement_columns = {}
-            
-            # Initialize or get the current column index for this row
-            current_col_index = self.current_measurement_columns.get(row, 8)  # Start with M1 (column 8)
-            
-            # Check if we've gone through all columns
-            if current_col_index > 10:  # We've filled M1, M2, and M3
-                # Reset to M1 to start over
-                current_col_index = 8
-                # Clear existing values
-                for col in [8, 9, 10]:
-                    self.ui.dimtable.setItem(row, col, QtWidgets.QTableWidgetItem(""))
-                self.ui.statusbar.showMessage(f"Starting new measurement set for row {row+1}")
-            
-            # Add the measurement to the current column
-            new_item = QtWidgets.QTableWidgetItem(str(measurement_value))
-            self.ui.dimtable.setItem(row, current_col_index, new_item)
-            
-            # Update the status bar
-            col_name = ['M1', 'M2', 'M3'][current_col_index-8]  # Convert column index to name
-            self.ui.statusbar.showMessage(f"Measurement {measurement_value} added to {col_name} in row {row+1}")
-            
-            # Highlight the cell
-            from PyQt5 import QtGui
-            self.ui.dimtable.item(row, current_col_index).setBackground(QtGui.QColor(200, 255, 200))
-            
-            # Move to the next column for the next measurement
-            self.current_measurement_columns[row] = current_col_index + 1
+            measurement_value = parse_reading(data)
+            if measurement_value is None:
+                raise ValueError(f"Invalid number format: {data.strip()}")
+            if row is None:
+                row = self.selected_measurement_row(measurement_value)
+                if row is None:
+                    return
+            self.show_ingested_measurement(self.measurement_ingestor.ingest([(row, measurement_value)]), 1)
                 
         except Exception as e:
-            print(f"Error processing Bluetooth data: {str(e)}")
+            logger.error("Error processing Bluetooth data: %s", e)
             self.ui.statusbar.showMessage(f"Error processing measurement: {str(e)}")
-    
-        
-        # TODO: Process the data as needed for your application
-        # For example, you might want to update a measurement value in the table
         
     def set_measurement_instrument(self, rows):
         """Set measurement instrument for selected rows"""
@@ -1476,6 +1446,7 @@ class MainWindow(QMainWindow):
     def toggleZoomArea(self):
         ViewEvents.toggle_zoom_area(self.ui.pdf_view, self.ui.actionZoomArea)
 
+    @perf.timed('pdf.cluster_detections')
     def cluster_detections(self):
         """Cluster OCR and YOLO detections based on proximity"""
         pdf_results = self.pdf_results if hasattr(self, 'pdf_results') else []
@@ -1496,10 +1467,10 @@ class MainWindow(QMainWindow):
             if not api.token:
                 try:
                     # Try to connect to the API server
-                    print("Testing API connection...")
+                    logger.debug("Testing API connection...")
                     base_url = APIEndpoints.BASE_URL
                     response = requests.get(base_url, timeout=10)
-                    print(f"API response status: {response.status_code}")
+                    logger.debug("API response status: %s", response.status_code)
 
                     # Show login dialog if server is responding
                     login_dialog = LoginDialog(self)
@@ -1516,7 +1487,7 @@ class MainWindow(QMainWindow):
                         return
 
                 except requests.RequestException as e:
-                    print(f"API connection error: {str(e)}")
+                    logger.error("API connection error: %s", e)
                     QMessageBox.warning(
                         self,
                         "Connection Error",
@@ -1531,17 +1502,18 @@ class MainWindow(QMainWindow):
             dialog = PartNumberDialog(self)
             if dialog.exec_() == QDialog.Accepted:
                 file_path = dialog.get_downloaded_file()
+                pdf_doc = dialog.get_downloaded_document()
                 selected_page = dialog.get_selected_page()
                 rotation = dialog.get_selected_rotation()
 
                 # Store the operations dialog reference
                 self.operations_dialog = dialog.operations_dialog
 
-                if file_path and os.path.exists(file_path):
+                if pdf_doc is not None or (file_path and os.path.exists(file_path)):
                     try:
                         # Always reset the scene and graphics view before starting a new drawing load
                         if hasattr(self, 'ui') and hasattr(self.ui, 'pdf_view'):
-                            print("\n=== RESETTING SCENE FROM open_part_number ===")
+                            logger.debug("=== RESETTING SCENE FROM open_part_number ===")
                             self.ui.pdf_view.reset_view()
                             if hasattr(self, 'scene'):
                                 self.scene.clear()
@@ -1554,9 +1526,13 @@ class MainWindow(QMainWindow):
                         self.reset_dimension_table()
                         self.ui.pdf_view.clearYOLODetections()
 
-                        # Actually load and display the new drawing
-                        self.process_pdf(file_path, selected_page, rotation)
+                        # Actually load and display the new drawing, reusing the downloaded document
+                        self.process_pdf(
+                            pdf_doc if pdf_doc is not None else file_path, selected_page, rotation,
+                            drawing_hash=self.operations_dialog.get_drawing_hash() if pdf_doc is not None else None
+                        )
                         self.finalize_loading()
+                        self.start_prefetch()
 
                     except Exception as e:
                         QtWidgets.QMessageBox.critical(
@@ -1570,10 +1546,11 @@ class MainWindow(QMainWindow):
                         QtWidgets.QApplication.processEvents()
 
                         # Clean up temporary file
-                        try:
-                            os.remove(file_path)
-                        except:
-                            pass
+                        if file_path:
+                            try:
+                                os.remove(file_path)
+                            except:
+                                pass
                 else:
                     QtWidgets.QMessageBox.warning(
                         self,
@@ -1607,7 +1584,7 @@ class MainWindow(QMainWindow):
                     setattr(self, obj_name, None)  # Set attribute to None
 
         except Exception as e:
-            print(f"Error clearing highlight: {str(e)}")
+            logger.error("Error clearing highlight: %s", e)
 
     def is_similar_text(self, text1, text2):
         """Compare two texts to check if they are similar (ignoring spaces and case)"""
@@ -1632,9 +1609,54 @@ class MainWindow(QMainWindow):
         except:
             return False
 
-    def generate_pdf_report(self, file_path):
-        """Generate a PDF report with the dimension table data matching the standard inspection report format"""
+    def collect_report_data(self):
+        """Snapshot the header fields and table cells needed for the inspection report"""
+        header = {
+            'part_description': self.current_order_details.get('part_description', 'N/A'),
+            'part_number': self.current_order_details.get('part_number', 'N/A'),
+            'production_order': self.current_order_details.get('production_order', 'N/A'),
+            'ipid': self.operations_dialog.ipid if hasattr(self.operations_dialog, 'ipid') else 'N/A',
+            'stage_detail': f"Operation {self.operations_dialog.get_operation_number()}" if hasattr(self.operations_dialog, 'get_operation_number') else 'N/A',
+            'quantity': str(self.quantity_input.value() if hasattr(self, 'quantity_input') else '1'),
+            'operator': api.username or 'N/A'
+        }
+
+        rows = []
+        for row in range(self.ui.dimtable.rowCount()):
+            cells = []
+            for col in range(12):
+                item = self.ui.dimtable.item(row, col)
+                cells.append(item.text() if item else '')
+            rows.append(cells)
+
+        # Tolerance state and SPC figures for every row, from one pass over the store
+        self.evaluate_all_rows()
+        row_count = len(rows)
+        states = self.measurement_store.evaluate(self.current_quantity_index())[:row_count]
+        in_tolerance = [
+            None if state == MeasurementStore.UNKNOWN else bool(state == MeasurementStore.IN_TOLERANCE)
+            for state in states
+        ]
+        stats = self.measurement_store.statistics()
+        statistics = [
+            {key: values[row].item() for key, values in stats.items()}
+            for row in range(min(row_count, self.measurement_store.characteristics))
+        ]
+
+        return {'header': header, 'rows': rows, 'in_tolerance': in_tolerance, 'statistics': statistics}
+
+    @profiler.action('report')
+    def generate_pdf_report(self, file_path, report_data=None):
+        """Generate a PDF report with the dimension table data matching the standard inspection report format
+
+        Pass report_data from collect_report_data() to build the report without touching any widgets,
+        e.g. from a worker thread.
+        """
         try:
+            if report_data is None:
+                report_data = self.collect_report_data()
+            header = report_data['header']
+
             from reportlab.lib import colors
             from reportlab.lib.pagesizes import A4, landscape
             from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
@@ -1645,7 +1667,7 @@ class MainWindow(QMainWindow):
             from reportlab.graphics.shapes import Circle, Drawing
 
             # Get calibration data
-            calibration_data = api.get_calibrations() or {}
+            calibration_data = warm_up.result(WarmUpTask.CALIBRATIONS, timeout=30) or api.get_calibrations() or {}
             calibration_map = {}
             for cal in calibration_data:
                 instrument_code = cal.get('instrument_code', '')
@@ -1703,10 +1725,10 @@ class MainWindow(QMainWindow):
 
             # Add header information
             header_data = [
-                ['Nomenclature', self.current_order_details.get('part_description', 'N/A'), 'Inspection Report No.', self.operations_dialog.ipid if hasattr(self.operations_dialog, 'ipid') else 'N/A'],
-                ['Part No.', self.current_order_details.get('part_number', 'N/A'), 'Purchase Order', self.current_order_details.get('production_order', 'N/A')],
-                ['Stage Detail', f"Operation {self.operations_dialog.get_operation_number()}" if hasattr(self.operations_dialog, 'get_operation_number') else 'N/A', 'Qty', str(self.quantity_input.value() if hasattr(self, 'quantity_input') else '1')],
-                ['Operator', api.username or 'N/A', '', '']  # Add operator row
+                ['Nomenclature', header['part_description'], 'Inspection Report No.', header['ipid']],
+                ['Part No.', header['part_number'], 'Purchase Order', header['production_order']],
+                ['Stage Detail', header['stage_detail'], 'Qty', header['quantity']],
+                ['Operator', header['operator'], '', '']  # Add operator row
             ]
             
             header_table = Table(header_data, colWidths=[doc.width*0.2, doc.width*0.3, doc.width*0.2, doc.width*0.3])
@@ -1754,20 +1776,20 @@ class MainWindow(QMainWindow):
                 drawing.add(circle)
                 return drawing
 
+            in_tolerance = report_data.get('in_tolerance') or []
+
             # Get measurement data from the table
-            for row in range(self.ui.dimtable.rowCount()):
+            for row_index, cells in enumerate(report_data['rows']):
                 row_data = []
                 # Get first 5 columns (Sl No, Nominal, Upper Tol, Lower Tol, Zone)
                 for col in range(5):
-                    item = self.ui.dimtable.item(row, col)
-                    row_data.append(item.text() if item else '')
+                    row_data.append(cells[col])
                 
                 # Add instrument columns (6 and 7)
                 instrument = ''
                 used_instrument = ''
                 for col in range(6, 8):
-                    item = self.ui.dimtable.item(row, col)
-                    value = item.text() if item else ''
+                    value = cells[col]
                     if col == 6:  # Instrument column
                         instrument = value
                         row_data.append(value)
@@ -1792,8 +1814,7 @@ class MainWindow(QMainWindow):
                 # Get measurement values (M1, M2, M3)
                 measurements = []
                 for col in range(8, 11):  # M1, M2, M3 columns
-                    item = self.ui.dimtable.item(row, col)
-                    value = item.text() if item else ''
+                    value = cells[col]
                     row_data.append(value)
                     if value:
                         try:
@@ -1802,17 +1823,19 @@ class MainWindow(QMainWindow):
                             pass
                 
                 # Add mean value
-                mean_item = self.ui.dimtable.item(row, 11)  # Mean column
-                mean_value = mean_item.text() if mean_item else ''
+                mean_value = cells[11]  # Mean column
                 row_data.append(mean_value)
 
                 # Determine dot color based on measurements and tolerance
                 dot_color = colors.red  # Default to red
-                if measurements:  # If measurements exist
+                if row_index < len(in_tolerance) and in_tolerance[row_index] is not None:
+                    if in_tolerance[row_index]:
+                        dot_color = colors.green
+                elif measurements:  # If measurements exist
                     try:
-                        nominal = float(self.ui.dimtable.item(row, 2).text().replace(',', '.'))
-                        upper_tol = float(self.ui.dimtable.item(row, 3).text().replace(',', '.'))
-                        lower_tol = float(self.ui.dimtable.item(row, 4).text().replace(',', '.'))
+                        nominal = float(cells[2].replace(',', '.'))
+                        upper_tol = float(cells[3].replace(',', '.'))
+                        lower_tol = float(cells[4].replace(',', '.'))
                         mean = float(mean_value.replace(',', '.'))
                         
                         # Check if mean is within tolerance
@@ -1879,18 +1902,64 @@ class MainWindow(QMainWindow):
             main_table.setStyle(TableStyle(main_style))
             elements.append(main_table)
 
+            # Process statistics per characteristic, over every quantity measured so far
+            statistics = report_data.get('statistics') or []
+            if any(stat.get('count') for stat in statistics):
+                def format_stat(value, digits=3):
+                    return '-' if value is None or math.isnan(value) else f"{value:.{digits}f}"
+
+                stats_data = [['Sl No.', 'n', 'Min', 'Max', 'Range', 'Mean', 'Cp', 'Cpk']]
+                for row_index, stat in enumerate(statistics):
+                    if not stat.get('count'):
+                        continue
+                    cells = report_data['rows'][row_index]
+                    stats_data.append([
+                        cells[0] or str(row_index + 1),
+                        str(stat['count']),
+                        format_stat(stat['min']),
+                        format_stat(stat['max']),
+                        format_stat(stat['range']),
+                        format_stat(stat['mean']),
+                        format_stat(stat['cp'], 2),
+                        format_stat(stat['cpk'], 2),
+                    ])
+
+                stats_table = Table(stats_data, colWidths=[total_width / len(stats_data[0])] * len(stats_data[0]),
+                                    repeatRows=1)
+                stats_table.setStyle(TableStyle([
+                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 8),
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+                    ('TOPPADDING', (0, 0), (-1, -1), 3),
+                    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+                ]))
+                elements.append(Spacer(1, 5*mm))
+                elements.append(Paragraph('Process Statistics', styles['Heading4']))
+                elements.append(stats_table)
+
             # Build document
             doc.build(elements)
             return True
 
         except Exception as e:
-            print(f"Error generating PDF report: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error generating PDF report: %s", e)
             return False
 
+    @QtCore.pyqtSlot()
+    @perf.timed('save.prepare')
+    @profiler.action('save_prepare')
     def save_to_database(self):
-        """Save dimension data to database and generate PDF report for operator"""
+        """Save dimension data to database and generate PDF report for operator
+
+        Only the preparation on the GUI thread is timed and profiled here; the report, row
+        submission and uploads are the 'save' action of SavePipelineThread, and save.total
+        spans the whole save.
+        """
+        self.save_started = time.perf_counter()
         try:
             operation_number = self.operations_dialog.get_operation_number()
             production_order = self.operations_dialog.production_order
@@ -1921,7 +1990,7 @@ class MainWindow(QMainWindow):
                     else:
                         raise Exception("Invalid response from all_orders endpoint")
                 except Exception as e:
-                    print(f"Error getting order_id: {e}")
+                    logger.error("Error getting order_id: %s", e)
                     QMessageBox.critical(self, "Error", f"Failed to get order ID: {str(e)}")
                     return
 
@@ -1932,9 +2001,9 @@ class MainWindow(QMainWindow):
                     if hasattr(self, 'quantity_input') and self.quantity_input is not None:
                         quantity_no = self.quantity_input.value()
                     else:
-                        print("Warning: quantity_input not found, using default value of 1")
+                        logger.warning("quantity_input not found, using default value of 1")
                 except Exception as e:
-                    print(f"Error accessing quantity_input: {e}")
+                    logger.error("Error accessing quantity_input: %s", e)
                     QMessageBox.warning(self, "Warning", "Could not access quantity value, using default value of 1")
 
             # Check for quantity completion before processing any rows
@@ -1948,7 +2017,8 @@ class MainWindow(QMainWindow):
             # If no quantity error, proceed with saving rows
             document_id = 2 if operation_number == "999" else 3
 
-            # First save to report if operator role
+            # Pick the report folder first if operator role
+            report_job = None
             if self.user_role == 'operator':
                 report_dialog = ReportFolderDialog(self)
                 if report_dialog.exec_() == QDialog.Accepted and report_dialog.get_save_status():
@@ -1956,73 +2026,154 @@ class MainWindow(QMainWindow):
                     if not selected_folder:
                         QMessageBox.critical(self, "Error", "No folder selected for report")
                         return
-                        
-                    # Generate and save PDF report
-                    try:
-                        temp_pdf = os.path.join(tempfile.gettempdir(), f"report_{uuid.uuid4()}.pdf")
-                        if self.generate_pdf_report(temp_pdf):  # Use new method here
-                            # Upload the report
-                            document_name = f"Inspection_Report_{production_order}_{operation_number}"
-                            description = f"Inspection report for {production_order} - Operation {operation_number}"
-                            
-                            if not api.upload_inspection_report(
-                                production_order=production_order,
-                                operation_number=operation_number,
-                                file_path=temp_pdf,
-                                folder_path=selected_folder,
-                                document_name=document_name,
-                                description=description
-                            ):
-                                QMessageBox.warning(self, "Warning", "Failed to upload inspection report")
-                                return
-                        try:
-                            os.remove(temp_pdf)
-                        except:
-                            pass
-                    except Exception as e:
-                        print(f"Error saving inspection report: {str(e)}")
-                        QMessageBox.critical(self, "Error", f"Failed to save inspection report: {str(e)}")
-                        return
                 else:
                     # User cancelled or save failed
                     return
 
-            success_count = 0
-            failed_rows = []
+                # Snapshot the table now; the report is rendered in the background
+                report_data = self.collect_report_data()
+                report_job = {
+                    'render': lambda file_path: self.generate_pdf_report(file_path, report_data),
+                    'upload': {
+                        'production_order': production_order,
+                        'operation_number': operation_number,
+                        'folder_path': selected_folder,
+                        'document_name': f"Inspection_Report_{production_order}_{operation_number}",
+                        'description': f"Inspection report for {production_order} - Operation {operation_number}"
+                    }
+                }
+
             total_rows = self.ui.dimtable.rowCount()
+            stage_inspection = self.user_role == 'operator'
 
-            # Process all rows
+            # Payloads read the table, so build them here on the GUI thread
+            payload_rows = []
+            failed_rows = []
             for row in range(total_rows):
                 try:
-                    if self.user_role == 'operator':
+                    if stage_inspection:
                         payload = self.prepare_stage_inspection_payload(row, operation_number, order_id, quantity_no)
-                        result = api.create_stage_inspection(payload)
                     else:
                         payload = self.prepare_master_boc_payload(row, document_id, operation_number, order_id, ipid)
-                        result = api.create_master_boc(payload)
-
-                    if result is None:
-                        failed_rows.append(row + 1)
-                    else:
-                        success_count += 1
-
+                    payload_rows.append((row, payload))
                 except Exception as e:
+                    logger.error("Error preparing row %s: %s", row + 1, e)
                     failed_rows.append(row + 1)
 
-            # Save ballooned drawing for admin/supervisor
-            if self.is_admin_or_supervisor() and success_count > 0:
+            upload_drawing = None
+            if self.is_admin_or_supervisor():
+                upload_drawing = {'production_order': production_order, 'ipid': ipid}
+
+            self.pending_save = {
+                'total_rows': total_rows,
+                'failed_rows': failed_rows,
+                'drawing_file': None
+            }
+
+            self.ui.actionSave.setEnabled(False)
+            self.save_progress = QtWidgets.QProgressDialog(SaveStage.ROW_SUBMIT, "Cancel", 0, 0, self)
+            self.save_progress.setWindowTitle("Saving")
+            self.save_progress.setWindowModality(Qt.WindowModal)
+            self.save_progress.setMinimumDuration(0)
+
+            self.save_thread = SavePipelineThread(payload_rows, stage_inspection, report_job, upload_drawing, self)
+            self.save_thread.stage_changed.connect(self.on_save_stage_changed)
+            self.save_thread.progress.connect(self.on_save_progress)
+            self.save_thread.finished_saving.connect(self.on_save_finished)
+            self.save_progress.canceled.connect(self.save_thread.cancel)
+            self.save_thread.start()
+
+            # Render the ballooned drawing while the rows are being submitted
+            if upload_drawing:
+                drawing_file = os.path.join(tempfile.gettempdir(), f"ballooned_{uuid.uuid4()}.pdf")
+                self.pending_save['drawing_file'] = drawing_file
+                rendered = False
                 try:
-                    temp_pdf = os.path.join(tempfile.gettempdir(), f"ballooned_{uuid.uuid4()}.pdf")
-                    if self.save_scene_to_pdf(temp_pdf):
-                        if not api.upload_ballooned_drawing(production_order, ipid, temp_pdf):
-                            QMessageBox.warning(self, "Warning", "Failed to upload ballooned drawing")
-                    try:
-                        os.remove(temp_pdf)
-                    except:
-                        pass
+                    rendered = self.save_scene_to_pdf(drawing_file)
                 except Exception as e:
-                    print(f"Error saving ballooned drawing: {str(e)}")
-                    
+                    logger.error("Error saving ballooned drawing: %s", e)
+                finally:
+                    self.save_thread.set_drawing_file(drawing_file if rendered else None)
+
+        except Exception as e:
+            logger.error("Error saving to database: %s", e)
+            QMessageBox.critical(self, "Error", f"Failed to save data: {str(e)}")
+
+    def on_save_stage_changed(self, stage):
+        """Show the current save stage"""
+        if self.save_progress:
+            self.save_progress.setLabelText(stage)
+            self.save_progress.setRange(0, 0)
+        self.ui.statusbar.showMessage(stage)
+
+    def on_save_progress(self, stage, done, total):
+        """Show progress within the current save stage"""
+        if self.save_progress:
+            self.save_progress.setLabelText(f"{stage} {done}/{total}")
+            self.save_progress.setRange(0, total)
+            self.save_progress.setValue(done)
+        self.ui.statusbar.showMessage(f"{stage} {done}/{total}")
+
+    def on_save_finished(self, summary):
+        """Report the outcome of the save pipeline"""
+        perf.record('save.total', time.perf_counter() - self.save_started)
+        try:
+            self.ui.actionSave.setEnabled(True)
+            self.ui.statusbar.clearMessage()
+            if self.save_progress:
+                self.save_progress.canceled.disconnect()
+                self.save_progress.close()
+                self.save_progress = None
+
+            pending = self.pending_save
+            if pending['drawing_file']:
+                try:
+                    os.remove(pending['drawing_file'])
+                except OSError:
+                    pass
+
+            if summary['error'] and not summary['row_results']:
+                QMessageBox.critical(self, "Error", f"Failed to save data: {summary['error']}")
+                return
+
+            failed_rows = list(pending['failed_rows'])
+            total_rows = pending['total_rows']
+            success_count = 0
+            for row, result in summary['row_results']:
+                if result is None:
+                    failed_rows.append(row + 1)
+                else:
+                    success_count += 1
+            failed_rows.sort()
+
+            if summary['queued_rows'] and self.queue_flusher:
+                # These rows are stored locally and retried in the background
+                self.queue_flusher.wake()
+
+            if summary['cancelled']:
+                QMessageBox.information(
+                    self,
+                    "Cancelled",
+                    f"Save cancelled. Saved {success_count} out of {total_rows} rows."
+                    + (f"\n{summary['queued_rows']} rows were sent without a reply and are queued "
+                       f"to be sent again." if summary['queued_rows'] else "")
+                )
+                return
+
+            if summary['drawing_uploaded'] is False:
+                QMessageBox.warning(self, "Warning", "Failed to upload ballooned drawing")
+
+            if summary['queued_rows']:
+                QMessageBox.warning(
+                    self,
+                    "Saved Offline",
+                    f"Successfully saved {success_count} out of {total_rows} rows.\n"
+                    f"{summary['queued_rows']} rows could not be sent and are queued; "
+                    f"they will be sent automatically when the connection is back."
+                    + (f"\nFailed to prepare rows: {', '.join(map(str, pending['failed_rows']))}" if pending['failed_rows'] else "")
+                )
+                return
+
             # Show results
             if failed_rows:
                 QMessageBox.warning(
@@ -2037,9 +2188,9 @@ class MainWindow(QMainWindow):
                     "Success",
                     f"Successfully saved all {total_rows} rows."
                 )
-                
+
         except Exception as e:
-            print(f"Error saving to database: {str(e)}")
+            logger.error("Error saving to database: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to save data: {str(e)}")
 
     def prepare_stage_inspection_payload(self, row, operation_number, order_id, quantity_no):
@@ -2135,6 +2286,8 @@ class MainWindow(QMainWindow):
     def save_scene_to_pdf(self, file_path):
         """Save the current scene with balloons to PDF"""
         try:
+            from PyQt5 import QtPrintSupport
+
             # Create printer
             printer = QtPrintSupport.QPrinter(QtPrintSupport.QPrinter.HighResolution)
             printer.setOutputFormat(QtPrintSupport.QPrinter.PdfFormat)
@@ -2160,7 +2313,7 @@ class MainWindow(QMainWindow):
 
             return True
         except Exception as e:
-            print(f"Error saving scene to PDF: {str(e)}")
+            logger.error("Error saving scene to PDF: %s", e)
             return False
 
     def handle_login_success(self, username, role):
@@ -2168,7 +2321,7 @@ class MainWindow(QMainWindow):
         try:
             # Store the new role
             self.user_role = role.lower()
-            print(f"Logged in as {username} with role: {self.user_role}")
+            logger.debug("Logged in as %s with role: %s", username, self.user_role)
 
             # Remove any existing quantity widget first
             self.remove_quantity_widget()
@@ -2176,13 +2329,58 @@ class MainWindow(QMainWindow):
             # Configure UI based on role
             self.configure_ui_for_role()
 
+            # Start sending any rows left over from an earlier session
+            self.start_queue_flusher()
+
+            # Fetch and load what the next actions need while the user picks an operation
+            warm_up.start(self.user_role)
+
             # Show operations dialog
             self.show_operations_dialog()
 
         except Exception as e:
-            print(f"Error in handle_login_success: {str(e)}")
+            logger.error("Error in handle_login_success: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to handle login: {str(e)}")
 
+    def start_queue_flusher(self):
+        """Start the background flusher for the offline submission queue"""
+        if self.queue_flusher and self.queue_flusher.isRunning():
+            self.queue_flusher.wake()
+            return
+        self.queue_flusher = OfflineQueueFlusher(submission_queue, self)
+        self.queue_flusher.queue_changed.connect(self.on_offline_queue_changed)
+        self.queue_flusher.start()
+
+    def stop_queue_flusher(self):
+        """Stop the offline queue flusher; unsent rows stay on disk for next time"""
+        if self.queue_flusher:
+            self.queue_flusher.stop()
+            self.queue_flusher.wait(5000)
+            self.queue_flusher = None
+
+    def stop_prefetcher(self):
+        """Stop prefetching the next operation without waiting on a request in progress"""
+        if self.prefetcher:
+            self.prefetcher.detach()
+            self.prefetcher = None
+
+    def on_offline_queue_changed(self, pending, dead):
+        """Show how many rows are still waiting to be sent, and how many were given up on"""
+        messages = []
+        if pending:
+            messages.append(f"{pending} measurement rows waiting to be sent")
+        if dead:
+            messages.append(f"{dead} measurement rows could not be sent and need review")
+        if messages:
+            self.ui.statusbar.showMessage("; ".join(messages))
+
+    def closeEvent(self, event):
+        """Stop background workers before closing"""
+        self.stop_queue_flusher()
+        ble_service.shutdown()
+        self.stop_prefetcher()
+        super(MainWindow, self).closeEvent(event)
+
     def remove_quantity_widget(self):
         """Remove the quantity widget if it exists"""
         try:
@@ -2196,9 +2394,9 @@ class MainWindow(QMainWindow):
                         if widget and isinstance(widget, QWidget) and widget.findChild(QLabel, None) and widget.findChild(QLabel, None).text().startswith("Quantity:"):
                             table_parent_layout.removeWidget(widget)
                             widget.deleteLater()
-                            print("Removed existing quantity widget")
+                            logger.debug("Removed existing quantity widget")
         except Exception as e:
-            print(f"Error removing quantity widget: {str(e)}")
+            logger.error("Error removing quantity widget: %s", e)
 
     def configure_ui_for_role(self):
         """Configure UI elements based on user role"""
@@ -2229,7 +2427,7 @@ class MainWindow(QMainWindow):
                 self.remove_quantity_widget()
 
         except Exception as e:
-            print(f"Error configuring UI for role: {str(e)}")
+            logger.error("Error configuring UI for role: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to configure UI: {str(e)}")
 
     def setupCentralWidget(self):
@@ -2272,11 +2470,11 @@ class MainWindow(QMainWindow):
                     self.ui.dimtable.setColumnWidth(col, width)
 
             # Print debug information
-            print("\nOperator Table Setup:")
-            print(f"Total columns: {self.ui.dimtable.columnCount()}")
-            print("Headers:", headers)
+            logger.debug("Operator Table Setup:")
+            logger.debug("Total columns: %s", self.ui.dimtable.columnCount())
+            logger.debug("Headers: %s", headers)
             for i, header in enumerate(headers):
-                print(f"Column {i}: {header}")
+                logger.debug("Column %s: %s", i, header)
         else:
             headers = base_headers
             self.ui.dimtable.setColumnCount(len(headers))
@@ -2339,6 +2537,17 @@ class MainWindow(QMainWindow):
     def logout(self):
         """Handle user logout"""
         try:
+            # Stop sending queued rows, they go out again after the next login
+            self.stop_queue_flusher()
+
+            # Release every gauge
+            gauge_connections.disconnect_all()
+
+            # Results fetched for the previous user are not handed out again
+            warm_up.reset()
+            self.stop_prefetcher()
+            prefetch_store.clear()
+
             # Clear API token
             api.token = None
             api.user_role = None
@@ -2357,7 +2566,7 @@ class MainWindow(QMainWindow):
                 self.close()
 
         except Exception as e:
-            print(f"Error during logout: {str(e)}")
+            logger.error("Error during logout: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to logout: {str(e)}")
 
     def reset_application_state(self):
@@ -2388,6 +2597,7 @@ class MainWindow(QMainWindow):
             # Clear dimension table
             if hasattr(self.ui, 'dimtable'):
                 self.ui.dimtable.setRowCount(0)
+                self.measurement_ingestor.reset()
 
             # Clear any stored measurements or data
             if hasattr(self, 'measurements'):
@@ -2447,9 +2657,7 @@ class MainWindow(QMainWindow):
                 self.operations_dialog = None
 
         except Exception as e:
-            print(f"Error resetting application state: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error resetting application state: %s", e)
 
     def show_operations_dialog(self):
         """Show the operations dialog after successful login"""
@@ -2461,8 +2669,9 @@ class MainWindow(QMainWindow):
                 part_number = part_dialog.get_selected_part_number()
                 production_order = part_dialog.get_selected_production_order()
                 
-                # Get the downloaded file from the part number dialog
+                # Get the downloaded drawing from the part number dialog
                 file_path = part_dialog.get_downloaded_file()
+                pdf_doc = part_dialog.get_downloaded_document()
                 selected_page = part_dialog.get_selected_page()
                 selected_rotation = part_dialog.get_selected_rotation()
 
@@ -2476,22 +2685,26 @@ class MainWindow(QMainWindow):
                 self.update_order_details(part_number)
 
                 # Debug print current order details
-                print(f"\nCurrent order details:")
-                print(self.current_order_details)
+                logger.debug("Current order details:")
+                logger.debug("%s", self.current_order_details)
 
                 # Get the operations dialog from the part number dialog
                 if hasattr(part_dialog, 'operations_dialog') and part_dialog.operations_dialog:
                     self.operations_dialog = part_dialog.operations_dialog
 
-                if file_path:
+                if pdf_doc is not None or file_path:
                     # Store the current page and rotation
                     self.current_page = selected_page
                     self.rotation = selected_rotation
 
-                    # Open the PDF directly without showing preview again
+                    # Open the PDF directly without showing preview again, reusing the
+                    # document the preview already has open.
                     # The process_pdf method will handle closing the current PDF
                     # and clearing the scene
-                    self.process_pdf(file_path, selected_page, selected_rotation)
+                    self.process_pdf(
+                        pdf_doc if pdf_doc is not None else file_path, selected_page, selected_rotation,
+                        drawing_hash=self.operations_dialog.get_drawing_hash() if pdf_doc is not None else None
+                    )
 
                     # Store operation data
                     if hasattr(self, 'operations_dialog') and self.operations_dialog:
@@ -2501,8 +2714,11 @@ class MainWindow(QMainWindow):
                     if self.user_role == 'operator':
                         self.load_operator_data()
 
+                    # Get the next operation ready while this one is being measured
+                    self.start_prefetch()
+
         except Exception as e:
-            print(f"Error showing operations dialog: {str(e)}")
+            logger.error("Error showing operations dialog: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to show operations dialog: {str(e)}")
 
     def load_operator_data(self):
@@ -2541,15 +2757,19 @@ class MainWindow(QMainWindow):
 
             # Use the correct endpoint format
             endpoint = f"/quality/master-boc/order/{order_id}?op_no={operation_number}"
-            print(f"Fetching operator data from: {endpoint}")
+            logger.debug("Fetching operator data from: %s", endpoint)
 
-            response = api._make_request(endpoint)
+            # Use the rows prefetched while the previous operation was open, if any
+            response = prefetch_store.take_boc(order_id, operation_number)
+            if response is None:
+                response = api._make_request(endpoint)
 
             if response:
-                print(f"Loaded operator data: {json.dumps(response, indent=2)}")
+                logger.debug("Loaded operator data: %s", Lazy(json.dumps, response, indent=2))
 
                 # Clear existing data
                 self.ui.dimtable.setRowCount(0)
+                self.measurement_ingestor.reset()
                 self.ui.pdf_view.scene().clear()
 
                 # Add quantity input widget above table only for operator role
@@ -2587,6 +2807,7 @@ class MainWindow(QMainWindow):
                     self.quantity_input.setMinimum(1)
                     self.quantity_input.setMaximum(9999)
                     self.quantity_input.setValue(1)
+                    self.quantity_input.valueChanged.connect(self.on_quantity_changed)
                     self.quantity_input.setStyleSheet("""
                         QSpinBox {
                             padding: 5px;
@@ -2634,11 +2855,7 @@ class MainWindow(QMainWindow):
 
                 # Reload the PDF page
                 if self.current_page:
-                    # Create rotation matrix based on stored rotation
-                    rotation_matrix = fitz.Matrix(2, 2).prerotate(self.rotation)
-                    pix = self.current_page.get_pixmap(matrix=rotation_matrix)
-                    img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-                    pixmap = QPixmap.fromImage(img)
+                    pixmap = self.render_page_pixmap(self.current_page, self.rotation)
                     self.ui.pdf_view.scene().addPixmap(pixmap)
                     self.ui.pdf_view.setSceneRect(QRectF(pixmap.rect()))
 
@@ -2664,7 +2881,7 @@ class MainWindow(QMainWindow):
 
                     # Draw bounding box if bbox data exists
                     bbox = dimension.get('bbox', [])
-                    print(f"\nRow {row} bbox data: {bbox}")  # Debug print
+                    logger.debug("Row %s bbox data: %s", row, bbox)
 
                     if bbox:
                         try:
@@ -2681,7 +2898,7 @@ class MainWindow(QMainWindow):
                                     y = float(bbox[i+1])
                                     points.append([x, y])
 
-                                print(f"Converted points: {points}")  # Debug print
+                                logger.debug("Converted points: %s", points)
 
                                 # Create and style the polygon
                                 polygon = QGraphicsPolygonItem(QPolygonF([QPointF(p[0], p[1]) for p in points]))
@@ -2698,23 +2915,23 @@ class MainWindow(QMainWindow):
                                 nominal_item = self.ui.dimtable.item(row, 2)
                                 if nominal_item:
                                     nominal_item.setData(Qt.UserRole, points)  # Store as points list
-                                    print(f"Stored points data: {points}")  # Debug print
+                                    logger.debug("Stored points data: %s", points)
 
                         except Exception as bbox_error:
-                            print(f"Error processing bbox for row {row}: {bbox_error}")
-                            print(f"Original bbox data: {bbox}")
+                            logger.error("Error processing bbox for row %s: %s", row, bbox_error)
+                            logger.debug("Original bbox data: %s", bbox)
 
-                print(f"Loaded {len(response)} dimensions from database")
+                logger.info("Loaded %s dimensions from database", len(response))
 
                 # Fit view to content
                 self.ui.pdf_view.fitInView(self.ui.pdf_view.sceneRect(), Qt.KeepAspectRatio)
 
             else:
-                print("No data returned from API")
+                logger.debug("No data returned from API")
                 QMessageBox.warning(self, "Warning", "No dimension data found")
 
         except Exception as e:
-            print(f"Error loading operator data: {str(e)}")
+            logger.error("Error loading operator data: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to load data: {str(e)}")
 
     def update_table_zones(self):
@@ -2736,7 +2953,7 @@ class MainWindow(QMainWindow):
                         self.ui.dimtable.setItem(row, 1, QTableWidgetItem(zone))
 
         except Exception as e:
-            print(f"Error updating table zones: {str(e)}")
+            logger.error("Error updating table zones: %s", e)
 
     def update_highlight_box(self):
         """Update all bboxes and balloons based on current table rows"""
@@ -2774,9 +2991,7 @@ class MainWindow(QMainWindow):
             self.clear_highlighted_bbox()
 
         except Exception as e:
-            print(f"Error updating highlight boxes: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error updating highlight boxes: %s", e)
 
 
 
@@ -2839,9 +3054,7 @@ class MainWindow(QMainWindow):
             self.ui.statusbar.showMessage(status_msg, 3000)  # Show for 3 seconds
 
         except Exception as e:
-            print(f"Error toggling annotation visibility: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error toggling annotation visibility: %s", e)
 
 
     def toggleFieldDivision(self):
@@ -2912,9 +3125,7 @@ class MainWindow(QMainWindow):
             self.ui.statusbar.showMessage(status_msg, 3000)  # Show for 3 seconds
 
         except Exception as e:
-            print(f"Error toggling field division: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error toggling field division: %s", e)
 
     def toggleCharacteristicsProperties(self):
         """Toggle the properties editing mode for balloons"""
@@ -2935,8 +3146,10 @@ class MainWindow(QMainWindow):
                 # Change cursor to indicate clickable items
                 self.ui.pdf_view.viewport().setCursor(self.properties_cursor)
 
-                # Store original event handler
-                self.original_mouse_press = self.ui.pdf_view.mousePressEvent
+                # Store original event handler, unless properties mode is still installed from
+                # an earlier session (a reset clears the flag without restoring the handler)
+                if self.ui.pdf_view.mousePressEvent != self.propertiesMousePressEvent:
+                    self.original_mouse_press = self.ui.pdf_view.mousePressEvent
 
                 # Set custom event handler
                 self.ui.pdf_view.mousePressEvent = self.propertiesMousePressEvent
@@ -2966,9 +3179,7 @@ class MainWindow(QMainWindow):
                 self.ui.statusbar.showMessage("Properties Mode: Disabled", 3000)
 
         except Exception as e:
-            print(f"Error toggling properties mode: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error toggling properties mode: %s", e)
 
     def propertiesMousePressEvent(self, event):
         """Handle mouse press events in properties mode"""
@@ -3069,9 +3280,7 @@ class MainWindow(QMainWindow):
                 self.original_mouse_press(event)
 
         except Exception as e:
-            print(f"Error handling properties mouse press: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error handling properties mouse press: %s", e)
 
             # Don't call original handler in exception handler to prevent recursion
             # Instead, just log the error and return
@@ -3172,9 +3381,7 @@ class MainWindow(QMainWindow):
             return True
 
         except Exception as e:
-            print(f"Error changing balloon number: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error changing balloon number: %s", e)
             return False
 
     def toggleCharacteristicsOverview(self):
@@ -3237,9 +3444,7 @@ class MainWindow(QMainWindow):
                 self.ui.statusbar.showMessage("Properties Mode: Disabled", 3000)
 
         except Exception as e:
-            print(f"Error toggling properties mode: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error toggling properties mode: %s", e)
 
     def propertiesMouseMoveEvent(self, event):
         """Handle mouse move events in properties mode to show tooltips"""
@@ -3350,7 +3555,7 @@ class MainWindow(QMainWindow):
                         # Return without calling original handler
                         return
                     else:
-                        print(f"Invalid balloon row: {balloon_row}, max rows: {self.ui.dimtable.rowCount()}")
+                        logger.debug("Invalid balloon row: %s, max rows: %s", balloon_row, self.ui.dimtable.rowCount())
                 else:
                     # Hide tooltip if no balloon is under cursor
                     if hasattr(self, 'balloon_tooltip') and self.balloon_tooltip:
@@ -3361,9 +3566,7 @@ class MainWindow(QMainWindow):
                 self.original_mouse_move(event)
 
         except Exception as e:
-            print(f"Error handling properties mouse move: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error handling properties mouse move: %s", e)
 
             # Call original handler if there's an error
             if hasattr(self, 'original_mouse_move'):
@@ -3439,9 +3642,7 @@ class MainWindow(QMainWindow):
             self.balloon_tooltip.adjustSize()
 
         except Exception as e:
-            print(f"Error updating tooltip content: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error updating tooltip content: %s", e)
 
 
     def show_project_overview(self):
@@ -3652,7 +3853,7 @@ class MainWindow(QMainWindow):
             dialog.exec_()
 
         except Exception as e:
-            print(f"Error showing project overview: {str(e)}")
+            logger.error("Error showing project overview: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to display project overview: {str(e)}")
 
     def show_bluetooth_dialog(self):
@@ -3698,9 +3899,7 @@ class MainWindow(QMainWindow):
         """Set row background color based on validity by applying a more direct approach"""
         try:
             # Use softer, more professional colors
-            valid_color = QtGui.QColor(210, 242, 210)    # Softer green
-            invalid_color = QtGui.QColor(255, 200, 200)  # Softer red
-            color = valid_color if is_valid else invalid_color
+            color = VALID_COLOR if is_valid else INVALID_COLOR
             
             # Store row validation status for custom painting via data role
             for col in range(self.ui.dimtable.columnCount()):
@@ -3725,13 +3924,11 @@ class MainWindow(QMainWindow):
             
             # Debug output with more visibility
             status = "VALID (GREEN)" if is_valid else "INVALID (RED)"
-            print(f"!!! APPLIED {status} COLOR TO ROW {row} !!!")
+            logger.debug("!!! APPLIED %s COLOR TO ROW %s !!!", status, row)
             
             return True
         except Exception as e:
-            print(f"ERROR SETTING ROW COLOR: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("ERROR SETTING ROW COLOR: %s", e)
             return False
 
     def setup_custom_table_delegate(self):
@@ -3798,7 +3995,7 @@ class MainWindow(QMainWindow):
             # Create and set the delegate
             delegate = ColorDelegate()
             self.ui.dimtable.setItemDelegate(delegate)
-            print("Custom color delegate applied to table with selection support")
+            logger.debug("Custom color delegate applied to table with selection support")
             
             # Apply a clean, modern style to the table
             self.ui.dimtable.setStyleSheet("""
@@ -3824,9 +4021,7 @@ class MainWindow(QMainWindow):
             
             return True
         except Exception as e:
-            print(f"Error setting up custom delegate: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error setting up custom delegate: %s", e)
             return False
 
     def update_measurement(self, row, column, value):
@@ -3864,9 +4059,7 @@ class MainWindow(QMainWindow):
                 self.check_and_highlight_row(row)
                 
         except Exception as e:
-            print(f"Error updating measurement: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error updating measurement: %s", e)
 
     def handle_measurement_error(self, error_message):
         """Handle measurement errors"""
@@ -3882,107 +4075,43 @@ class MainWindow(QMainWindow):
     def handle_cell_change(self, row, column):
         """Handle cell value changes and calculate mean"""
         try:
-            # If mean column is directly edited, update validation immediately
-            if column == 11:  # Mean column
-                print("Mean column directly edited - checking values")
-                self.check_and_highlight_row(row)
+            # Only the measurement columns (M1, M2, M3) and a directly edited mean matter
+            if column not in [8, 9, 10, 11]:
                 return
-                
-            # Only process measurement columns (M1, M2, M3)
-            if column not in [8, 9, 10]:  # Adjusted for the correct columns
-                return
-    
-            # Recalculate mean when measurement values change
-            measurements = []
-            for col in range(8, 11):  # M1, M2, M3 columns
-                item = self.ui.dimtable.item(row, col)
-                if item and item.text():
-                    try:
-                        # Use safe_float for consistent handling of decimal separators
-                        measurements.append(self.safe_float(item.text()))
-                    except ValueError:
-                        continue
-            
-            # Update mean if we have measurements
-            if measurements:
-                mean = sum(measurements) / len(measurements)
-                mean_item = QtWidgets.QTableWidgetItem(f"{mean:.3f}")
-                mean_item.setTextAlignment(Qt.AlignCenter)
-                self.ui.dimtable.setItem(row, 11, mean_item)  # Mean column
-                
-                # Check tolerance and highlight the row
-                self.check_and_highlight_row(row)
-            
+            self.check_and_highlight_row(row)
+
         except Exception as e:
-            print(f"Error handling cell change: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error handling cell change: %s", e)
 
     def check_and_highlight_row(self, row):
-        """Check tolerance and highlight row based on mean value"""
+        """Recompute the mean of a row from the table and highlight it against its tolerance"""
         try:
-            # Get nominal, upper and lower tolerance values
-            nominal_item = self.ui.dimtable.item(row, 2)  # Nominal column
-            upper_tol_item = self.ui.dimtable.item(row, 3)  # Upper tolerance column
-            lower_tol_item = self.ui.dimtable.item(row, 4)  # Lower tolerance column
-            mean_item = self.ui.dimtable.item(row, 11)  # Mean column
-            
-            # Check if all required items exist and have values
-            if not all([nominal_item, upper_tol_item, lower_tol_item]) or \
-               not all([item.text() for item in [nominal_item, upper_tol_item, lower_tol_item]]):
-                # Missing basic dimension data
-                return
-                
-            if not mean_item or not mean_item.text():
-                # If mean is not calculated yet, try to calculate it now
-                measurements = []
-                for col in range(8, 11):  # M1, M2, M3 columns
-                    item = self.ui.dimtable.item(row, col)
-                    if item and item.text():
-                        try:
-                            # Handle both decimal separators
-                            measurements.append(self.safe_float(item.text()))
-                        except ValueError:
-                            continue
-                
-                # Only proceed if we have measurements
-                if not measurements:
-                    return
-                    
-                # Calculate and set mean
-                mean = sum(measurements) / len(measurements)
-                mean_item = QtWidgets.QTableWidgetItem(f"{mean:.3f}")
-                mean_item.setTextAlignment(Qt.AlignCenter)
-                self.ui.dimtable.setItem(row, 11, mean_item)  # Mean column
-            
-            try:
-                # Convert values to float with comma/dot handling
-                nominal = self.safe_float(nominal_item.text())
-                upper_tol = self.safe_float(upper_tol_item.text())
-                lower_tol = self.safe_float(lower_tol_item.text()) 
-                mean = self.safe_float(mean_item.text())
-                
-                # Calculate tolerance limits
-                upper_limit = nominal + upper_tol
-                lower_limit = nominal + lower_tol  # lower_tol is already negative
-                
-                # Check if mean is within tolerance range
-                is_in_range = lower_limit <= mean <= upper_limit
-                
-                # Set the row color using our helper function
-                self.set_row_color(row, is_in_range)
-                
-                # Print debug info
-                print(f"Row {row} validation: Nominal={nominal}, Tol=+{upper_tol}/{lower_tol}, Mean={mean}")
-                print(f"Limits: {lower_limit} <= {mean} <= {upper_limit}, Valid: {is_in_range}")
-            
-            except ValueError as e:
-                print(f"Error converting values: {str(e)}")
-        
+            self.measurement_ingestor.refresh_rows([row])
         except Exception as e:
-            print(f"Error checking tolerance range: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error checking tolerance range: %s", e)
+
+    def evaluate_all_rows(self):
+        """Re-read the whole table into the measurement store and recolour it in one pass"""
+        try:
+            self.measurement_ingestor.refresh_rows()
+        except Exception as e:
+            logger.error("Error evaluating measurements: %s", e)
+
+    def on_quantity_changed(self, value):
+        """Show the readings stored for the newly selected quantity instead of the previous one's"""
+        try:
+            self.measurement_ingestor.load_quantity(self.current_quantity_index())
+        except Exception as e:
+            logger.exception("Error loading readings for quantity %s: %s", value, e)
+
+    def current_quantity_index(self):
+        """0-based quantity the operator is measuring"""
+        quantity_input = getattr(self, 'quantity_input', None)
+        try:
+            return max(quantity_input.value() - 1, 0) if quantity_input is not None else 0
+        except RuntimeError:
+            # The spin box was deleted with its container
+            return 0
 
     def safe_float(self, text):
         """Safely convert text to float, handling comma decimal separators"""
@@ -3990,7 +4119,7 @@ class MainWindow(QMainWindow):
             # Replace comma with dot for decimal separator compatibility
             return float(str(text).replace(',', '.'))
         except (ValueError, TypeError):
-            print(f"Error converting '{text}' to float")
+            logger.error("Error converting '%s' to float", text)
             raise ValueError(f"Invalid number format: {text}")
 
 # Add MeasurementThread class
@@ -3998,83 +4127,27 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     import sys
-import time
-import asyncio
-from bleak import BleakClient
-from PyQt5.QtCore import QThread, pyqtSignal
-
-# Apply nest_asyncio to allow running asyncio in a non-async context
-nest_asyncio.apply()
-
-# BluetoothMonitorThread class for handling Bluetooth connections using the exact code provided
-class BluetoothMonitorThread(QThread):
-    connection_status = pyqtSignal(bool, str)  # Status, message
-    data_received = pyqtSignal(str)  # Data received from device
-    
-    def __init__(self, address, parent=None):
-        super().__init__(parent)
-        self.address = address
-        self.stopped = False
-        self.loop = asyncio.new_event_loop()
-    
-    def run(self):
-        """Run the Bluetooth connection thread"""
-        try:
-            # Set the event loop
-            asyncio.set_event_loop(self.loop)
-            
-            # Run the connection task
-            self.loop.run_until_complete(self.monitor_data(self.address))
-            
-        except ImportError as e:
-            self.connection_status.emit(False, f"Required library not installed: {str(e)}. Please install 'bleak'.")
-        except Exception as e:
-            self.connection_status.emit(False, f"Error connecting to device: {str(e)}")
-    
-    async def notification_handler(self, sender, data):
-        """Handle notifications from the Bluetooth device"""
-        try:
-            decoded_data = data.decode('utf-8')
-            print(f"{sender}, Measured value: {decoded_data}")
-            self.data_received.emit(decoded_data)
-        except Exception as e:
-            print(f"Error in notification handler: {str(e)}")
-    
-    async def monitor_data(self, address):
-        """Connect to the device and monitor data"""
-        try:
-            # Emit connecting status
-            self.connection_status.emit(True, f"Connecting to {address}...")
-            
-            async with BleakClient(address) as client:
-                # Emit connected status
-                self.connection_status.emit(True, f"Connected to {address}")
-                
-                # Start notification for the characteristic
-                characteristic_uuid = "6e400003-b5a3-f393-e0a9-e50e24dcca9e"
-                await client.start_notify(characteristic_uuid, self.notification_handler)
-                
-                try:
-                    # Keep the connection alive until stopped
-                    while not self.stopped:
-                        # The loop will be triggered when a notification is received
-                        await asyncio.sleep(1)  # Adjust the sleep interval as needed
-                        
-                except Exception as e:
-                    self.connection_status.emit(False, f"Error monitoring data: {str(e)}")
-                finally:
-                    # Stop notification before disconnecting
-                    await client.stop_notify(characteristic_uuid)
-                    
-        except Exception as e:
-            self.connection_status.emit(False, f"Error: {str(e)}")
-    
-    def stop(self):
-        """Stop the Bluetooth connection thread"""
-        self.stopped = True
-
 # Initialize the application
 app = QtWidgets.QApplication(sys.argv)
+startup_timer.mark('qapplication')
 window = MainWindow()  # Create instance of our MainWindow class
+startup_timer.mark('main_window')
 window.show()
-sys.exit(app.exec_())
+
+
+def on_first_event():
+    """Runs once the event loop has painted the window"""
+    startup_timer.mark('first_paint')
+    startup_timer.report()
+    if startup_timer.exit_after_report:
+        app.quit()
+        return
+    if api_config_error:
+        QMessageBox.critical(window, "Configuration Error", api_config_error)
+
+
+QtCore.QTimer.singleShot(0, on_first_event)
+exit_code = app.exec_()
+# Prefetches still finishing a request when the window closed
+OperationPrefetcher.wait_detached()
+sys.exit(exit_code)
@@ -0,0 +1,134 @@
+# -*- mode: python ; coding: utf-8 -*-
+#
+# Slim onedir build: pyinstaller SmartMetrology_Design_slim.spec
+#
+# Unlike SmartMetrology_Design_new.spec, no site-packages trees are copied as datas;
+# PyInstaller's hooks collect torch, ultralytics, cv2 and friends from the imports, and
+# packages only needed for training, export or plotting are excluded. The detector is
+# not bundled: it is copied next to the executable as models/best-<version>.pt, which
+# model_loader picks up, so a new model can be dropped in without rebuilding.
+#
+# SMARTMETROLOGY_MODEL       model to ship (default best.pt)
+# SMARTMETROLOGY_MODEL_VERSION  version in the file name (default: first 12 hex digits of its SHA-256)
+
+import hashlib
+import os
+import shutil
+
+from PyInstaller.utils.hooks import collect_data_files
+
+name = 'SmartMetrology_Design'
+root = SPECPATH
+
+model_source = os.path.join(root, os.environ.get('SMARTMETROLOGY_MODEL', 'best.pt'))
+
+
+def model_version(path):
+    version = os.environ.get('SMARTMETROLOGY_MODEL_VERSION')
+    if version:
+        return version
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+datas = [
+    (os.path.join(root, 'Smart_Metrology_19082024'), 'Smart_Metrology_19082024'),
+    (os.path.join(root, 'UI_Icons'), 'UI_Icons'),
+    (os.path.join(root, '.env'), '.'),
+]
+# Model and tracker configs YOLO() reads at load time
+datas += collect_data_files('ultralytics', includes=['cfg/**/*.yaml'])
+
+hiddenimports = [
+    # Imported by name at runtime, which the analysis can't see
+    'bleak',
+    'reportlab.platypus',
+    'reportlab.graphics.shapes',
+    'PyQt5.QtPrintSupport',
+]
+
+excludes = [
+    # Training, export, codegen and notebook tooling
+    'torchgen',
+    'torch.utils.tensorboard',
+    'tensorboard',
+    'tensorflow',
+    'keras',
+    'onnx',
+    'onnxsim',
+    'openvino',
+    'tensorrt',
+    'coremltools',
+    'h5py',
+    'IPython',
+    'jupyter',
+    'jupyterlab',
+    'notebook',
+    'ipykernel',
+    'mkdocs',
+    'pytest',
+    'Cython',
+    # GUI toolkits and plot backends other than the Qt app and matplotlib's Agg
+    'tkinter',
+    'matplotlib.backends.backend_tkagg',
+    'matplotlib.backends.backend_webagg',
+    'matplotlib.backends.backend_gtk3agg',
+    'matplotlib.backends.backend_wxagg',
+    'PySide2',
+    'PySide6',
+    'PyQt6',
+]
+
+a = Analysis(
+    ['SmartMetrology_Design_new.py'],
+    pathex=[root],
+    binaries=[],
+    datas=datas,
+    hiddenimports=hiddenimports,
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=excludes,
+    noarchive=False,
+    optimize=0,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name=name,
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    # UPX-packed DLLs are unpacked in memory at every load, and torch's are large
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name=name,
+)
+
+# Model sidecar, beside the executable rather than inside the bundle
+models_dir = os.path.join(DISTPATH, name, 'models')
+os.makedirs(models_dir, exist_ok=True)
+extension = os.path.splitext(model_source)[1]
+model_target = os.path.join(models_dir, f'best-{model_version(model_source)}{extension}')
+shutil.copy(model_source, model_target)
+print(f'Model copied to {model_target}')
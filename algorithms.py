@@ -1,6 +1,8 @@
-import cv2
+import logging
+import fitz
 import numpy as np
 import math
+import functools
 from PyQt5 import QtCore, QtGui
 from PyQt5.QtCore import QRectF
 import re
@@ -14,10 +16,37 @@ from PyQt5.QtGui import QImage, QPainter
 import os
 
 from highlight_manager import HighlightManager
+from perf_metrics import perf
+
+logger = logging.getLogger(__name__)
+
+
+# Dimension text grammar, compiled once at import
+NUMBER = r'(?:\d+(?:[.,]\d*)?|[.,]\d+)'
+# Signed values such as '+0.1', '-.05' or '+1e-3' (after ',' -> '.')
+SIGNED_VALUE_PATTERN = re.compile(r'[+-](?:\d+(?:\.\d*)?|\.\d+)(?:e[+-]?\d+)?')
+# Angles once the degree sign is stripped, e.g. ' 45' or '22.5'
+ANGLE_VALUE_PATTERN = re.compile(r'\s*[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:e[+-]?\d+)?\s*')
+DIMENSIONAL_PATTERN = re.compile(r'^-?\d*\.?\d+$|^-?\d+,\d+$')
+TOLERANCE_PATTERN = re.compile(r'±?\d*\.?\d+|\+\d*\.?\d+/-\d*\.?\d+')
+# Asymmetric deviation following the '+', e.g. '0.1-0.2' or '0.1/-0.2'
+DEVIATION_PATTERN = re.compile(rf'(?P<upper>{NUMBER})/?-(?P<lower>{NUMBER})')
+THREAD_PATTERN = re.compile(r'M(\d{1,2})')
+# Diameter, radius, thread and ± markers dropped before the numeric check
+DIMENSION_PREFIXES = str.maketrans('', '', 'ørm±∅')
 
 
 class DimensionParser:
+    """Classify and split dimension text (nominal, ±, +x/-y, Ø, R, M-threads, angles, THRU, references)
+
+    Patterns are compiled once, and is_dimensional_value / parse_dimension are memoised
+    per text, since the same strings recur across the spans of a page and across drawings.
+    Both return immutable values, so cached results can be shared freely.
+    """
+    MEMO_SIZE = 4096
+
     @staticmethod
+    @functools.lru_cache(maxsize=MEMO_SIZE)
     def is_dimensional_value(text):
         """Check if text likely represents a dimensional value"""
         text = text.strip().lower()
@@ -28,29 +57,16 @@ class DimensionParser:
 
         # Check if it's a tolerance value starting with + or -
         if text.startswith('+') or text.startswith('-'):
-            try:
-                float(text.replace(',', '.'))
-                return True
-            except ValueError:
-                return False
+            return bool(SIGNED_VALUE_PATTERN.fullmatch(text.replace(',', '.')))
 
         # Remove common prefixes for dimension check
-        for prefix in ['ø', 'r', 'm', '±', '∅']:
-            text = text.replace(prefix, '')
+        text = text.translate(DIMENSION_PREFIXES)
 
         if '°' in text:
-            text = text.replace('°', '')
-            try:
-                float(text)
-                return True
-            except ValueError:
-                return False
-
-        dimensional_pattern = r'^-?\d*\.?\d+$|^-?\d+,\d+$'
-        tolerance_pattern = r'±?\d*\.?\d+|\+\d*\.?\d+/-\d*\.?\d+'
+            return bool(ANGLE_VALUE_PATTERN.fullmatch(text.replace('°', '')))
 
         text = text.replace(',', '.')
-        return bool(re.match(dimensional_pattern, text) or re.match(tolerance_pattern, text))
+        return bool(DIMENSIONAL_PATTERN.match(text) or TOLERANCE_PATTERN.match(text))
 
     @staticmethod
     def determine_dimension_type(text, nominal_value):
@@ -76,69 +92,52 @@ class DimensionParser:
             return "Angular"
 
         # Check for Thread dimensions
-        match = re.search(r'M(\d{1,2})', text)
-        if match:
+        if THREAD_PATTERN.search(text):
             return "Thread"
 
         # Default to Length
         return "Length"
 
     @staticmethod
+    @functools.lru_cache(maxsize=MEMO_SIZE)
     def parse_dimension(text):
         """Parse dimension text to extract nominal value, tolerances, and type"""
         try:
-            text = text.strip()
-            nominal_value = ""
-            upper_tol = ""
-            lower_tol = ""
-            dim_type = "Length"  # default type
-
             # Remove spaces
             text = ''.join(text.split())
+            upper_text = text.upper()
 
             # Handle pure tolerance values
             if text.startswith('+'):
-                nominal_value = ""
-                upper_tol = text  # Keep the entire text including +
-                lower_tol = "0"
-                dim_type = "Tolerance"
-                return dim_type, upper_tol, lower_tol, nominal_value
+                return "Tolerance", text, "0", ""
 
             # Handle THRU dimensions
-            if "THRU" in text.upper():
-                numeric_part = text.upper().split("THRU")[0].strip()
-                return "THRU", "0", "0", numeric_part
+            if "THRU" in upper_text:
+                return "THRU", "0", "0", upper_text.split("THRU")[0]
 
             if '±' in text:
-                parts = text.split('±')
-                nominal_value = parts[0].strip()
-                if len(parts) > 1:
-                    tol = parts[1].strip().split()[0]
-                    upper_tol = f"+{tol}"
-                    lower_tol = f"-{tol}"
+                nominal_value, _, tolerance = text.partition('±')
+                tol = tolerance.split('±')[0]
+                if not tol:
+                    raise ValueError(f"Missing tolerance after ± in '{text}'")
+                upper_tol = f"+{tol}"
+                lower_tol = f"-{tol}"
 
             elif '+' in text:
-                plus_index = text.find('+')
-                nominal_value = text[:plus_index].strip()
-                tolerance = text[plus_index+1:].strip()
-                upper_tol = f"+{tolerance}"
-                lower_tol = f"-{tolerance}"
-
-            # elif '+' in text and text.startswith('+'):
-            #     # Handle pure tolerance values
-            #     nominal_value = ""
-            #     upper_tol = text  # Keep the entire text including + as upper tolerance
-            #     lower_tol = "0"
-            #     dim_type = "Tolerance"
+                nominal_value, _, tolerance = text.partition('+')
+                deviation = DEVIATION_PATTERN.fullmatch(tolerance)
+                if deviation:
+                    upper_tol = f"+{deviation.group('upper')}"
+                    lower_tol = f"-{deviation.group('lower')}"
+                else:
+                    upper_tol = f"+{tolerance}"
+                    lower_tol = f"-{tolerance}"
 
             else:
                 nominal_value = text
                 upper_tol = "0"
                 lower_tol = "0"
 
-            # Clean up nominal value
-            nominal_value = ''.join(nominal_value.split())
-
             # Special handling for reference dimensions
             if text.startswith("(") and text.endswith(")"):
                 nominal_value = text  # Keep the full text including parentheses
@@ -151,14 +150,77 @@ class DimensionParser:
             return dim_type, upper_tol, lower_tol, nominal_value
 
         except Exception as e:
-            print(f"Error parsing dimension: {str(e)}")
+            logger.error("Error parsing dimension: %s", e)
             return "Length", "0", "0", text
 
+    @staticmethod
+    def parse_many(texts):
+        """parse_dimension for a batch of texts, in order; repeated texts are parsed once"""
+        return [DimensionParser.parse_dimension(text) for text in texts]
+
+    @staticmethod
+    def clear_cache():
+        """Drop memoised results, e.g. between benchmark runs"""
+        DimensionParser.is_dimensional_value.cache_clear()
+        DimensionParser.parse_dimension.cache_clear()
+
+
+class PageProcessor:
+    """The per-page steps of process_pdf_page, kept free of widgets so they can be timed on their own"""
+    RENDER_DPI = 300
+    # Span boxes are scaled from PDF points into scene coordinates
+    SPAN_SCALE = 2
+    YOLO_MIN_CONFIDENCE = 0.75
+
+    @staticmethod
+    def render_page_image(page, rotation=0, dpi=RENDER_DPI):
+        """Render a PDF page to an RGB numpy image"""
+        rotation_matrix = fitz.Matrix(dpi / 72, dpi / 72).prerotate(rotation)
+        pix = page.get_pixmap(matrix=rotation_matrix)
+        return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+
+    @staticmethod
+    def extract_text_spans(page, scale=SPAN_SCALE):
+        """Non-empty text spans of a page as detections with scene boxes"""
+        pdf_results = []
+        for block in page.get_text("dict")['blocks']:
+            if 'lines' not in block:
+                continue
+            for line in block['lines']:
+                for span in line['spans']:
+                    dimension = span['text'].strip()
+                    if not dimension:  # Skip empty text
+                        continue
+                    x1, y1, x2, y2 = [i * scale for i in span['bbox']]
+                    pdf_results.append({
+                        'text': dimension,
+                        'box': [[x1, y1], [x2, y1], [x2, y2], [x1, y2]],
+                        'confidence': 1.0,  # PyMuPDF doesn't provide confidence
+                        'rotation': 0
+                    })
+        return pdf_results
+
+    @staticmethod
+    def yolo_results(detections, min_confidence=YOLO_MIN_CONFIDENCE):
+        """Convert one YOLO result into detection dicts, dropping low-confidence boxes"""
+        return [
+            {
+                'box': [int(x1), int(y1), int(x2), int(y2)],
+                'confidence': float(conf),
+                'class': int(cls),
+                'class_name': detections.names[int(cls)]
+            }
+            for x1, y1, x2, y2, conf, cls in detections.boxes.data
+            if conf >= min_confidence
+        ]
+
 
 class ImageProcessor:
     @staticmethod
     def find_innermost_boundary(image):
         """Find the innermost boundary rectangle that contains the main technical drawing"""
+        import cv2
+
         # Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
@@ -217,6 +279,8 @@ class ImageProcessor:
     @staticmethod
     def enhance_image(image):
         """Enhance the image for better OCR results"""
+        import cv2
+
         if len(image.shape) == 3:
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         else:
@@ -332,15 +396,15 @@ class ClusterDetector:
                 y_dist = yolo_y1 - pdf_y2   # Vertical distance between text bottom and GDT top
                 
                 # Print debug information
-                print(f"Vertical GDT check:")
-                print(f"x_dist: {x_dist}, y_dist: {y_dist}")
+                logger.debug("Vertical GDT check:")
+                logger.debug("x_dist: %s, y_dist: %s", x_dist, y_dist)
                 # print(f"Text bounds: ({pdf_x1}, {pdf_y1}) to ({pdf_x2}, {pdf_y2})")
                 # print(f"GDT bounds: ({yolo_x1}, {yolo_y1}) to ({yolo_x2}, {yolo_y2})")
                 
                 # Stricter horizontal alignment for vertical GDT
                 if (x_dist <= CLUSTER_X * 0.5 and  # Tighter horizontal alignment
                     0 <= y_dist <= CLUSTER_Y_VERTICAL):  # Vertical spacing check
-                    print("Vertical GDT association found!")
+                    logger.debug("Vertical GDT association found!")
                     return True, "vertical"
         else:
             # For horizontal symbols, check for text on right side only
@@ -364,14 +428,15 @@ class ClusterDetector:
             return f"GDT:{yolo_class}"
 
     @staticmethod
+    @perf.timed('cluster.detections')
     def cluster_detections(window, pdf_results, yolo_detections, dimension_parser, clear_existing=True):
         try:
             # Initialize empty lists if inputs are None
             # pdf_results = pdf_results or []
             yolo_detections = yolo_detections or []
 
-            print("\n=== Starting Clustering Process ===")
-            print(f"Processing {len(pdf_results)} PDF results and {len(yolo_detections)} YOLO detections")
+            logger.debug("=== Starting Clustering Process ===")
+            logger.debug("Processing %s PDF results and %s YOLO detections", len(pdf_results), len(yolo_detections))
 
             # Continue with existing clustering logic using processed_pdf_results
             pdf_results = ClusterDetector.cluster_tolerances(pdf_results, window, dimension_parser)
@@ -471,7 +536,7 @@ class ClusterDetector:
                         if is_associated:
                             associated_yolo = yolo_det
                             association_type = assoc_type
-                            print(f"Found {association_type} association with YOLO class: {yolo_det['class_name']}")
+                            logger.debug("Found %s association with YOLO class: %s", association_type, yolo_det['class_name'])
                             break
 
                     # Create merged bounding box if there's a YOLO association
@@ -489,33 +554,29 @@ class ClusterDetector:
                                 break
 
                         if not is_overlapping:
-                            print(f"Adding merged box with dimension type: {dim_type}")
+                            logger.debug("Adding merged box with dimension type: %s", dim_type)
                             all_bboxes.append((merged_box, (text, dim_type)))
                             merged_boxes.append(merged_box)
                     else:
                         # Check if this PDF box is contained within any merged box
                         if not any(
                                 BoundingBoxUtils.is_box_contained(pdf_box, merged_box) for merged_box in merged_boxes):
-                            print("Adding PDF-only box")
+                            logger.debug("Adding PDF-only box")
                             all_bboxes.append((pdf_box, (text, None)))
 
                 except Exception as e:
-                    print(f"Error processing detection: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("Error processing detection: %s", e)
                     continue
 
-            print(f"\nClustering complete:")
-            print(f"- Found {len(all_bboxes)} valid detections")
-            print(f"- Created {len(merged_boxes)} merged boxes")
+            logger.debug("Clustering complete:")
+            logger.debug("- Found %s valid detections", len(all_bboxes))
+            logger.debug("- Created %s merged boxes", len(merged_boxes))
 
             # Add visualizations and update table
             ClusterDetector._add_visualizations_and_update_table(window, all_bboxes, merged_boxes, dimension_parser)
 
         except Exception as e:
-            print(f"Error in cluster_detections: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in cluster_detections: %s", e)
             
     
 
@@ -586,7 +647,7 @@ class ClusterDetector:
             return merged_box
             
         except Exception as e:
-            print(f"Error creating merged box: {str(e)}")
+            logger.error("Error creating merged box: %s", e)
             return pdf_box  # Fall back to PDF box if merge fails
         
 
@@ -662,7 +723,7 @@ class ClusterDetector:
 
             # Check for duplicate nominal values
             if nominal_text and nominal_text in used_nominals:
-                print(f"Skipping duplicate nominal value: {nominal_text}")
+                logger.debug("Skipping duplicate nominal value: %s", nominal_text)
                 continue
 
             # Add nominal value to used set
@@ -745,15 +806,16 @@ class ClusterDetector:
 
             return (midpoint_x, midpoint_y)
         except Exception as e:
-            print(f"Error calculating merged box midpoint: {str(e)}")
+            logger.error("Error calculating merged box midpoint: %s", e)
             return None
 
     @staticmethod
+    @perf.timed('cluster.tolerances')
     def cluster_tolerances(pdf_results, window, dimension_parser):
         """Cluster dimensions and tolerances that are on the same axis"""
         
-        print("\n=== Starting Tolerance Clustering ===")
-        print(f"Processing {len(pdf_results)} PDF results")
+        logger.debug("=== Starting Tolerance Clustering ===")
+        logger.debug("Processing %s PDF results", len(pdf_results))
         
         def is_on_same_x_axis(bbox1, bbox2):
             y1_bbox1 = min(p[1] for p in bbox1)
@@ -848,7 +910,7 @@ class ClusterDetector:
                         if 1 <= x_dist < 15 and abs(y_dist) < 10:
                             closest_det = det2
                             
-                        print(f"closest_det: {closest_det}")
+                        logger.debug("closest_det: %s", closest_det)
                     else:
                         first_box = max(cluster, key=lambda item: item['box'][1][0])['box']
                         x_dist = first_box[0][0] - box3[0][0]
@@ -939,6 +1001,8 @@ class ZoneDetector:
     @staticmethod
     def find_innermost_boundary(image):
         """Find the innermost boundary rectangle that contains the main technical drawing"""
+        import cv2
+
         # Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
@@ -997,6 +1061,8 @@ class ZoneDetector:
     @staticmethod
     def extract_content_outside_boundary(image, boundary_rect):
         """Extract content outside the innermost boundary."""
+        import cv2
+
         result_img = image.copy()
         x, y, w, h = boundary_rect
         height, width = image.shape[:2]
@@ -1023,6 +1089,8 @@ class ZoneDetector:
     @staticmethod
     def detect_isolated_text_labels(image):
         """Detect isolated text labels in the image."""
+        import cv2
+
         # Convert to grayscale
         if len(image.shape) == 3:
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -1063,8 +1131,11 @@ class ZoneDetector:
         return result_img, len(text_regions)
 
     @staticmethod
+    @perf.timed('zoning.grid')
     def draw_grid_based_on_labels(image, top_label_count, right_label_count, output_folder):
         """Draw grid based on detected labels and return grid positions."""
+        import cv2
+
         result_img = image.copy()
         height, width = image.shape[:2]
 
@@ -1145,21 +1216,24 @@ class ZoneDetector:
         if output_folder:
             grid_path = os.path.join(output_folder, "label_based_grid.png")
             cv2.imwrite(grid_path, result_img)
-            print(f"Label-based grid image saved to {grid_path}")
+            logger.debug("Label-based grid image saved to %s", grid_path)
 
             # Print the pixel positions
-            print("Vertical grid lines (X positions):", vertical_lines)
-            print("Horizontal grid lines (Y positions):", horizontal_lines)
+            logger.debug("Vertical grid lines (X positions): %s", vertical_lines)
+            logger.debug("Horizontal grid lines (Y positions): %s", horizontal_lines)
 
         return result_img, vertical_lines, horizontal_lines
 
     @staticmethod
+    @perf.timed('zoning.zone_for_midpoint')
     def get_zone_for_midpoint(window, midpoint):
+        import cv2
+
         try:
             # Get the PDF view scene
             scene = window.ui.pdf_view.scene()
             if not scene:
-                print("No scene available")
+                logger.debug("No scene available")
                 return "__"
 
             # Convert scene to image
@@ -1184,7 +1258,7 @@ class ZoneDetector:
             # Now use the converted image for zone detection
             boundary_mask, boundary_rect = ZoneDetector.find_innermost_boundary(cv_image)
             if not boundary_rect:
-                print("Could not find boundary rectangle")
+                logger.debug("Could not find boundary rectangle")
                 return "__"
 
             # Extract content outside boundary
@@ -1194,7 +1268,7 @@ class ZoneDetector:
 
             # Check if margins are valid
             if top_margin is None or right_margin is None or top_margin.size == 0 or right_margin.size == 0:
-                print("Invalid margins detected")
+                logger.debug("Invalid margins detected")
                 return "__"
 
             # Detect isolated text labels from margins
@@ -1207,7 +1281,7 @@ class ZoneDetector:
             )
 
             if not vertical_lines or not horizontal_lines:
-                print("Could not create grid lines")
+                logger.debug("Could not create grid lines")
                 return "__"
 
             # Rest of the code remains exactly the same
@@ -1231,14 +1305,14 @@ class ZoneDetector:
             return f"{row_letter}{col_number}"
 
         except Exception as e:
-            print(f"Error in get_zone_for_midpoint: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in get_zone_for_midpoint: %s", e)
             return "__"
 
     @staticmethod
     def draw_field_division(window, show=True):
         """Draw or hide field division grid lines on the PDF view"""
+        import cv2
+
         try:
             # If hiding the grid, remove existing grid line items
             if not show:
@@ -1251,7 +1325,7 @@ class ZoneDetector:
             # Get the scene dimensions
             scene = window.ui.pdf_view.scene()
             if not scene:
-                print("No scene available")
+                logger.debug("No scene available")
                 return False
 
             rect = scene.sceneRect()
@@ -1275,7 +1349,7 @@ class ZoneDetector:
             # Find innermost boundary
             boundary_mask, boundary_rect = ZoneDetector.find_innermost_boundary(cv_image)
             if not boundary_rect:
-                print("Could not find boundary rectangle")
+                logger.debug("Could not find boundary rectangle")
                 return False
 
             # Extract content outside boundary
@@ -1316,9 +1390,7 @@ class ZoneDetector:
             return True
 
         except Exception as e:
-            print(f"Error drawing field division: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error drawing field division: %s", e)
             return False
 
 
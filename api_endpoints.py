@@ -1,30 +1,67 @@
+import logging
 import requests
-from typing import Dict, List, Optional, Union, Tuple
+from typing import Callable, Dict, List, Optional, Union, Tuple
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 import os
+import re
+import threading
+import time
 from dotenv import load_dotenv
 
+from perf_metrics import perf
+
+logger = logging.getLogger(__name__)
+
 
 # Get the directory containing the script
 current_dir = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.join(current_dir, '.env')
 
-# Load environment variables from .env file
-print(f"Looking for .env file at: {env_path}")
-if not os.path.exists(env_path):
-    raise FileNotFoundError(f".env file not found at {env_path}")
 
-load_dotenv(env_path)
+def load_api_base_url(path: str) -> str:
+    """Read and validate API_BASE_URL from the .env file at path"""
+    logger.debug("Looking for .env file at: %s", path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f".env file not found at {path}")
+
+    load_dotenv(path)
+
+    # Get and validate API base URL
+    base_url = os.getenv('API_BASE_URL')
+    if not base_url or base_url == 'API_BASE_URL':
+        raise ValueError("Invalid API_BASE_URL in .env file. Should be like: http://172.18.7.93:9999/api/v1")
+
+    if not base_url.startswith(('http://', 'https://')):
+        raise ValueError("API_BASE_URL must start with http:// or https://")
+
+    logger.info("Loaded API_BASE_URL: %s", base_url)
+    return base_url
 
-# Get and validate API base URL
-api_base_url = os.getenv('API_BASE_URL')
-if not api_base_url or api_base_url == 'API_BASE_URL':
-    raise ValueError("Invalid API_BASE_URL in .env file. Should be like: http://172.18.7.93:9999/api/v1")
 
-if not api_base_url.startswith(('http://', 'https://')):
-    raise ValueError("API_BASE_URL must start with http:// or https://")
+# A bad configuration is shown by the main window once it is up, instead of stopping the import
+api_config_error = None
+try:
+    api_base_url = load_api_base_url(env_path)
+except (FileNotFoundError, ValueError) as e:
+    logger.error("API configuration error: %s", e)
+    api_config_error = str(e)
+    api_base_url = ''
 
-print(f"Loaded API_BASE_URL: {api_base_url}")
+# Path segments holding an id or number, folded together in request timing spans
+ID_SEGMENT = re.compile(r'/[^/]*\d[^/]*(?=/|$)')
+
+@dataclass
+class ConditionalDownload:
+    """Outcome of a download revalidating a cached copy
+
+    not_modified means the cached copy is current; otherwise content is the new body,
+    or None if the download failed. etag and last_modified are the response's validators.
+    """
+    not_modified: bool = False
+    content: Optional[bytes] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
 @dataclass
 class APIEndpoints:
@@ -48,6 +85,12 @@ class APIEndpoints:
     # Quality endpoints
     QUALITY_CHECK = "/quality/check"
     QUALITY_MASTER_BOC = "/quality/master-boc/"
+    QUALITY_STAGE_INSPECTION = "/quality/stage-inspection/"
+    # Provisional: the bulk endpoints aren't on every backend yet and their request and
+    # response shapes aren't final, so APIHandler falls back to single POSTs until one
+    # has been seen to accept a chunk
+    QUALITY_MASTER_BOC_BULK = "/quality/master-boc/bulk/"
+    QUALITY_STAGE_INSPECTION_BULK = "/quality/stage-inspection/bulk/"
     QUALITY_MEASUREMENT_INSTRUMENTS = "/quality/master-boc/measurement-instruments"
     
     # Other endpoints
@@ -69,24 +112,43 @@ class APIEndpoints:
     REPORT_FOLDER_CREATE = "/document-management/report/folder"
 
 class APIHandler:
+    # Rows per bulk POST and worker count for the per-row fallback
+    BULK_CHUNK_SIZE = 50
+    BULK_MAX_WORKERS = 4
+    # Seconds to wait on a bulk POST and on a single create
+    BULK_TIMEOUT = 60
+    CREATE_TIMEOUT = 15
+    # 4xx statuses worth retrying; any other 4xx means the backend rejected the rows
+    RETRYABLE_CLIENT_ERRORS = (408, 425, 429)
+    # Header the backend deduplicates creates on; one key per row, kept out of the payload
+    IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+    # Read size for streamed document downloads
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
     def __init__(self, base_url: str = APIEndpoints.BASE_URL):
         self.base_url = base_url
         self.token = None
         self.username = None
         self.operator_id = None
+        # Bulk endpoint -> True once it has accepted a chunk, False once it turned out
+        # missing or unusable; unknown until then
+        self._bulk_supported = {}
         
+    @perf.timed('api.check_health')
     def check_health(self) -> bool:
         """Check if the API server is responding"""
         try:
             # Try the root endpoint instead of /health
             response = requests.get(f"{self.base_url}", timeout=5)
-            print(f"Health check response: {response.status_code}")  # Debug print
+            logger.debug("Health check response: %s", response.status_code)
             # Accept any 2xx status code as success
             return 200 <= response.status_code < 300
         except requests.RequestException as e:
-            print(f"Health check failed: {str(e)}")  # Debug print
+            logger.error("Health check failed: %s", e)
             return False
 
+    @perf.timed('api.login')
     def login(self, username: str, password: str) -> bool:
         """Login user and get authentication token"""
         try:
@@ -97,8 +159,7 @@ class APIHandler:
                 "password": password
             }
             
-            # Debug print
-            print(f"Attempting login to: {self.base_url}{APIEndpoints.AUTH_LOGIN}")
+            logger.debug("Attempting login to: %s%s", self.base_url, APIEndpoints.AUTH_LOGIN)
             
             response = requests.post(
                 f"{self.base_url}{APIEndpoints.AUTH_LOGIN}",
@@ -110,8 +171,7 @@ class APIHandler:
                 timeout=10
             )
             
-            # Debug print
-            print(f"Login response status: {response.status_code}")
+            logger.debug("Login response status: %s", response.status_code)
             # print(f"Login response content: {response.text}")
             
             response.raise_for_status()
@@ -128,62 +188,69 @@ class APIHandler:
                 if role:
                     self.user_role = role  # Store user role
                 
-                print("Login successful")
+                logger.info("Login successful")
                 return True
             
-            print(f"Login failed: No token in response - {data}")
+            logger.warning("Login failed: No token in response - %s", data)
             return False
             
         except requests.RequestException as e:
-            print(f"Login failed: {str(e)}")
+            logger.error("Login failed: %s", e)
             if hasattr(e, 'response') and hasattr(e.response, 'json'):
                 try:
                     error_data = e.response.json()
-                    print(f"Error details: {error_data}")
+                    logger.error("Error details: %s", error_data)
                 except:
                     pass
             return False
             
-    def _make_request(self, endpoint, stream=False, params=None, method="GET", data=None):
-        """Make a request to the API"""
+    @staticmethod
+    def _span_name(method: str, endpoint: str) -> str:
+        """Timing span of a request; ids in the path are folded so each endpoint gets one histogram"""
+        path = ID_SEGMENT.sub('/{id}', endpoint.split('?', 1)[0])
+        return f"api.{method.upper()} {path}"
+
+    def _make_request(self, endpoint, stream=False, params=None, method="GET", data=None, timeout=None):
+        """Make a request to the API; timeout in seconds, None waits indefinitely"""
         try:
             url = f"{self.base_url}{endpoint}"
-            print(f"Making {method} request to: {url}")
+            logger.debug("Making %s request to: %s", method, url)
             
             headers = {
                 "Authorization": f"Bearer {self.token}",
                 "Content-Type": "application/json"
             }
             
-            if stream:
-                # For file downloads
-                response = requests.get(url, headers=headers, stream=True)
-                print(f"Response status: {response.status_code}")
+            with perf.span(self._span_name(method, endpoint)):
+                if stream:
+                    # For file downloads
+                    response = requests.get(url, headers=headers, stream=True, timeout=timeout)
+                    logger.debug("Response status: %s", response.status_code)
                 
-                if response.status_code == 200:
-                    return response.content  # Return binary content
-                else:
-                    print(f"Error response: {response.text}")
-                    return None
-            else:
-                # For regular JSON responses
-                if method.upper() == "GET":
-                    response = requests.get(url, headers=headers, params=params)
-                elif method.upper() == "POST":
-                    response = requests.post(url, headers=headers, json=data)
+                    if response.status_code == 200:
+                        return response.content  # Return binary content
+                    else:
+                        logger.error("Error response: %s", response.text)
+                        return None
                 else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
+                    # For regular JSON responses
+                    if method.upper() == "GET":
+                        response = requests.get(url, headers=headers, params=params, timeout=timeout)
+                    elif method.upper() == "POST":
+                        response = requests.post(url, headers=headers, json=data, timeout=timeout)
+                    else:
+                        raise ValueError(f"Unsupported HTTP method: {method}")
                     
-                print(f"Response status: {response.status_code}")
+                    logger.debug("Response status: %s", response.status_code)
                 
-                if response.status_code in [200, 201]:
-                    return response.json()
-                else:
-                    print(f"Error response: {response.text}")
-                    return None
+                    if response.status_code in [200, 201]:
+                        return response.json()
+                    else:
+                        logger.error("Error response: %s", response.text)
+                        return None
                 
         except Exception as e:
-            print(f"Request error: {e}")
+            logger.error("Request error: %s", e)
             return None
             
     def get_all_orders(self) -> List[Dict]:
@@ -209,7 +276,7 @@ class APIHandler:
             return {}
             
         except Exception as e:
-            print(f"Error getting order details: {str(e)}")
+            logger.error("Error getting order details: %s", e)
             return {}
         
     def submit_quality_check(self, data: Dict) -> Optional[Dict]:
@@ -233,7 +300,7 @@ class APIHandler:
             response = self._make_request(APIEndpoints.DOCUMENTS_BY_ORDER, params=params)
             
             # Print response for debugging
-            print(f"Document versions response: {response}")
+            logger.debug("Document versions response: %s", response)
             
             # Extract versions from the response structure
             if isinstance(response, dict):
@@ -253,7 +320,7 @@ class APIHandler:
             return []
             
         except Exception as e:
-            print(f"Error getting document versions: {str(e)}")
+            logger.error("Error getting document versions: %s", e)
             return []
 
     def download_latest_document(self, production_order: str, save_path: str) -> bool:
@@ -279,29 +346,31 @@ class APIHandler:
                 "Accept": "application/pdf"
             }
             
-            print(f"Downloading document from: {url}")
+            logger.debug("Downloading document from: %s", url)
             # print(f"Headers: {headers}")
             
-            response = requests.get(
-                url,
-                params=params,
-                headers=headers,
-                stream=True  # Stream the response for large files
-            )
-            response.raise_for_status()
-            
-            # Save the file
-            with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
-            return True
+            return self._stream_to_file(url, save_path, params=params)
             
         except Exception as e:
-            print(f"Error downloading document: {str(e)}")
+            logger.error("Error downloading document: %s", e)
             return False
 
+    def get_latest_document(self, production_order: str) -> Optional[bytes]:
+        """
+        Download the latest version of a document into memory
+        
+        Args:
+            production_order: Production order number
+            
+        Returns:
+            PDF bytes, ready for fitz.open(stream=...), or None on failure
+        """
+        params = {
+            'part_number': production_order,
+            'doc_type_id': 17
+        }
+        return self._stream_download(f"{self.base_url}{APIEndpoints.DOCUMENT_DOWNLOAD}", params=params)
+
     def download_specific_version(self, doc_id: int, version_id: int, save_path: str) -> bool:
         """
         Download a specific version of a document
@@ -326,33 +395,103 @@ class APIHandler:
                 "Accept": "application/pdf"
             }
             
-            print(f"Downloading specific version from: {url}")
+            logger.debug("Downloading specific version from: %s", url)
             
-            response = requests.get(
-                url,
-                headers=headers,
-                stream=True
-            )
-            response.raise_for_status()
+            return self._stream_to_file(url, save_path)
+            
+        except Exception as e:
+            logger.error("Error downloading specific version: %s", e)
+            return False
+
+    def get_document_version(self, doc_id: int, version_id: int) -> Optional[bytes]:
+        """
+        Download a specific version of a document into memory
+        
+        Args:
+            doc_id: Document ID
+            version_id: Version ID
             
-            # Save the file
+        Returns:
+            PDF bytes, ready for fitz.open(stream=...), or None on failure
+        """
+        endpoint = APIEndpoints.DOCUMENT_VERSION_DOWNLOAD.format(
+            doc_id=doc_id,
+            version_id=version_id
+        )
+        return self._stream_download(f"{self.base_url}{endpoint}")
+
+    def get_engineering_drawing(self, part_number: str) -> Optional[bytes]:
+        """
+        Download the latest engineering drawing for a part number into memory
+        
+        Returns:
+            PDF bytes, ready for fitz.open(stream=...), or None on failure
+        """
+        endpoint = APIEndpoints.ENGINEERING_DRAWING.format(part_number=part_number)
+        return self._stream_download(f"{self.base_url}{endpoint}")
+
+    def _stream_download(self, url: str, params: Optional[Dict] = None,
+                         timeout: Optional[float] = None) -> Optional[bytes]:
+        """Stream a PDF response into a single in-memory buffer"""
+        return self._conditional_download(url, params, timeout=timeout).content
+
+    @perf.timed('api.stream_download')
+    def _conditional_download(self, url: str, params: Optional[Dict] = None,
+                              etag: Optional[str] = None, last_modified: Optional[str] = None,
+                              timeout: Optional[float] = None) -> ConditionalDownload:
+        """Stream a PDF response into memory, unless it still matches the given validators (304)"""
+        try:
+            headers = {
+                "Authorization": f"Bearer {self.token}",
+                "Accept": "application/pdf"
+            }
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            with requests.get(url, headers=headers, params=params, stream=True, timeout=timeout) as response:
+                logger.debug("Download response status: %s", response.status_code)
+                validators = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+                if response.status_code == 304 and (etag or last_modified):
+                    return ConditionalDownload(not_modified=True, **validators)
+                if response.status_code != 200:
+                    logger.error("Download failed: %s", response.text)
+                    return ConditionalDownload()
+
+                buffer = bytearray()
+                for chunk in response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
+                    if chunk:
+                        buffer += chunk
+                return ConditionalDownload(content=bytes(buffer), **validators)
+
+        except Exception as e:
+            logger.error("Error downloading %s: %s", url, e)
+            return ConditionalDownload()
+
+    @perf.timed('api.stream_to_file')
+    def _stream_to_file(self, url: str, save_path: str, params: Optional[Dict] = None) -> bool:
+        """Stream a PDF response to disk without holding it all in memory"""
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/pdf"
+        }
+        with requests.get(url, headers=headers, params=params, stream=True) as response:
+            response.raise_for_status()
             with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+                for chunk in response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
                     if chunk:
                         f.write(chunk)
-            
-            return True
-            
-        except Exception as e:
-            print(f"Error downloading specific version: {str(e)}")
-            return False
+        return True
 
-    def get_operations(self, part_number: str) -> List[Dict]:
+    def get_operations(self, part_number: str, timeout: Optional[float] = None) -> List[Dict]:
         """Get operations for a part number"""
         try:
             # Build the URL with query parameters
             endpoint = f"/planning/search_order?part_number={part_number}"
-            response = self._make_request(endpoint)
+            response = self._make_request(endpoint, timeout=timeout)
             
             if response and response.get("orders"):
                 if response["orders"][0].get("operations"):
@@ -363,46 +502,49 @@ class APIHandler:
             return []
             
         except Exception as e:
-            print(f"Error getting operations: {str(e)}")
+            logger.error("Error getting operations: %s", e)
             return []
 
-    def get_ipid_drawing(self, production_order: str, operation_number: str) -> Optional[bytes]:
+    def get_ipid_drawing(self, production_order: str, operation_number: str,
+                         timeout: Optional[float] = None) -> Optional[bytes]:
         """
         Get IPID drawing using the new endpoint
         """
+        return self.get_ipid_drawing_if_modified(production_order, operation_number, timeout=timeout).content
+
+    def get_ipid_drawing_if_modified(self, production_order: str, operation_number: str,
+                                     etag: Optional[str] = None, last_modified: Optional[str] = None,
+                                     timeout: Optional[float] = None) -> ConditionalDownload:
+        """
+        Get IPID drawing in one conditional GET, revalidating a cached copy
+
+        Args:
+            etag: ETag of the cached copy, sent as If-None-Match
+            last_modified: Last-Modified of the cached copy, sent as If-Modified-Since
+
+        Returns:
+            not_modified when the cached copy is still current, else the new drawing
+            (content None on failure), with the response's validators
+        """
         try:
-            print(f"\nAPI get_ipid_drawing called with:")
-            print(f"Production Order: {production_order}")
-            print(f"Operation Number: {operation_number}")
-            
-            headers = {
-                'Authorization': f'Bearer {self.token}',
-                'Accept': 'application/pdf'
-            }
+            logger.debug("API get_ipid_drawing called with:")
+            logger.debug("Production Order: %s", production_order)
+            logger.debug("Operation Number: %s", operation_number)
             
             url = f"{self.base_url}{APIEndpoints.IPID_DRAWING.format(production_order=production_order)}"
             params = {
                 'operation_number': operation_number
             }
             
-            print(f"Making request to: {url}")
-            print(f"With params: {params}")
+            logger.debug("Making request to: %s", url)
+            logger.debug("With params: %s", params)
             
-            response = requests.get(url, headers=headers, params=params)
-            
-            print(f"Response status code: {response.status_code}")
-            if response.status_code != 200:
-                print(f"Response text: {response.text}")
-            
-            if response.status_code == 200:
-                return response.content
-            
-            print(f"Failed to get IPID drawing: {response.text}")
-            return None
+            return self._conditional_download(url, params=params, etag=etag, last_modified=last_modified,
+                                              timeout=timeout)
             
         except Exception as e:
-            print(f"Error getting IPID drawing: {str(e)}")
-            return None
+            logger.error("Error getting IPID drawing: %s", e)
+            return ConditionalDownload()
 
     def check_token_valid(self) -> bool:
         """Check if current token is valid"""
@@ -427,10 +569,10 @@ class APIHandler:
             
             if response and isinstance(response, dict):
                 self.operator_id = response.get('id')
-                print(f"Operator ID set to: {self.operator_id}")
+                logger.info("Operator ID set to: %s", self.operator_id)
             
         except Exception as e:
-            print(f"Error fetching operator ID: {str(e)}")
+            logger.error("Error fetching operator ID: %s", e)
 
     def get_operator_id(self) -> Optional[int]:
         """Get the operator ID for the logged-in user"""
@@ -444,13 +586,13 @@ class APIHandler:
             
             if response and isinstance(response, dict):
                 role = response.get('role_name', '').lower()
-                print(f"User role: {role}")
+                logger.info("User role: %s", role)
                 return role
             
             return None
             
         except Exception as e:
-            print(f"Error fetching user role: {str(e)}")
+            logger.error("Error fetching user role: %s", e)
             return None
 
     def get_inventory_categories(self) -> Optional[List[Dict]]:
@@ -461,7 +603,7 @@ class APIHandler:
                 return response
             return None
         except Exception as e:
-            print(f"Error fetching inventory categories: {str(e)}")
+            logger.error("Error fetching inventory categories: %s", e)
             return None
 
     def get_inventory_subcategories(self, category_id: int) -> Optional[List[Dict]]:
@@ -472,7 +614,7 @@ class APIHandler:
                 return response
             return None
         except Exception as e:
-            print(f"Error fetching inventory subcategories: {str(e)}")
+            logger.error("Error fetching inventory subcategories: %s", e)
             return None
 
     def get_inventory_items(self, subcategory_id: int) -> Optional[List[Dict]]:
@@ -483,7 +625,7 @@ class APIHandler:
                 return response
             return None
         except Exception as e:
-            print(f"Error fetching inventory items: {str(e)}")
+            logger.error("Error fetching inventory items: %s", e)
             return None
 
     def logout(self) -> bool:
@@ -497,59 +639,284 @@ class APIHandler:
             
             return True
         except Exception as e:
-            print(f"Error during logout: {str(e)}")
+            logger.error("Error during logout: %s", e)
             return False
 
-    def create_master_boc(self, payload: dict) -> Optional[dict]:
+    @perf.timed('api.create_master_boc')
+    def create_master_boc(self, payload: dict, failure_callback=None,
+                          idempotency_key: Optional[str] = None) -> Optional[dict]:
         """Create master BOC entry"""
         try:
             response = requests.post(
                 f"{self.base_url}{APIEndpoints.QUALITY_MASTER_BOC}",
                 json=payload,
-                headers={
-                    "Authorization": f"Bearer {self.token}",
-                    "Content-Type": "application/json"
-                }
+                headers=self._create_headers([idempotency_key]),
+                timeout=self.CREATE_TIMEOUT
             )
             
-            print(f"Master BOC Response: {response.status_code}")
-            print(f"Response content: {response.text}")
+            logger.debug("Master BOC Response: %s", response.status_code)
+            logger.debug("Response content: %s", response.text)
             
             if response.status_code in [200, 201]:
                 return response.json()
             
-            print(f"Failed to create master BOC: {response.text}")
+            logger.error("Failed to create master BOC: %s", response.text)
+            if failure_callback:
+                failure_callback(response.text, self.is_permanent_failure(response.status_code))
             return None
             
         except Exception as e:
-            print(f"Error creating master BOC: {str(e)}")
+            logger.error("Error creating master BOC: %s", e)
+            if failure_callback:
+                failure_callback(str(e), False)
             return None
 
-    def create_stage_inspection(self, payload: dict) -> Optional[dict]:
+    @perf.timed('api.create_stage_inspection')
+    def create_stage_inspection(self, payload: dict, failure_callback=None,
+                                idempotency_key: Optional[str] = None) -> Optional[dict]:
         """Create stage inspection entry"""
         try:
             response = requests.post(
-                f"{self.base_url}/quality/stage-inspection/",
+                f"{self.base_url}{APIEndpoints.QUALITY_STAGE_INSPECTION}",
                 json=payload,
-                headers={
-                    "Authorization": f"Bearer {self.token}",
-                    "Content-Type": "application/json"
-                }
+                headers=self._create_headers([idempotency_key]),
+                timeout=self.CREATE_TIMEOUT
             )
             
-            print(f"Stage Inspection Response: {response.status_code}")
-            print(f"Response content: {response.text}")
+            logger.debug("Stage Inspection Response: %s", response.status_code)
+            logger.debug("Response content: %s", response.text)
             
             if response.status_code in [200, 201]:
                 return response.json()
             
-            print(f"Failed to create stage inspection: {response.text}")
+            logger.error("Failed to create stage inspection: %s", response.text)
+            if failure_callback:
+                failure_callback(response.text, self.is_permanent_failure(response.status_code))
             return None
             
         except Exception as e:
-            print(f"Error creating stage inspection: {str(e)}")
+            logger.error("Error creating stage inspection: %s", e)
+            if failure_callback:
+                failure_callback(str(e), False)
             return None
 
+    def create_master_boc_bulk(self, payloads: List[dict],
+                               progress_callback: Optional[Callable[[int, int], None]] = None,
+                               cancel_check: Optional[Callable[[], bool]] = None,
+                               failure_callback: Optional[Callable[[int, str, bool], None]] = None,
+                               idempotency_keys: Optional[List[str]] = None,
+                               unsent_callback: Optional[Callable[[int], None]] = None) -> List[Optional[dict]]:
+        """
+        Create many master BOC entries
+
+        Args:
+            payloads: List of payloads as built by prepare_master_boc_payload
+            progress_callback: Optional callable(done, total) invoked after each chunk
+            cancel_check: Optional callable returning True to stop before the next chunk
+            failure_callback: Optional callable(index, error, permanent) invoked for each row
+                that was sent and not created; permanent is True when the backend rejected it
+            idempotency_keys: Optional key per payload, sent in the Idempotency-Key header
+            unsent_callback: Optional callable(index) invoked for each row never sent because
+                of cancel_check
+
+        Returns:
+            One result per payload, in order; None marks a failed or unsent row
+        """
+        return self._bulk_create(
+            APIEndpoints.QUALITY_MASTER_BOC_BULK,
+            self.create_master_boc,
+            payloads,
+            progress_callback,
+            cancel_check,
+            failure_callback,
+            idempotency_keys,
+            unsent_callback
+        )
+
+    def create_stage_inspection_bulk(self, payloads: List[dict],
+                                     progress_callback: Optional[Callable[[int, int], None]] = None,
+                                     cancel_check: Optional[Callable[[], bool]] = None,
+                                     failure_callback: Optional[Callable[[int, str, bool], None]] = None,
+                                     idempotency_keys: Optional[List[str]] = None,
+                                     unsent_callback: Optional[Callable[[int], None]] = None) -> List[Optional[dict]]:
+        """
+        Create many stage inspection entries
+
+        Args:
+            payloads: List of payloads as built by prepare_stage_inspection_payload
+            progress_callback: Optional callable(done, total) invoked after each chunk
+            cancel_check: Optional callable returning True to stop before the next chunk
+            failure_callback: Optional callable(index, error, permanent) invoked for each row
+                that was sent and not created; permanent is True when the backend rejected it
+            idempotency_keys: Optional key per payload, sent in the Idempotency-Key header
+            unsent_callback: Optional callable(index) invoked for each row never sent because
+                of cancel_check
+
+        Returns:
+            One result per payload, in order; None marks a failed or unsent row
+        """
+        return self._bulk_create(
+            APIEndpoints.QUALITY_STAGE_INSPECTION_BULK,
+            self.create_stage_inspection,
+            payloads,
+            progress_callback,
+            cancel_check,
+            failure_callback,
+            idempotency_keys,
+            unsent_callback
+        )
+
+    def _create_headers(self, idempotency_keys: Optional[List[str]] = None) -> Dict[str, str]:
+        """Headers of a create request, with the rows' idempotency keys, comma-separated in payload order"""
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json"
+        }
+        keys = idempotency_keys or []
+        if keys and all(keys):
+            # Per row rather than per request, so a row resent in a different chunk is still recognised
+            headers[self.IDEMPOTENCY_HEADER] = ",".join(keys)
+        return headers
+
+    @staticmethod
+    def is_permanent_failure(status_code: int) -> bool:
+        """True for a response rejecting the request itself, which sending it again won't change"""
+        return 400 <= status_code < 500 and status_code not in APIHandler.RETRYABLE_CLIENT_ERRORS
+
+    def _bulk_create(self, bulk_endpoint: str, create_one: Callable[..., Optional[dict]],
+                     payloads: List[dict], progress_callback=None, cancel_check=None,
+                     failure_callback=None, idempotency_keys=None,
+                     unsent_callback=None) -> List[Optional[dict]]:
+        """Send payloads in chunks to a bulk endpoint, or to a bounded pool of single POSTs if it doesn't exist
+
+        Only an unsupported bulk endpoint falls back to single POSTs, including one that
+        rejects the first chunk sent to it before it has ever worked. Any other failure may
+        have been committed in part, so its rows are reported failed (see failure_callback)
+        for the outbox to resend with their idempotency keys instead.
+        """
+        results: List[Optional[dict]] = [None] * len(payloads)
+        total = len(payloads)
+        done = 0
+        keys = list(idempotency_keys) if idempotency_keys else [None] * total
+
+        def report(index, error, permanent):
+            if failure_callback:
+                try:
+                    failure_callback(index, error, permanent)
+                except Exception as e:
+                    logger.error("Error in bulk failure callback: %s", e)
+
+        for start in range(0, total, self.BULK_CHUNK_SIZE):
+            if cancel_check and cancel_check():
+                logger.debug("Bulk create cancelled after %s of %s rows", done, total)
+                if unsent_callback:
+                    for index in range(start, total):
+                        try:
+                            unsent_callback(index)
+                        except Exception as e:
+                            logger.error("Error in bulk unsent callback: %s", e)
+                break
+
+            chunk = payloads[start:start + self.BULK_CHUNK_SIZE]
+            chunk_keys = keys[start:start + self.BULK_CHUNK_SIZE]
+
+            chunk_results = None
+            if self._bulk_supported.get(bulk_endpoint, True):
+                chunk_results = self._post_bulk_chunk(
+                    bulk_endpoint, chunk, chunk_keys,
+                    lambda offset, error, permanent, start=start: report(start + offset, error, permanent)
+                )
+
+            if chunk_results is None:
+                def create(indexed, start=start):
+                    offset, payload = indexed
+                    return create_one(
+                        payload,
+                        failure_callback=lambda error, permanent: report(start + offset, error, permanent),
+                        idempotency_key=keys[start + offset]
+                    )
+
+                with ThreadPoolExecutor(max_workers=self.BULK_MAX_WORKERS) as executor:
+                    chunk_results = list(executor.map(create, enumerate(chunk)))
+
+            results[start:start + len(chunk)] = chunk_results
+            done += len(chunk)
+            if progress_callback:
+                try:
+                    progress_callback(done, total)
+                except Exception as e:
+                    logger.error("Error in bulk progress callback: %s", e)
+
+        return results
+
+    @perf.timed('api.post_bulk_chunk')
+    def _post_bulk_chunk(self, bulk_endpoint: str, chunk: List[dict], chunk_keys: List[Optional[str]],
+                         failure_callback: Callable[[int, str, bool], None]) -> Optional[List[Optional[dict]]]:
+        """
+        POST one chunk to a bulk endpoint
+
+        Returns:
+            One result per row, None for a row that was not created (reported through
+            failure_callback(offset, error, permanent)); or None when the endpoint doesn't
+            exist and the caller should fall back to single POSTs
+        """
+        def fail_all(error, permanent):
+            for offset in range(len(chunk)):
+                failure_callback(offset, error, permanent)
+            return [None] * len(chunk)
+
+        try:
+            response = requests.post(
+                f"{self.base_url}{bulk_endpoint}",
+                json=chunk,
+                headers=self._create_headers(chunk_keys),
+                timeout=self.BULK_TIMEOUT
+            )
+            logger.debug("Bulk create response (%s rows): %s", len(chunk), response.status_code)
+
+            if response.status_code in [404, 405, 501]:
+                # No bulk endpoint on this backend, don't try it again this session
+                self._bulk_supported[bulk_endpoint] = False
+                return None
+
+            if response.status_code not in [200, 201]:
+                permanent = self.is_permanent_failure(response.status_code)
+                if permanent and not self._bulk_supported.get(bulk_endpoint):
+                    # A provisional endpoint that has never worked is more likely wrong than
+                    # the rows; a 4xx committed nothing, so the single POSTs can judge them
+                    logger.warning("Bulk endpoint %s rejected its first chunk (%s), using single POSTs: %s",
+                                   bulk_endpoint, response.status_code, response.text)
+                    self._bulk_supported[bulk_endpoint] = False
+                    return None
+                logger.error("Bulk create failed: %s", response.text)
+                return fail_all(response.text, permanent)
+
+            self._bulk_supported[bulk_endpoint] = True
+
+            data = response.json()
+            if isinstance(data, dict):
+                data = data.get('results', data)
+
+            if isinstance(data, list) and len(data) == len(chunk):
+                results = []
+                for offset, item in enumerate(data):
+                    if item is None or (isinstance(item, dict) and item.get('error')):
+                        # The backend looked at this row and refused it
+                        failure_callback(offset, str(item.get('error') if item else "Rejected"), True)
+                        results.append(None)
+                    else:
+                        results.append(item)
+                return results
+
+            # Accepted as a whole without per-row detail: a receipt per row rather than copies of the response
+            logger.debug("Bulk create returned no per-row results: %s", data)
+            return [{'accepted': True, 'idempotency_key': key} for key in chunk_keys]
+
+        except Exception as e:
+            logger.error("Error in bulk create: %s", e)
+            return fail_all(str(e), False)
+
+    @perf.timed('api.get_calibrations')
     def get_calibrations(self) -> Optional[List[Dict]]:
         """Get all calibration data with fresh data every time"""
         try:
@@ -571,14 +938,15 @@ class APIHandler:
             if response.status_code == 200:
                 return response.json()
             else:
-                print(f"Error fetching calibrations: Status {response.status_code}")
-                print(f"Response: {response.text}")
+                logger.error("Error fetching calibrations: Status %s", response.status_code)
+                logger.debug("Response: %s", response.text)
                 return None
                 
         except Exception as e:
-            print(f"Error fetching calibrations: {str(e)}")
+            logger.error("Error fetching calibrations: %s", e)
             return None
 
+    @perf.timed('api.upload_ballooned_drawing')
     def upload_ballooned_drawing(self, production_order: str, ipid: str, file_path: str) -> bool:
         """Upload ballooned drawing to Minio"""
         try:
@@ -606,15 +974,16 @@ class APIHandler:
                 }
                 
                 response = requests.post(url, headers=headers, data=data, files=files)
-                print(f"Upload response status: {response.status_code}")
-                print(f"Upload response: {response.text}")
+                logger.debug("Upload response status: %s", response.status_code)
+                logger.debug("Upload response: %s", response.text)
                 
                 return response.status_code in [200, 201]
                 
         except Exception as e:
-            print(f"Error uploading ballooned drawing: {str(e)}")
+            logger.error("Error uploading ballooned drawing: %s", e)
             return False
 
+    @perf.timed('api.upload_inspection_report')
     def upload_inspection_report(self, production_order: str, operation_number: str, file_path: str, folder_path: str, document_name: str, description: str = "") -> bool:
         """Upload inspection report PDF to server"""
         try:
@@ -639,13 +1008,13 @@ class APIHandler:
                 }
                 
                 response = requests.post(url, headers=headers, data=data, files=files)
-                print(f"Report upload response status: {response.status_code}")
-                print(f"Report upload response: {response.text}")
+                logger.debug("Report upload response status: %s", response.status_code)
+                logger.debug("Report upload response: %s", response.text)
                 
                 return response.status_code in [200, 201]
                 
         except Exception as e:
-            print(f"Error uploading inspection report: {str(e)}")
+            logger.error("Error uploading inspection report: %s", e)
             return False
 
     def get_report_structure(self):
@@ -653,14 +1022,15 @@ class APIHandler:
         try:
             return self._make_request(APIEndpoints.REPORT_STRUCTURE)
         except Exception as e:
-            print(f"Error getting report structure: {str(e)}")
+            logger.error("Error getting report structure: %s", e)
             return None
 
+    @perf.timed('api.create_report_folder')
     def create_report_folder(self, name: str, parent_id: int = 0) -> dict:
         """Create a new folder in the report structure"""
         try:
             if not self.token:
-                print("Error: No authentication token available")
+                logger.error("Error: No authentication token available")
                 return None
                 
             url = f"{self.base_url}{APIEndpoints.REPORT_FOLDER_CREATE}"
@@ -674,29 +1044,30 @@ class APIHandler:
                 "parent_id": parent_id
             }
             
-            print(f"Creating folder with data: {data}")
-            print(f"Using URL: {url}")
-            print(f"With headers: {headers}")
+            logger.debug("Creating folder with data: %s", data)
+            logger.debug("Using URL: %s", url)
+            logger.debug("With headers: %s", headers)
             
             response = requests.post(url, headers=headers, json=data)
-            print(f"Create folder response: {response.status_code}")
-            print(f"Response content: {response.text}")
+            logger.debug("Create folder response: %s", response.status_code)
+            logger.debug("Response content: %s", response.text)
             
             if response.status_code in [200, 201]:
                 return response.json()
             elif response.status_code == 404:
-                print("Error: Folder creation endpoint not found. Please check the API endpoint URL.")
+                logger.error("Error: Folder creation endpoint not found. Please check the API endpoint URL.")
             elif response.status_code == 401:
-                print("Error: Unauthorized. Please check your authentication token.")
+                logger.error("Error: Unauthorized. Please check your authentication token.")
             else:
-                print(f"Error: Unexpected status code {response.status_code}")
+                logger.error("Error: Unexpected status code %s", response.status_code)
                 
             return None
             
         except Exception as e:
-            print(f"Error creating report folder: {str(e)}")
+            logger.error("Error creating report folder: %s", e)
             return None
 
+    @perf.timed('api.check_quantity_completion')
     def check_quantity_completion(self, order_id: int, ipid: str) -> bool:
         """Check if a quantity is completed for a given order and IPID"""
         try:
@@ -709,8 +1080,8 @@ class APIHandler:
                 }
             )
             
-            print(f"Quantity completion check response: {response.status_code}")
-            print(f"Response content: {response.text}")
+            logger.debug("Quantity completion check response: %s", response.status_code)
+            logger.debug("Response content: %s", response.text)
             
             if response.status_code == 200:
                 data = response.json()
@@ -719,8 +1090,130 @@ class APIHandler:
             return False
             
         except Exception as e:
-            print(f"Error checking quantity completion: {str(e)}")
+            logger.error("Error checking quantity completion: %s", e)
             return False
 
+
+class InventoryRepository:
+    """Cached view of the instrument inventory with indexed lookups
+
+    Subcategories of the instruments category are fetched first, then the items of
+    every subcategory concurrently. The result is kept for CACHE_TTL seconds and
+    indexed by instrument code, item id and Bluetooth address, so callers don't have
+    to walk the whole inventory. Call invalidate() after changing an item.
+    """
+    INSTRUMENTS_CATEGORY_ID = 2
+    CACHE_TTL = 300.0
+    MAX_WORKERS = 6
+
+    def __init__(self, handler: APIHandler):
+        self.handler = handler
+        self._lock = threading.RLock()
+        self._loaded_at = 0.0
+        self._subcategories: List[Dict] = []
+        self._entries: List[Tuple[Dict, Dict]] = []
+        self._by_code: Dict[str, Tuple[Dict, Dict]] = {}
+        self._by_id: Dict[int, Tuple[Dict, Dict]] = {}
+        self._by_address: Dict[str, Tuple[Dict, Dict]] = {}
+
+    def get_subcategories(self, force_refresh: bool = False) -> List[Dict]:
+        """Instrument subcategories"""
+        self._ensure_loaded(force_refresh)
+        return list(self._subcategories)
+
+    def get_instrument_items(self, force_refresh: bool = False) -> List[Tuple[Dict, Dict]]:
+        """(subcategory, item) for every instrument, in subcategory order"""
+        self._ensure_loaded(force_refresh)
+        return list(self._entries)
+
+    def find_by_instrument_code(self, instrument_code: str) -> Optional[Tuple[Dict, Dict]]:
+        """(subcategory, item) for an exact instrument code, or None"""
+        self._ensure_loaded()
+        return self._by_code.get((instrument_code or '').strip())
+
+    def get_item(self, item_id: int) -> Optional[Tuple[Dict, Dict]]:
+        """(subcategory, item) for an inventory item id, or None"""
+        self._ensure_loaded()
+        return self._by_id.get(item_id)
+
+    def find_by_bluetooth_address(self, address: str) -> Optional[Tuple[Dict, Dict]]:
+        """(subcategory, item) associated with a Bluetooth address, or None"""
+        self._ensure_loaded()
+        return self._by_address.get(self.normalize_address(address))
+
+    def known_bluetooth_addresses(self) -> List[str]:
+        """Every Bluetooth address associated with an instrument"""
+        self._ensure_loaded()
+        return list(self._by_address)
+
+    @property
+    def loaded_at(self) -> float:
+        """When the cached inventory was last fetched; changes on every refresh"""
+        return self._loaded_at
+
+    def invalidate(self):
+        """Drop the cached inventory; the next lookup fetches it again"""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    @staticmethod
+    def normalize_address(address: Optional[str]) -> str:
+        return (address or '').strip().upper()
+
+    def _ensure_loaded(self, force_refresh: bool = False):
+        with self._lock:
+            if not force_refresh and self._loaded_at and time.time() - self._loaded_at < self.CACHE_TTL:
+                return
+            self._load()
+
+    def _load(self):
+        """Fetch subcategories and their items and rebuild the indexes"""
+        subcategories = self.handler.get_inventory_subcategories(self.INSTRUMENTS_CATEGORY_ID)
+        if not subcategories:
+            # Keep serving what we had if the server can't be reached
+            logger.error("Error refreshing inventory: no subcategories returned")
+            return
+
+        subcategories = [
+            subcategory for subcategory in subcategories
+            if subcategory.get('category_id') == self.INSTRUMENTS_CATEGORY_ID
+        ]
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            item_lists = list(executor.map(
+                lambda subcategory: self.handler.get_inventory_items(subcategory['id']),
+                subcategories
+            ))
+
+        entries = []
+        by_code, by_id, by_address = {}, {}, {}
+        for subcategory, items in zip(subcategories, item_lists):
+            for item in items or []:
+                entry = (subcategory, item)
+                entries.append(entry)
+                dynamic_data = item.get('dynamic_data') or {}
+
+                address = self.normalize_address(dynamic_data.get('Bluetooth Address'))
+                if address:
+                    by_address.setdefault(address, entry)
+                if item.get('id') is not None:
+                    by_id[item['id']] = entry
+
+                instrument_code = (dynamic_data.get('Instrument code') or '').strip()
+                if instrument_code:
+                    # Of duplicate codes, prefer the item that has a device associated
+                    existing = by_code.get(instrument_code)
+                    if existing is None or (address and not (existing[1].get('dynamic_data') or {}).get('Bluetooth Address')):
+                        by_code[instrument_code] = entry
+
+        self._subcategories = subcategories
+        self._entries = entries
+        self._by_code = by_code
+        self._by_id = by_id
+        self._by_address = by_address
+        self._loaded_at = time.time()
+        logger.info("Loaded %s instruments from %s subcategories", len(entries), len(subcategories))
+
+
 # Create singleton instance
-api = APIHandler()
\ No newline at end of file
+api = APIHandler()
+inventory = InventoryRepository(api)
\ No newline at end of file
@@ -0,0 +1,173 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import traceback
+
+
+LOG_FILE = 'smart_metrology.log'
+ERROR_LOG_FILE = 'error.log'
+LOG_FORMAT = '%(asctime)s %(levelname)-7s [%(threadName)s] %(name)s: %(message)s'
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+
+# Root level, and per-module overrides as "module=LEVEL,module=LEVEL"
+LEVEL_ENV = 'SMARTMETROLOGY_LOG_LEVEL'
+MODULE_LEVELS_ENV = 'SMARTMETROLOGY_LOG_LEVELS'
+DEFAULT_LEVEL = 'INFO'
+CONSOLE_LEVEL = logging.WARNING
+
+# The same traceback is written once per window; repeats are counted instead
+TRACEBACK_WINDOW = 60.0
+
+# Chatty third-party loggers kept quiet unless asked for
+QUIET_LOGGERS = {'urllib3': 'WARNING', 'bleak': 'WARNING', 'PIL': 'WARNING', 'ultralytics': 'WARNING'}
+
+
+class Lazy:
+    """Defers an expensive log argument until a handler actually formats the record
+
+    logger.debug("Response: %s", Lazy(json.dumps, response, indent=2))
+    """
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.func(*self.args, **self.kwargs))
+
+
+class RepeatedTracebackFilter(logging.Filter):
+    """Drops a traceback already logged within the window, and notes how many were dropped
+
+    Records are keyed by logger, message template, exception type and the frames of the
+    traceback, so the same failure from the same place is collapsed while a different
+    failure still gets through.
+    """
+
+    def __init__(self, window: float = TRACEBACK_WINDOW):
+        super().__init__()
+        self.window = window
+        self._lock = threading.Lock()
+        self._seen = {}
+
+    def filter(self, record):
+        if not record.exc_info or not record.exc_info[1]:
+            return True
+
+        exctype, value, tb = record.exc_info
+        frames = tuple((frame.filename, frame.lineno) for frame in traceback.extract_tb(tb))
+        key = (record.name, record.msg, exctype, frames)
+        now = time.monotonic()
+
+        with self._lock:
+            first_seen, suppressed = self._seen.get(key, (None, 0))
+            if first_seen is not None and now - first_seen < self.window:
+                self._seen[key] = (first_seen, suppressed + 1)
+                return False
+            self._seen[key] = (now, 0)
+            if len(self._seen) > 1000:
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+
+        if suppressed:
+            record.msg = f"{record.msg} (identical traceback suppressed {suppressed} times)"
+        return True
+
+
+class _ListenerHandle:
+    def __init__(self):
+        self.listener = None
+        self.lock = threading.Lock()
+
+
+_handle = _ListenerHandle()
+
+
+def _parse_module_levels(spec):
+    levels = {}
+    for part in (spec or '').split(','):
+        name, sep, level = part.partition('=')
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = None, module_levels: dict = None, log_dir: str = None):
+    """
+    Route every logger through a queue to a background thread that writes the log files
+
+    Callers only format the message and put it on the queue; file and console I/O
+    happen on the listener thread. Safe to call more than once; later calls only
+    adjust levels.
+
+    Args:
+        level: Root level name; defaults to $SMARTMETROLOGY_LOG_LEVEL, then INFO
+        module_levels: Logger name to level name; merged over $SMARTMETROLOGY_LOG_LEVELS
+        log_dir: Directory for the log files; defaults to the working directory
+    """
+    level = (level or os.environ.get(LEVEL_ENV) or DEFAULT_LEVEL).upper()
+    levels = dict(QUIET_LOGGERS)
+    levels.update(_parse_module_levels(os.environ.get(MODULE_LEVELS_ENV)))
+    levels.update(module_levels or {})
+
+    root = logging.getLogger()
+    try:
+        root.setLevel(level)
+    except ValueError:
+        root.setLevel(DEFAULT_LEVEL)
+    for name, module_level in levels.items():
+        try:
+            logging.getLogger(name).setLevel(module_level)
+        except ValueError:
+            pass
+
+    with _handle.lock:
+        if _handle.listener is not None:
+            return
+
+        log_dir = log_dir or os.getcwd()
+        formatter = logging.Formatter(LOG_FORMAT)
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(log_dir, LOG_FILE), maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
+
+        error_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(log_dir, ERROR_LOG_FILE), maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding='utf-8'
+        )
+        error_handler.setLevel(logging.ERROR)
+        error_handler.setFormatter(formatter)
+
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(CONSOLE_LEVEL)
+        console_handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(RepeatedTracebackFilter())
+
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+
+        _handle.listener = logging.handlers.QueueListener(
+            log_queue, file_handler, error_handler, console_handler, respect_handler_level=True
+        )
+        _handle.listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush the queue and stop the listener thread"""
+    with _handle.lock:
+        if _handle.listener is None:
+            return
+        _handle.listener.stop()
+        _handle.listener = None
@@ -0,0 +1,201 @@
+import numpy as np
+import pytest
+
+from algorithms import ClusterDetector, DimensionParser, PageProcessor, ZoneDetector
+from benchmarks.drawing_generator import detections, generate_drawing
+from benchmarks.synthetic import synthetic_spans
+from highlight_manager import HighlightManager
+
+
+SPAN_COUNTS = [100, 1000, 10000]
+# Full clustering renders the scene for every zone lookup, so it stays at drawing-sized inputs
+DETECTION_COUNTS = [100, 1000]
+YOLO_CLASSES = {0: 'A', 1: 'B', 2: 'C', 3: 'D'}
+# Generated drawings at normal, 10x and 100x dimension density
+DENSITIES = [1, 10, 100]
+ZONE_SAMPLES = 20
+
+
+def rounds_for(count):
+    """Fewer rounds for larger inputs, so 10k spans doesn't take the whole run"""
+    return max(1, 1000 // count)
+
+
+def stacked_recall(clustered, ground_truth):
+    """Share of the stacked-tolerance dimensions that cluster_tolerances combined correctly"""
+    expected = set()
+    for dimension in ground_truth['dimensions']:
+        if dimension['kind'] != 'stacked':
+            continue
+        # Horizontal clusters are joined as 'N + u - l', vertical ones as 'N +u -l'
+        separator = ' ' if dimension['orientation'] == 'horizontal' else ''
+        expected.add(f"{dimension['nominal']} +{separator}{dimension['upper_tol'][1:]} "
+                     f"-{separator}{dimension['lower_tol'][1:]}")
+    if not expected:
+        return 1.0
+    return len(expected & {item['text'] for item in clustered}) / len(expected)
+
+
+def gdt_yolo_detections(ground_truth):
+    """YOLO detections standing in for the model, one per GD&T frame of the ground truth"""
+    results = []
+    for index, frame in enumerate(ground_truth['gdt_frames']):
+        (x1, y1), _, (x2, y2), _ = frame['box']
+        results.append({'box': [x1, y1, x2, y2], 'confidence': 1.0, 'class': index, 'class_name': frame['symbol']})
+    return results
+
+
+# ----------------------------------------------------------------------
+# Page processing
+# ----------------------------------------------------------------------
+def bench_render_page(benchmark, drawing_page):
+    image = benchmark.pedantic(PageProcessor.render_page_image, args=(drawing_page,), rounds=3, warmup_rounds=1)
+    assert image.ndim == 3
+
+
+def bench_text_extraction(benchmark, drawing_page):
+    spans = benchmark(PageProcessor.extract_text_spans, drawing_page)
+    assert spans
+
+
+class StubYoloResult:
+    """Stands in for an ultralytics result: boxes.data rows of x1, y1, x2, y2, conf, cls"""
+
+    class Boxes:
+        def __init__(self, data):
+            self.data = data
+
+    def __init__(self, count, seed=0):
+        rng = np.random.default_rng(seed)
+        corners = rng.uniform(0, 4000, size=(count, 2))
+        sizes = rng.uniform(20, 200, size=(count, 2))
+        confidence = rng.uniform(0.5, 1.0, size=(count, 1))
+        classes = rng.integers(0, len(YOLO_CLASSES), size=(count, 1))
+        self.boxes = self.Boxes(np.hstack([corners, corners + sizes, confidence, classes]))
+        self.names = YOLO_CLASSES
+
+
+@pytest.mark.parametrize("count", SPAN_COUNTS)
+def bench_yolo_results_stubbed(benchmark, count):
+    result = StubYoloResult(count)
+    detections = benchmark(PageProcessor.yolo_results, result)
+    assert len(detections) <= count
+
+
+def bench_yolo_inference(benchmark, drawing_page, yolo_model):
+    image = PageProcessor.render_page_image(drawing_page)
+    result = benchmark.pedantic(lambda: yolo_model(image, verbose=False)[0], rounds=3, warmup_rounds=1)
+    assert PageProcessor.yolo_results(result) is not None
+
+
+# ----------------------------------------------------------------------
+# Clustering
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("count", SPAN_COUNTS)
+def bench_cluster_tolerances(benchmark, count):
+    spans, _, _ = synthetic_spans(count)
+    clustered = benchmark.pedantic(
+        ClusterDetector.cluster_tolerances, args=(spans, None, DimensionParser),
+        rounds=rounds_for(count), iterations=1
+    )
+    assert clustered
+
+
+@pytest.mark.parametrize("count", DETECTION_COUNTS)
+def bench_cluster_detections(benchmark, bench_window, count):
+    spans, width, height = synthetic_spans(count)
+
+    def setup():
+        DimensionParser.clear_cache()
+        bench_window.reset(width, height)
+        return (bench_window, [dict(span) for span in spans], [], DimensionParser), {}
+
+    benchmark.pedantic(ClusterDetector.cluster_detections, setup=setup, rounds=1, iterations=1)
+    assert bench_window.ui.dimtable.rowCount() > 0
+
+
+@pytest.mark.parametrize("density", DENSITIES)
+def bench_cluster_tolerances_drawing(benchmark, density):
+    document, ground_truth = generate_drawing(density=density, seed=2)
+    document.close()
+    spans = detections(ground_truth)
+    clustered = benchmark.pedantic(
+        ClusterDetector.cluster_tolerances, args=(spans, None, DimensionParser),
+        rounds=rounds_for(len(spans)), iterations=1
+    )
+    benchmark.extra_info['spans'] = len(spans)
+    benchmark.extra_info['stacked_recall'] = stacked_recall(clustered, ground_truth)
+
+
+def bench_gdt_association(benchmark, bench_window, synthetic_drawing):
+    document, ground_truth = synthetic_drawing
+    spans = detections(ground_truth)
+    yolo = gdt_yolo_detections(ground_truth)
+
+    def setup():
+        bench_window.show_page(document[0])
+        return (bench_window, [dict(span) for span in spans], yolo, DimensionParser), {}
+
+    benchmark.pedantic(ClusterDetector.cluster_detections, setup=setup, rounds=1, iterations=1)
+    table = bench_window.ui.dimtable
+    associated = sum(1 for row in range(table.rowCount())
+                     if table.item(row, 5) and table.item(row, 5).text().startswith('GDT'))
+    benchmark.extra_info['gdt_frames'] = len(yolo)
+    benchmark.extra_info['gdt_rows'] = associated
+
+
+# ----------------------------------------------------------------------
+# Zoning and scene population
+# ----------------------------------------------------------------------
+def bench_zone_for_midpoint(benchmark, bench_window, drawing_page):
+    bench_window.show_page(drawing_page)
+    rect = bench_window.ui.pdf_view.sceneRect()
+    midpoint = (rect.width() / 2, rect.height() / 2)
+    zone = benchmark.pedantic(ZoneDetector.get_zone_for_midpoint, args=(bench_window, midpoint),
+                              rounds=3, warmup_rounds=1)
+    assert zone
+
+
+def bench_zone_ground_truth(benchmark, bench_window, synthetic_drawing):
+    document, ground_truth = synthetic_drawing
+    bench_window.show_page(document[0])
+    samples = [dimension for dimension in ground_truth['dimensions'] if dimension['box']][:ZONE_SAMPLES]
+    midpoints = [ClusterDetector.calculate_merged_box_midpoint(dimension['box']) for dimension in samples]
+
+    zones = benchmark.pedantic(
+        lambda: [ZoneDetector.get_zone_for_midpoint(bench_window, midpoint) for midpoint in midpoints],
+        rounds=1, iterations=1
+    )
+    benchmark.extra_info['zone_accuracy'] = (
+        sum(zone == dimension['zone'] for zone, dimension in zip(zones, samples)) / len(samples)
+    )
+
+
+@pytest.mark.parametrize("count", SPAN_COUNTS)
+def bench_balloon_population(benchmark, bench_window, count):
+    spans, width, height = synthetic_spans(count)
+
+    def populate():
+        view = bench_window.ui.pdf_view
+        scene = view.scene()
+        for row, span in enumerate(spans):
+            elements = HighlightManager.highlight_bbox(view, span['box'], row, from_table=False)
+            if elements:
+                for key in ('highlight', 'circle', 'triangle', 'text'):
+                    scene.addItem(elements[key])
+                    view.pdf_items.append(elements[key])
+
+    benchmark.pedantic(populate, setup=lambda: bench_window.reset(width, height),
+                       rounds=rounds_for(count), iterations=1)
+    assert len(bench_window.ui.pdf_view.pdf_items) == 4 * len(spans)
+
+
+def bench_parse_many(benchmark):
+    spans, _, _ = synthetic_spans(10000)
+    texts = [span['text'] for span in spans]
+
+    def parse():
+        DimensionParser.clear_cache()
+        return DimensionParser.parse_many(texts)
+
+    assert len(benchmark(parse)) == len(texts)
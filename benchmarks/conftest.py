@@ -0,0 +1,98 @@
+import os
+import sys
+
+# Render off screen so the suite runs on build machines without a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+import pytest
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QImage, QPixmap
+
+from benchmarks.drawing_generator import generate_drawing
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--sample-drawing",
+        default=os.environ.get("SMARTMETROLOGY_SAMPLE_DRAWING"),
+        help="PDF drawing to benchmark page render, text extraction and inference on, "
+             "in addition to the synthetic page (default: $SMARTMETROLOGY_SAMPLE_DRAWING)"
+    )
+    parser.addoption(
+        "--yolo-model",
+        default=os.environ.get("SMARTMETROLOGY_YOLO_MODEL", "best.pt"),
+        help="YOLO weights for the real inference benchmark"
+    )
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture(scope="session")
+def synthetic_drawing():
+    """A generated drawing of normal density and its ground truth"""
+    document, ground_truth = generate_drawing(seed=1)
+    yield document, ground_truth
+    document.close()
+
+
+@pytest.fixture(scope="session", params=["synthetic", "sample"])
+def drawing_page(request, synthetic_drawing):
+    """First page of the synthetic drawing, and of the sample drawing when one is given"""
+    if request.param == "synthetic":
+        yield synthetic_drawing[0][0]
+        return
+
+    path = request.config.getoption("--sample-drawing")
+    if not path or not os.path.exists(path):
+        pytest.skip("No sample drawing; pass --sample-drawing or set SMARTMETROLOGY_SAMPLE_DRAWING")
+    document = fitz.open(path)
+    yield document[0]
+    document.close()
+
+
+@pytest.fixture(scope="session")
+def yolo_model(request):
+    path = request.config.getoption("--yolo-model")
+    if not os.path.exists(path):
+        pytest.skip(f"YOLO weights not found at {path}")
+    from ultralytics import YOLO
+    return YOLO(path)
+
+
+class BenchWindow:
+    """The parts of MainWindow the clustering and zoning code touch: a PDF view and the dimension table"""
+
+    class Ui:
+        pass
+
+    def __init__(self):
+        from graphics import CustomGraphicsView
+
+        self.ui = self.Ui()
+        self.ui.pdf_view = CustomGraphicsView(QtWidgets.QGraphicsScene(), self)
+        self.ui.dimtable = QtWidgets.QTableWidget(0, 12)
+
+    def reset(self, width, height):
+        """Empty table and an empty scene of the given size"""
+        self.ui.dimtable.setRowCount(0)
+        self.ui.pdf_view.pdf_items.clear()
+        self.ui.pdf_view.scene().clear()
+        self.ui.pdf_view.setSceneRect(QRectF(0, 0, width, height))
+
+    def show_page(self, page):
+        """Put a rendered page in the scene, as render_page does"""
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(2, 2))
+        qimage = QImage(pixmap.samples, pixmap.width, pixmap.height, pixmap.stride, QImage.Format_RGB888)
+        self.reset(pixmap.width, pixmap.height)
+        self.ui.pdf_view.scene().addPixmap(QPixmap.fromImage(qimage))
+
+
+@pytest.fixture(scope="session")
+def bench_window(qapp):
+    return BenchWindow()
@@ -0,0 +1,442 @@
+"""Synthetic engineering drawings with ground truth, for scaling clustering, zoning and association
+
+    python -m benchmarks.drawing_generator out.pdf --dimensions 40 --density 10 --seed 1
+
+writes out.pdf and out.json. All boxes in the JSON are scene coordinates, i.e. PDF points
+times PageProcessor.SPAN_SCALE, in the same 4-point format process_pdf_page produces.
+"""
+import argparse
+import json
+import math
+import os
+import random
+
+import fitz
+
+from algorithms import PageProcessor
+
+
+A3_LANDSCAPE = (1191, 842)
+FONT_NAME = "helv"
+FONT = fitz.Font(FONT_NAME)
+
+# Page layout in PDF points
+FRAME_MARGIN = 20
+LABEL_MARGIN = 30  # top and right, where the zone labels go
+LABEL_FONT_SIZE = 10
+TITLE_BLOCK_SIZE = (300, 90)
+CELL_ASPECT = 3.0  # width / height of the cell each dimension is placed in
+# Font size relative to the cell height, small enough for a vertical stack to fit its cell
+FONT_TO_CELL = 0.18
+MAX_FONT_SIZE = 10
+MIN_FONT_SIZE = 2.5
+TOLERANCE_SCALE = 0.6  # stacked tolerance font size relative to the nominal
+GAP = 3
+
+PLAIN_KINDS = ["length", "diameter", "radius", "thread", "angle", "reference", "thru", "symmetric"]
+GDT_SYMBOLS = ["position", "flatness", "parallelism", "perpendicularity"]
+TITLE_BLOCK_TEXT = [
+    ("PART NO.", "SM-0001"), ("TITLE", "BRACKET"), ("MATERIAL", "AL 6061-T6"), ("SCALE", "1:1"),
+]
+
+
+def zone_for_point(x, y, width, height, columns, rows):
+    """Zone of a scene point under ZoneDetector's convention: columns numbered from the right, rows lettered from the bottom"""
+    col_idx = min(int(x / (width / columns)), columns - 1)
+    row_idx = min(int(y / (height / rows)), rows - 1)
+    return f"{chr(65 + rows - row_idx - 1)}{columns - col_idx}"
+
+
+def _text_height(font_size):
+    return (FONT.ascender - FONT.descender) * font_size
+
+
+def _text_width(text, font_size):
+    return fitz.get_text_length(text, fontname=FONT_NAME, fontsize=font_size)
+
+
+class DrawingBuilder:
+    """Lays out one page and remembers where every string was written"""
+
+    def __init__(self, page_size, columns, rows, seed):
+        self.rng = random.Random(seed)
+        self.document = fitz.open()
+        self.page = self.document.new_page(width=page_size[0], height=page_size[1])
+        self.width, self.height = page_size
+        self.columns = columns
+        self.rows = rows
+        self.scale = PageProcessor.SPAN_SCALE
+        # (text, origin) of everything written, matched to extracted spans afterwards
+        self._written = []
+        self.frame = fitz.Rect(FRAME_MARGIN, LABEL_MARGIN, self.width - LABEL_MARGIN, self.height - FRAME_MARGIN)
+        self.title_block = fitz.Rect(self.frame.x1 - TITLE_BLOCK_SIZE[0], self.frame.y1 - TITLE_BLOCK_SIZE[1],
+                                     self.frame.x1, self.frame.y1)
+
+    # ------------------------------------------------------------------
+    # Primitives
+    # ------------------------------------------------------------------
+    def write(self, text, x, y, font_size, vertical=False):
+        """Write text with its baseline starting at (x, y); vertical text reads bottom to top"""
+        self.page.insert_text(fitz.Point(x, y), text, fontname=FONT_NAME, fontsize=font_size,
+                              rotate=90 if vertical else 0)
+        entry = {'text': text, 'origin': (x, y)}
+        self._written.append(entry)
+        return entry
+
+    def resolve_spans(self):
+        """Attach the extracted scene box and angle to every written string"""
+        extracted = []
+        for block in self.page.get_text("dict")['blocks']:
+            for line in block.get('lines', []):
+                angle = math.degrees(math.atan2(line['dir'][1], line['dir'][0]))
+                for span in line['spans']:
+                    if span['text'].strip():
+                        extracted.append((span['text'].strip(), span['origin'], span['bbox'], angle))
+
+        for entry in self._written:
+            best = None
+            for text, origin, bbox, angle in extracted:
+                if text != entry['text']:
+                    continue
+                distance = abs(origin[0] - entry['origin'][0]) + abs(origin[1] - entry['origin'][1])
+                if best is None or distance < best[0]:
+                    best = (distance, bbox, angle)
+            if best is None:
+                entry['box'], entry['angle'] = None, None
+                continue
+            x1, y1, x2, y2 = [value * self.scale for value in best[1]]
+            entry['box'] = [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+            entry['angle'] = round(best[2])
+
+    def scene_zone(self, box):
+        xs = [p[0] for p in box]
+        ys = [p[1] for p in box]
+        return zone_for_point(sum(xs) / len(xs), sum(ys) / len(ys),
+                              self.width * self.scale, self.height * self.scale, self.columns, self.rows)
+
+    # ------------------------------------------------------------------
+    # Sheet
+    # ------------------------------------------------------------------
+    def draw_sheet(self):
+        """Drawing frame, zone labels and ticks in the top and right margins, and the title block"""
+        self.page.draw_rect(self.frame, width=1.2)
+
+        column_width = self.width / self.columns
+        for col_idx in range(self.columns):
+            label = str(self.columns - col_idx)
+            center = (col_idx + 0.5) * column_width
+            self.write(label, center - _text_width(label, LABEL_FONT_SIZE) / 2,
+                       self.frame.y0 - 8, LABEL_FONT_SIZE)
+            if col_idx:
+                x = col_idx * column_width
+                self.page.draw_line(fitz.Point(x, self.frame.y0 - 6), fitz.Point(x, self.frame.y0), width=0.6)
+
+        row_height = self.height / self.rows
+        for row_idx in range(self.rows):
+            label = chr(65 + self.rows - row_idx - 1)
+            center = (row_idx + 0.5) * row_height
+            self.write(label, self.frame.x1 + 10, center + LABEL_FONT_SIZE / 3, LABEL_FONT_SIZE)
+            if row_idx:
+                y = row_idx * row_height
+                self.page.draw_line(fitz.Point(self.frame.x1, y), fitz.Point(self.frame.x1 + 6, y), width=0.6)
+
+        width, height = TITLE_BLOCK_SIZE
+        self.page.draw_rect(self.title_block, width=1)
+        row_height = height / len(TITLE_BLOCK_TEXT)
+        entries = []
+        for index, (caption, value) in enumerate(TITLE_BLOCK_TEXT):
+            top = self.title_block.y0 + index * row_height
+            if index:
+                self.page.draw_line(fitz.Point(self.title_block.x0, top), fitz.Point(self.title_block.x1, top),
+                                    width=0.5)
+            entries.append(self.write(caption, self.title_block.x0 + 6, top + row_height * 0.65, 7))
+            entries.append(self.write(value, self.title_block.x0 + width * 0.4, top + row_height * 0.65, 9))
+        self.page.draw_line(fitz.Point(self.title_block.x0 + width * 0.37, self.title_block.y0),
+                            fitz.Point(self.title_block.x0 + width * 0.37, self.title_block.y1), width=0.5)
+        return entries
+
+    def cells(self, count):
+        """Top-left corners and size of count cells filling the frame, avoiding the title block"""
+        area = fitz.Rect(self.frame.x0 + 10, self.frame.y0 + 10, self.frame.x1 - 10, self.frame.y1 - 10)
+        usable = area.width * area.height - self.title_block.width * self.title_block.height
+        cell_height = math.sqrt(usable / (count * CELL_ASPECT))
+        while True:
+            cell_width = cell_height * CELL_ASPECT
+            columns = max(1, int(area.width // cell_width))
+            rows = max(1, int(area.height // cell_height))
+            corners = []
+            for row in range(rows):
+                for column in range(columns):
+                    cell = fitz.Rect(area.x0 + column * cell_width, area.y0 + row * cell_height,
+                                     area.x0 + (column + 1) * cell_width, area.y0 + (row + 1) * cell_height)
+                    if not cell.intersects(self.title_block):
+                        corners.append((cell.x0, cell.y0))
+            if len(corners) >= count:
+                return corners[:count], cell_width, cell_height
+            cell_height *= 0.95
+
+    # ------------------------------------------------------------------
+    # Features
+    # ------------------------------------------------------------------
+    def plain_dimension(self, kind, x, y, font_size):
+        rng = self.rng
+        value = rng.choice([str(rng.randint(2, 400)), f"{rng.uniform(1, 250):.1f}", f"{rng.uniform(1, 60):.2f}"])
+        if kind == "diameter":
+            nominal, dim_type = f"Ø{value}", "Length"
+        elif kind == "radius":
+            nominal, dim_type = f"R{rng.randint(1, 40)}", "Radius"
+        elif kind == "thread":
+            nominal, dim_type = f"M{rng.choice([3, 4, 5, 6, 8, 10, 12, 16, 20])}", "Thread"
+        elif kind == "angle":
+            nominal, dim_type = f"{rng.choice([15, 30, 45, 60, 90, 120])}°", "Angular"
+        elif kind == "reference":
+            nominal, dim_type = f"({value})", "Length-Reference"
+        elif kind == "thru":
+            nominal, dim_type = f"Ø{rng.randint(2, 20)}", "THRU"
+        else:
+            nominal, dim_type = value, "Length"
+
+        upper_tol, lower_tol = "0", "0"
+        text = nominal
+        if kind == "thru":
+            text = f"{nominal} THRU"
+        elif kind == "symmetric":
+            tolerance = rng.choice(["0.05", "0.1", "0.2", "0.02"])
+            text = f"{nominal}±{tolerance}"
+            upper_tol, lower_tol = f"+{tolerance}", f"-{tolerance}"
+        elif kind == "reference":
+            upper_tol, lower_tol = "", ""
+        span = self.write(text, x, y + _text_height(font_size), font_size)
+        return {
+            'kind': kind, 'orientation': 'horizontal', 'nominal': nominal, 'upper_tol': upper_tol,
+            'lower_tol': lower_tol, 'dim_type': dim_type, 'spans': [span]
+        }
+
+    def stacked_dimension(self, x, y, font_size, vertical):
+        """Nominal with an upper and a lower tolerance stacked beside it
+
+        Tolerances share a left edge (horizontal) or a top edge (vertical), and sit a few
+        points after the end of the nominal, as cluster_tolerances expects.
+        """
+        rng = self.rng
+        nominal = rng.choice([str(rng.randint(5, 400)), f"{rng.uniform(5, 250):.1f}"])
+        upper = rng.uniform(0.01, 0.3)
+        lower = rng.uniform(0.0, upper)
+        # Same number of decimals, so both tolerances are the same length
+        upper_text, lower_text = f"{upper:.2f}", f"{lower:.2f}"
+        tol_size = font_size * TOLERANCE_SCALE
+        tol_height = _text_height(tol_size)
+        nominal_width = _text_width(nominal, font_size)
+
+        if not vertical:
+            baseline = y + FONT.ascender * font_size
+            tol_x = x + nominal_width + GAP
+            # The lower tolerance starts just below the top of the nominal
+            upper_top = y + 0.2 * _text_height(font_size) - tol_height
+            upper_baseline = upper_top + FONT.ascender * tol_size
+            spans = [
+                self.write(nominal, x, baseline, font_size),
+                self.write(upper_text, tol_x, upper_baseline, tol_size),
+                self.write(lower_text, tol_x, upper_baseline + tol_height, tol_size),
+            ]
+        else:
+            # Rotated text reads bottom to top; a glyph's ascent points to -x
+            nominal_x = x + tol_height + FONT.ascender * font_size
+            nominal_bottom = y + nominal_width + GAP + _text_width(upper_text, tol_size)
+            lower_left = nominal_x - FONT.ascender * font_size
+            lower_x = lower_left + FONT.ascender * tol_size
+            upper_x = lower_x - tol_height
+            tol_bottom = nominal_bottom - nominal_width - GAP
+            spans = [
+                self.write(nominal, nominal_x, nominal_bottom, font_size, vertical=True),
+                self.write(upper_text, upper_x, tol_bottom, tol_size, vertical=True),
+                self.write(lower_text, lower_x, tol_bottom, tol_size, vertical=True),
+            ]
+
+        return {
+            'kind': 'stacked', 'orientation': 'vertical' if vertical else 'horizontal', 'nominal': nominal,
+            'upper_tol': f"+{upper_text}", 'lower_tol': f"-{lower_text}", 'dim_type': 'Length', 'spans': spans
+        }
+
+    def gdt_frame(self, x, y, font_size):
+        """Feature control frame: drawn symbol, tolerance and one or two datum letters"""
+        rng = self.rng
+        symbol = rng.choice(GDT_SYMBOLS)
+        tolerance = rng.choice(["0.05", "0.1", "0.02", "Ø0.1"]) if symbol == "position" else rng.choice(["0.05", "0.02"])
+        datums = [] if symbol == "flatness" else rng.sample(["A", "B", "C"], rng.choice([1, 2]))
+
+        height = _text_height(font_size) * 1.4
+        texts = [tolerance] + datums
+        widths = [height] + [_text_width(text, font_size) + 2 * GAP for text in texts]
+        frame = fitz.Rect(x, y, x + sum(widths), y + height)
+        self.page.draw_rect(frame, width=0.8)
+        left = x
+        for width in widths[:-1]:
+            left += width
+            self.page.draw_line(fitz.Point(left, frame.y0), fitz.Point(left, frame.y1), width=0.8)
+
+        self._draw_symbol(symbol, fitz.Rect(x, y, x + height, y + height))
+        spans = []
+        left = x + widths[0]
+        baseline = y + (height + FONT.ascender * font_size + FONT.descender * font_size) / 2
+        for text, width in zip(texts, widths[1:]):
+            spans.append(self.write(text, left + GAP, baseline, font_size))
+            left += width
+
+        return {
+            'symbol': symbol, 'tolerance': tolerance, 'datums': datums, 'spans': spans,
+            'box': [[v * self.scale for v in point] for point in
+                    ((frame.x0, frame.y0), (frame.x1, frame.y0), (frame.x1, frame.y1), (frame.x0, frame.y1))]
+        }
+
+    def _draw_symbol(self, symbol, cell):
+        inset = cell.width * 0.2
+        r = fitz.Rect(cell.x0 + inset, cell.y0 + inset, cell.x1 - inset, cell.y1 - inset)
+        if symbol == "position":
+            self.page.draw_circle(fitz.Point((r.x0 + r.x1) / 2, (r.y0 + r.y1) / 2), r.width * 0.35, width=0.6)
+            self.page.draw_line(fitz.Point(r.x0, (r.y0 + r.y1) / 2), fitz.Point(r.x1, (r.y0 + r.y1) / 2), width=0.6)
+            self.page.draw_line(fitz.Point((r.x0 + r.x1) / 2, r.y0), fitz.Point((r.x0 + r.x1) / 2, r.y1), width=0.6)
+        elif symbol == "flatness":
+            shift = r.width * 0.25
+            self.page.draw_polyline([fitz.Point(r.x0 + shift, r.y0 + r.height * 0.3),
+                                     fitz.Point(r.x1, r.y0 + r.height * 0.3),
+                                     fitz.Point(r.x1 - shift, r.y1 - r.height * 0.3),
+                                     fitz.Point(r.x0, r.y1 - r.height * 0.3),
+                                     fitz.Point(r.x0 + shift, r.y0 + r.height * 0.3)], width=0.6)
+        elif symbol == "parallelism":
+            shift = r.width * 0.3
+            self.page.draw_line(fitz.Point(r.x0 + shift, r.y0), fitz.Point(r.x0, r.y1), width=0.6)
+            self.page.draw_line(fitz.Point(r.x1, r.y0), fitz.Point(r.x1 - shift, r.y1), width=0.6)
+        else:
+            self.page.draw_line(fitz.Point((r.x0 + r.x1) / 2, r.y0), fitz.Point((r.x0 + r.x1) / 2, r.y1), width=0.6)
+            self.page.draw_line(fitz.Point(r.x0, r.y1), fitz.Point(r.x1, r.y1), width=0.6)
+
+
+def generate_drawing(dimensions=40, density=1.0, gdt_ratio=0.1, stacked_ratio=0.3, vertical_ratio=0.3,
+                     columns=8, rows=6, page_size=A3_LANDSCAPE, seed=0):
+    """
+    Build a one-page drawing and its ground truth
+
+    Args:
+        dimensions: Dimensions on a drawing of normal density
+        density: Multiplier on dimensions and GD&T frames, e.g. 10 or 100 for scaling runs
+        gdt_ratio: GD&T frames per dimension
+        stacked_ratio: Share of dimensions with stacked +/- tolerances
+        vertical_ratio: Share of stacked dimensions written vertically
+        columns, rows: Zone grid; at most 8 each, as ZoneDetector reads single-character labels
+        page_size: Page size in points
+        seed: Seed for a reproducible drawing
+
+    Returns:
+        (fitz.Document, ground truth dict)
+    """
+    builder = DrawingBuilder(page_size, columns, rows, seed)
+    rng = builder.rng
+    title_block = builder.draw_sheet()
+
+    dimension_count = max(1, round(dimensions * density))
+    gdt_count = round(dimension_count * gdt_ratio)
+    corners, cell_width, cell_height = builder.cells(dimension_count + gdt_count)
+    font_size = max(MIN_FONT_SIZE, min(MAX_FONT_SIZE, cell_height * FONT_TO_CELL))
+    rng.shuffle(corners)
+
+    features = []
+    for index, (x, y) in enumerate(corners):
+        # Keep clear of the cell edges, with some jitter so rows don't line up exactly
+        x += rng.uniform(0.05, 0.15) * cell_width
+        y += rng.uniform(0.1, 0.2) * cell_height
+        if index < gdt_count:
+            features.append(('gdt', builder.gdt_frame(x, y, font_size)))
+        elif rng.random() < stacked_ratio:
+            features.append(('dimension', builder.stacked_dimension(x, y, font_size, rng.random() < vertical_ratio)))
+        else:
+            features.append(('dimension', builder.plain_dimension(rng.choice(PLAIN_KINDS), x, y, font_size)))
+
+    builder.resolve_spans()
+
+    ground_truth = {
+        'seed': seed,
+        'page': {'width': builder.width, 'height': builder.height, 'scene_scale': builder.scale},
+        'frame': [value * builder.scale for value in builder.frame],
+        'zones': {
+            'columns': columns, 'rows': rows,
+            'convention': 'columns numbered from the right, rows lettered from the bottom'
+        },
+        'dimensions': [],
+        'gdt_frames': [],
+        'title_block': [_span_truth(span) for span in title_block],
+    }
+    for kind, feature in features:
+        spans = [_span_truth(span) for span in feature.pop('spans')]
+        boxes = [span['box'] for span in spans if span['box']]
+        if kind == 'gdt':
+            feature['zone'] = builder.scene_zone(feature['box'])
+            feature['spans'] = spans
+            feature['id'] = len(ground_truth['gdt_frames'])
+            ground_truth['gdt_frames'].append(feature)
+        else:
+            feature['box'] = _union(boxes) if boxes else None
+            feature['zone'] = builder.scene_zone(feature['box']) if boxes else None
+            feature['spans'] = spans
+            feature['id'] = len(ground_truth['dimensions'])
+            ground_truth['dimensions'].append(feature)
+    ground_truth['span_count'] = (sum(len(f['spans']) for f in ground_truth['dimensions'])
+                                  + sum(len(f['spans']) for f in ground_truth['gdt_frames'])
+                                  + len(ground_truth['title_block']) + columns + rows)
+    return builder.document, ground_truth
+
+
+def detections(ground_truth):
+    """Every dimension, GD&T and title block span as a process_pdf_page detection, with its text angle"""
+    spans = [span for feature in ground_truth['dimensions'] + ground_truth['gdt_frames'] for span in feature['spans']]
+    spans += ground_truth['title_block']
+    return [
+        {'text': span['text'], 'box': span['box'], 'confidence': 1.0, 'rotation': 0, 'angle': span['angle']}
+        for span in spans if span['box']
+    ]
+
+
+def _span_truth(entry):
+    return {'text': entry['text'], 'box': entry.get('box'), 'angle': entry.get('angle')}
+
+
+def _union(boxes):
+    xs = [p[0] for box in boxes for p in box]
+    ys = [p[1] for box in boxes for p in box]
+    return [[min(xs), min(ys)], [max(xs), min(ys)], [max(xs), max(ys)], [min(xs), max(ys)]]
+
+
+def write_drawing(pdf_path, **kwargs):
+    """Write the drawing to pdf_path and its ground truth next to it as .json; returns the ground truth"""
+    document, ground_truth = generate_drawing(**kwargs)
+    document.save(pdf_path)
+    document.close()
+    with open(os.path.splitext(pdf_path)[0] + '.json', 'w') as f:
+        json.dump(ground_truth, f, indent=2)
+    return ground_truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic drawing with ground-truth JSON")
+    parser.add_argument('output', help="PDF path; the ground truth is written next to it as .json")
+    parser.add_argument('--dimensions', type=int, default=40, help="Dimensions at normal density")
+    parser.add_argument('--density', type=float, default=1.0, help="Multiplier, e.g. 10 or 100")
+    parser.add_argument('--gdt-ratio', type=float, default=0.1)
+    parser.add_argument('--stacked-ratio', type=float, default=0.3)
+    parser.add_argument('--vertical-ratio', type=float, default=0.3)
+    parser.add_argument('--columns', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    ground_truth = write_drawing(
+        args.output, dimensions=args.dimensions, density=args.density, gdt_ratio=args.gdt_ratio,
+        stacked_ratio=args.stacked_ratio, vertical_ratio=args.vertical_ratio,
+        columns=args.columns, rows=args.rows, seed=args.seed
+    )
+    print(f"Wrote {args.output}: {len(ground_truth['dimensions'])} dimensions, "
+          f"{len(ground_truth['gdt_frames'])} GD&T frames, {ground_truth['span_count']} spans")
+
+
+if __name__ == '__main__':
+    main()
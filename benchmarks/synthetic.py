@@ -0,0 +1,89 @@
+import math
+import random
+
+
+# Scene units per grid cell; one dimension (nominal plus any tolerances) per cell
+CELL_WIDTH = 160
+CELL_HEIGHT = 100
+MARGIN = 80
+TEXT_HEIGHT = 16
+TOLERANCE_HEIGHT = 10
+CHAR_WIDTH = 8
+
+
+def _nominal_text(rng):
+    value = rng.choice([rng.randint(2, 400), round(rng.uniform(1, 250), rng.choice([1, 2]))])
+    return rng.choice(["", "", "", "Ø", "R", "M"]) + str(value)
+
+
+def _tolerance_texts(rng):
+    upper = round(rng.uniform(0.01, 0.3), 2)
+    lower = round(rng.uniform(0.0, upper), 2)
+    return f"{upper}", f"{lower}"
+
+
+def _box(x, y, width, height):
+    return [[x, y], [x + width, y], [x + width, y + height], [x, y + height]]
+
+
+def synthetic_spans(count, seed=0, stacked_ratio=0.4, vertical_ratio=0.25):
+    """
+    Text spans laid out the way process_pdf_page reports them, for clustering benchmarks
+
+    Each grid cell holds one dimension: either a plain value, or a nominal followed by
+    an upper and a lower tolerance stacked on top of each other, horizontal or vertical.
+    Nominals are listed before their tolerances, as PyMuPDF returns them.
+
+    Args:
+        count: Approximate number of spans
+        seed: Seed for a reproducible layout
+        stacked_ratio: Share of dimensions that carry stacked tolerances
+        vertical_ratio: Share of stacked dimensions written vertically
+
+    Returns:
+        (spans, width, height): the detections and the scene size they fit in
+    """
+    rng = random.Random(seed)
+    # A stacked dimension contributes three spans, a plain one a single span
+    dimensions = max(1, round(count / (1 + 2 * stacked_ratio)))
+    columns = max(1, math.ceil(math.sqrt(dimensions * CELL_HEIGHT / CELL_WIDTH * 1.4)))
+    rows = math.ceil(dimensions / columns)
+
+    spans = []
+    for index in range(dimensions):
+        if len(spans) >= count:
+            break
+        x = MARGIN + (index % columns) * CELL_WIDTH
+        y = MARGIN + (index // columns) * CELL_HEIGHT
+        nominal = _nominal_text(rng)
+        nominal_width = len(nominal) * CHAR_WIDTH
+
+        if rng.random() >= stacked_ratio or count - len(spans) < 3:
+            spans.append(_span(nominal, _box(x, y, nominal_width, TEXT_HEIGHT), 0))
+            continue
+
+        upper, lower = _tolerance_texts(rng)
+        if rng.random() >= vertical_ratio:
+            # Tolerances right of the nominal, upper above lower, sharing a left edge
+            tol_x = x + nominal_width + 4
+            tol_width = len(upper) * CHAR_WIDTH * 0.7
+            spans.append(_span(nominal, _box(x, y, nominal_width, TEXT_HEIGHT), 0))
+            spans.append(_span(upper, _box(tol_x, y - 6, tol_width, TOLERANCE_HEIGHT), 0))
+            spans.append(_span(lower, _box(tol_x, y + 4, tol_width, TOLERANCE_HEIGHT), 0))
+        else:
+            # Rotated text: tolerances side by side sharing a top edge, nominal below them
+            tol_width = TOLERANCE_HEIGHT
+            tol_height = len(upper) * CHAR_WIDTH * 0.7
+            spans.append(_span(nominal, _box(x + tol_width + 2, y + tol_height + 4,
+                                             TEXT_HEIGHT, nominal_width), 90))
+            spans.append(_span(upper, _box(x, y, tol_width, tol_height), 90))
+            spans.append(_span(lower, _box(x + tol_width + 2, y, tol_width, tol_height), 90))
+
+    width = 2 * MARGIN + columns * CELL_WIDTH
+    height = 2 * MARGIN + rows * CELL_HEIGHT + CELL_HEIGHT
+    return spans, width, height
+
+
+def _span(text, box, angle):
+    return {'text': text, 'box': box, 'confidence': 1.0, 'rotation': 0, 'angle': angle}
+
@@ -0,0 +1,374 @@
+import logging
+import asyncio
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from measurement_ingest import parse_reading
+
+logger = logging.getLogger(__name__)
+
+
+# Nordic UART TX characteristic our gauges notify readings on, and the service it belongs to
+UART_TX_CHARACTERISTIC = "6e400003-b5a3-f393-e0a9-e50e24dcca9e"
+UART_SERVICE = "6e400001-b5a3-f393-e0a9-e50e24dcca9e"
+
+
+class SessionState:
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    RECONNECTING = "reconnecting"
+    CLOSED = "closed"
+
+
+class BleService(QThread):
+    """One asyncio event loop, on one thread, for every BLE connection the app makes
+
+    Sessions are started and stopped from the GUI thread with connect_device() and
+    disconnect_device(); both just schedule work on the loop. Any number of gauges can
+    be connected at once, each session tagged with the instrument code its readings
+    belong to. Each session waits on an asyncio.Event instead of polling, so a stop is
+    honoured immediately.
+
+    Notifications go into a bounded queue. A single dispatcher drains it and emits
+    readings_received with every reading that has piled up, at most once per
+    BATCH_INTERVAL, so a high-rate gauge can't flood the Qt event loop. When the queue
+    is full the oldest reading is dropped.
+
+    Scans run on the same loop with a detection callback: each device is reported
+    through device_advertised as soon as its first advertisement arrives, and again
+    only when its RSSI moves by RSSI_UPDATE_DELTA or more. Two scanners at once fail
+    on most adapters, so device scans and the lookups of reconnecting sessions take
+    turns on one lock.
+
+    Connecting a gauge whose session is still closing reopens it once the old session
+    has finished.
+    """
+    connection_status = pyqtSignal(str, bool, str)  # address, status, message
+    readings_received = pyqtSignal(list)        # [(address, instrument_code, text, value, timestamp), ...]
+    session_state_changed = pyqtSignal(str, str)  # address, SessionState value
+    device_advertised = pyqtSignal(object, int)   # BLEDevice, RSSI
+    scan_finished = pyqtSignal(int)               # devices reported
+    scan_error = pyqtSignal(str)
+
+    QUEUE_SIZE = 256
+    BATCH_INTERVAL = 0.05
+    MAX_BATCH = 64
+
+    # Looking for a gauge that dropped out: scan window and backoff between attempts
+    SCAN_TIMEOUT = 5.0
+    RECONNECT_INITIAL_DELAY = 1.0
+    RECONNECT_MAX_DELAY = 30.0
+
+    # Device scans
+    SCAN_DURATION = 10.0
+    RSSI_UPDATE_DELTA = 5
+
+    # Seconds to wait for the loop thread to come up
+    START_TIMEOUT = 10.0
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+        self._shutdown: Optional[asyncio.Event] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._sessions: Dict[str, asyncio.Event] = {}
+        self._session_tasks: Dict[str, asyncio.Task] = {}
+        # Addresses to reopen once their closing session has finished
+        self._reopen = set()
+        self._scanner_lock: Optional[asyncio.Lock] = None
+        # Address -> instrument code; written on the GUI thread, read by the loop
+        self._instrument_codes: Dict[str, str] = {}
+        self._states: Dict[str, str] = {}
+        self._scan_task: Optional[asyncio.Task] = None
+        self._scan_stop: Optional[asyncio.Event] = None
+        self.dropped_readings = 0
+
+    # ------------------------------------------------------------------
+    # GUI thread API
+    # ------------------------------------------------------------------
+    def ensure_started(self):
+        """Start the loop thread if needed and wait until it accepts work
+
+        Raises:
+            RuntimeError: The loop thread didn't come up within START_TIMEOUT
+        """
+        with self._start_lock:
+            if not self.isRunning():
+                self._ready.clear()
+                self.start()
+        if not self._ready.wait(self.START_TIMEOUT):
+            raise RuntimeError("Bluetooth service did not start")
+
+    def connect_device(self, address: str, instrument_code: str = ""):
+        """Open a notification session with a gauge; does nothing if one is already open"""
+        self._instrument_codes[address] = instrument_code
+        self.ensure_started()
+        self.loop.call_soon_threadsafe(self._open_session, address)
+
+    def disconnect_device(self, address: str):
+        """Close the session with a gauge"""
+        self._instrument_codes.pop(address, None)
+        if self.loop and self.isRunning():
+            self.loop.call_soon_threadsafe(self._close_session, address)
+
+    def disconnect_all(self):
+        """Close every gauge session but keep the loop running"""
+        for address in list(self._instrument_codes):
+            self.disconnect_device(address)
+
+    def session_state(self, address: str) -> str:
+        """Current SessionState of a gauge; CLOSED if it has no session"""
+        return self._states.get(address, SessionState.CLOSED)
+
+    def connected_instruments(self) -> Dict[str, str]:
+        """Address -> instrument code for every session that was opened and not closed"""
+        return dict(self._instrument_codes)
+
+    def start_scan(self, duration: float = SCAN_DURATION, uart_only: bool = True,
+                   known_addresses: Iterable[str] = ()):
+        """
+        Scan for gauges, replacing any scan in progress
+
+        Args:
+            duration: Seconds to scan for
+            uart_only: Only report devices advertising the Nordic UART service
+            known_addresses: Addresses reported even without the UART service, e.g. gauges
+                             already associated with an instrument
+        """
+        self.ensure_started()
+        known = {address.upper() for address in known_addresses}
+        self.loop.call_soon_threadsafe(self._start_scan, duration, uart_only, known)
+
+    def stop_scan(self):
+        """End the current scan early; scan_finished still fires"""
+        if self.loop and self.isRunning():
+            self.loop.call_soon_threadsafe(self._stop_scan)
+
+    def shutdown(self, timeout_ms: int = 3000):
+        """Close every session and stop the loop thread"""
+        if self.loop and self.isRunning():
+            self.loop.call_soon_threadsafe(self._shutdown.set)
+            self.wait(timeout_ms)
+
+    # ------------------------------------------------------------------
+    # Loop thread
+    # ------------------------------------------------------------------
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._main())
+        except Exception as e:
+            logger.error("Error in BLE service: %s", e)
+        finally:
+            self.loop.close()
+
+    async def _main(self):
+        self._shutdown = asyncio.Event()
+        self._queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._scanner_lock = asyncio.Lock()
+        dispatcher = asyncio.ensure_future(self._dispatch())
+        self._ready.set()
+
+        await self._shutdown.wait()
+
+        self._reopen.clear()
+        self._stop_scan()
+        for stop_event in self._sessions.values():
+            stop_event.set()
+        pending = list(self._session_tasks.values())
+        if self._scan_task:
+            pending.append(self._scan_task)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        dispatcher.cancel()
+        await asyncio.gather(dispatcher, return_exceptions=True)
+        self._sessions.clear()
+        self._session_tasks.clear()
+
+    def _open_session(self, address: str):
+        if address in self._session_tasks:
+            if self._sessions[address].is_set():
+                # Still closing after a disconnect; open again once it has finished
+                self._reopen.add(address)
+            return
+        stop_event = asyncio.Event()
+        self._sessions[address] = stop_event
+        task = asyncio.ensure_future(self._session(address, stop_event))
+        self._session_tasks[address] = task
+        task.add_done_callback(lambda _task: self._forget_session(address, task))
+
+    def _close_session(self, address: str):
+        self._reopen.discard(address)
+        stop_event = self._sessions.get(address)
+        if stop_event:
+            stop_event.set()
+
+    def _forget_session(self, address: str, task: asyncio.Task):
+        if self._session_tasks.get(address) is task:
+            del self._session_tasks[address]
+            self._sessions.pop(address, None)
+            if address in self._reopen:
+                self._reopen.discard(address)
+                if not self._shutdown.is_set():
+                    self._open_session(address)
+
+    async def _session(self, address: str, stop_event: asyncio.Event):
+        """Connect and stream notifications until stopped, reconnecting when the gauge drops out
+
+        A gauge that can't be reached on the first attempt ends the session with an
+        error, since the operator is waiting on it. Once connected, a gauge that sleeps
+        or leaves range is looked for again with exponential backoff until it returns
+        or the session is closed.
+        """
+        try:
+            from bleak import BleakClient, BleakScanner
+        except ImportError as e:
+            self.connection_status.emit(address, False, f"Required library not installed: {str(e)}. Please install 'bleak'.")
+            self._set_state(address, SessionState.CLOSED)
+            return
+
+        delay = self.RECONNECT_INITIAL_DELAY
+        connected_once = False
+        while not stop_event.is_set():
+            self._set_state(address, SessionState.RECONNECTING if connected_once else SessionState.CONNECTING)
+            if not connected_once:
+                self.connection_status.emit(address, True, f"Connecting to {address}...")
+            try:
+                async with self._scanner_lock:
+                    if stop_event.is_set():
+                        break
+                    device = await BleakScanner.find_device_by_address(address, timeout=self.SCAN_TIMEOUT)
+                if device is None:
+                    raise Exception(f"Device {address} not found")
+
+                disconnected = asyncio.Event()
+                async with BleakClient(device, disconnected_callback=lambda _client: disconnected.set()) as client:
+                    await client.start_notify(
+                        UART_TX_CHARACTERISTIC,
+                        lambda _sender, data: self._enqueue(address, data)
+                    )
+                    self._set_state(address, SessionState.CONNECTED)
+                    self.connection_status.emit(address, True, f"Connected to {address}")
+                    connected_once = True
+                    delay = self.RECONNECT_INITIAL_DELAY
+                    try:
+                        await self._wait_any(stop_event, disconnected)
+                    finally:
+                        if client.is_connected:
+                            try:
+                                await client.stop_notify(UART_TX_CHARACTERISTIC)
+                            except Exception as e:
+                                logger.error("Error stopping notifications: %s", e)
+
+                if not stop_event.is_set():
+                    logger.debug("Device %s disconnected, reconnecting", address)
+
+            except Exception as e:
+                if not connected_once:
+                    self.connection_status.emit(address, False, f"Error: {str(e)}")
+                    break
+                logger.error("Error reconnecting to %s: %s, retrying in %.0fs", address, e, delay)
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+
+        self._set_state(address, SessionState.CLOSED)
+
+    @staticmethod
+    async def _wait_any(*events: asyncio.Event):
+        waiters = [asyncio.ensure_future(event.wait()) for event in events]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    def _set_state(self, address: str, state: str):
+        self._states[address] = state
+        self.session_state_changed.emit(address, state)
+
+    def _start_scan(self, duration: float, uart_only: bool, known: set):
+        previous = self._scan_task
+        self._stop_scan()
+        self._scan_stop = asyncio.Event()
+        self._scan_task = asyncio.ensure_future(self._scan(previous, self._scan_stop, duration, uart_only, known))
+
+    def _stop_scan(self):
+        if self._scan_stop:
+            self._scan_stop.set()
+
+    async def _scan(self, previous: Optional[asyncio.Task], stop_event: asyncio.Event,
+                    duration: float, uart_only: bool, known: set):
+        """Report devices as their advertisements arrive, one entry per address"""
+        if previous:
+            # Let the replaced scan report it has finished first
+            await asyncio.gather(previous, return_exceptions=True)
+
+        reported: Dict[str, int] = {}
+
+        def detected(device, advertisement_data):
+            address = device.address.upper()
+            if uart_only and address not in known:
+                service_uuids = [uuid.lower() for uuid in (advertisement_data.service_uuids or [])]
+                if UART_SERVICE not in service_uuids:
+                    return
+            rssi = advertisement_data.rssi
+            previous_rssi = reported.get(address)
+            if previous_rssi is not None and abs(rssi - previous_rssi) < self.RSSI_UPDATE_DELTA:
+                return
+            reported[address] = rssi
+            self.device_advertised.emit(device, rssi)
+
+        try:
+            from bleak import BleakScanner
+
+            async with self._scanner_lock:
+                if stop_event.is_set():
+                    return
+                async with BleakScanner(detection_callback=detected):
+                    try:
+                        await asyncio.wait_for(stop_event.wait(), timeout=duration)
+                    except asyncio.TimeoutError:
+                        pass
+        except Exception as e:
+            logger.error("Error scanning for Bluetooth devices: %s", e)
+            self.scan_error.emit(str(e))
+        finally:
+            self.scan_finished.emit(len(reported))
+
+    def _enqueue(self, address: str, data: bytearray):
+        """Notification callback; runs on the loop thread"""
+        try:
+            text = data.decode('utf-8')
+            # Parsed here, off the GUI thread; value is None for anything that isn't a number
+            reading = (address, self._instrument_codes.get(address, ""), text, parse_reading(text), time.time())
+        except Exception as e:
+            logger.error("Error in notification handler: %s", e)
+            return
+
+        if self._queue.full():
+            # Keep the newest readings; an operator cares about the latest value
+            self._queue.get_nowait()
+            self.dropped_readings += 1
+        self._queue.put_nowait(reading)
+
+    async def _dispatch(self):
+        """Emit queued readings in batches, at most once per BATCH_INTERVAL"""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.MAX_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self.readings_received.emit(batch)
+            await asyncio.sleep(self.BATCH_INTERVAL)
+
+
+# Create singleton instance
+ble_service = BleService()
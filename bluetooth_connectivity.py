@@ -1,11 +1,12 @@
+import logging
 from PyQt5 import QtWidgets, QtGui, QtCore
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QKeySequence
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QListWidget, QPushButton, QLabel, 
     QHBoxLayout, QLineEdit, QWidget, QAbstractItemView,
     QShortcut, QStyle, QMessageBox, QListWidgetItem, QComboBox,
-    QGroupBox, QFormLayout
+    QGroupBox, QFormLayout, QCheckBox
 )
 
 import requests
@@ -13,41 +14,12 @@ import requests
 # Import API handler for getting instrument data
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from api_endpoints import api, APIEndpoints
 
-class BluetoothScannerThread(QThread):
-    devices_found = pyqtSignal(list)  # Signal emitted when devices are found
-    error_occurred = pyqtSignal(str)  # Signal emitted when an error occurs
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.stopped = False
-    
-    def run(self):
-        try:
-            # Import required libraries here to avoid import errors in the main thread
-            import asyncio
-            from bleak import BleakScanner
-            
-            # Create a new event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            # Run the scan in this thread's event loop
-            devices = loop.run_until_complete(BleakScanner.discover())
-            
-            # Emit the result signal with the found devices
-            if not self.stopped:
-                self.devices_found.emit(devices)
-                
-        except Exception as e:
-            # Emit error signal if something goes wrong
-            if not self.stopped:
-                self.error_occurred.emit(str(e))
-    
-    def stop(self):
-        self.stopped = True
+logger = logging.getLogger(__name__)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from api_endpoints import api, APIEndpoints, inventory
+from search_index import SearchController
+from ble_service import ble_service
 
 class BluetoothConnectivityDialog(QDialog):
     def __init__(self, parent=None, instrument_code=None):
@@ -60,10 +32,17 @@ class BluetoothConnectivityDialog(QDialog):
         self.instruments = []
         self.bluetooth_devices = []
         self.instrument_code_to_select = instrument_code  # Store the instrument code to select
+        self.device_rows = {}  # Address -> row in device_list for the current scan
         
         self.setup_ui()
         self.load_instruments()
         
+        # Scan results stream in from the shared BLE service while the dialog is open
+        ble_service.device_advertised.connect(self.on_device_advertised)
+        ble_service.scan_finished.connect(self.on_scan_finished)
+        ble_service.scan_error.connect(self.on_scan_error)
+        self.finished.connect(self.release_scanner)
+        
     def setup_ui(self):
         """Setup the UI elements"""
         # Main layout
@@ -114,7 +93,11 @@ class BluetoothConnectivityDialog(QDialog):
                 background-color: white;
             }
         """)
-        self.instrument_search_box.textChanged.connect(self.filter_instruments)
+        self.instrument_search = SearchController(
+            self.instrument_search_box,
+            set_visible=lambda row, visible: self.instrument_list.item(row).setHidden(not visible),
+            on_filtered=self.filter_instruments
+        )
         instrument_search_layout.addWidget(self.instrument_search_box)
         instruments_layout.addLayout(instrument_search_layout)
         
@@ -172,7 +155,11 @@ class BluetoothConnectivityDialog(QDialog):
         self.device_search_box = QLineEdit()
         self.device_search_box.setPlaceholderText("Search devices...")
         self.device_search_box.setStyleSheet(self.instrument_search_box.styleSheet())
-        self.device_search_box.textChanged.connect(self.filter_devices)
+        self.device_search = SearchController(
+            self.device_search_box,
+            set_visible=lambda row, visible: self.device_list.item(row).setHidden(not visible),
+            on_filtered=self.filter_devices
+        )
         device_search_layout.addWidget(self.device_search_box)
         devices_layout.addLayout(device_search_layout)
         
@@ -194,6 +181,11 @@ class BluetoothConnectivityDialog(QDialog):
         self.refresh_button.clicked.connect(self.discover_bluetooth_devices)
         devices_layout.addWidget(self.refresh_button)
         
+        # Gauges advertise the Nordic UART service; anything else is hidden unless asked for
+        self.show_all_devices_checkbox = QCheckBox("Show all devices, not only gauges")
+        self.show_all_devices_checkbox.setStyleSheet("font-size: 12px; color: #2c3e50;")
+        devices_layout.addWidget(self.show_all_devices_checkbox)
+        
         # Loading label
         self.loading_label = QLabel("Click 'Scan for Devices' to start scanning")
         self.loading_label.setAlignment(Qt.AlignCenter)
@@ -317,7 +309,7 @@ class BluetoothConnectivityDialog(QDialog):
         # Keyboard shortcuts
         QShortcut(QKeySequence("Escape"), self, self.reject)
     
-    def create_device_widget(self, device):
+    def create_device_widget(self, device, rssi=None):
         """Create a custom widget for device list item"""
         widget = QWidget()
         layout = QHBoxLayout(widget)
@@ -340,13 +332,12 @@ class BluetoothConnectivityDialog(QDialog):
         layout.addLayout(info_layout)
         layout.addStretch()
         
-        # Signal strength indicator if available
-        # Handle both old and new Bleak API versions
-        rssi = None
-        if hasattr(device, 'advertisement_data') and device.advertisement_data and hasattr(device.advertisement_data, 'rssi'):
+        # Signal strength indicator if available; the scanner passes the latest value,
+        # otherwise handle both old and new Bleak API versions
+        if rssi is None and hasattr(device, 'advertisement_data') and device.advertisement_data and hasattr(device.advertisement_data, 'rssi'):
             # New Bleak API
             rssi = device.advertisement_data.rssi
-        elif hasattr(device, 'rssi'):
+        elif rssi is None and hasattr(device, 'rssi'):
             # Legacy support for older Bleak versions
             rssi = device.rssi
             
@@ -378,62 +369,60 @@ class BluetoothConnectivityDialog(QDialog):
             # Show loading indicator
             self.instrument_count_label.setText("Loading instruments...")
             self.instrument_list.clear()
+            self.instrument_search.set_entries([])
             
-            # Use fixed category ID for Instruments
-            instruments_category_id = 2  # Category ID for instruments
-
-            # Get subcategories for this category ID
-            subcategories = api.get_inventory_subcategories(instruments_category_id)
-            if not subcategories:
-                raise Exception(f"No subcategories found for category ID {instruments_category_id}")
+            # Subcategories and items come from the shared inventory cache
+            instrument_items = inventory.get_instrument_items()
+            if not instrument_items and not inventory.get_subcategories():
+                raise Exception(f"No subcategories found for category ID {inventory.INSTRUMENTS_CATEGORY_ID}")
 
             self.instruments = []
             total_items = 0
             
-            # For each subcategory with category_id 2, get its items
-            for subcategory in subcategories:
-                if subcategory.get('category_id') == instruments_category_id:
-                    subcategory_id = subcategory['id']
-                    subcategory_name = subcategory['name']
-                    
-                    # Get all items for this subcategory
-                    items = api.get_inventory_items(subcategory_id)
-                    if items:
-                        for item in items:
-                            # Extract instrument code from dynamic_data
-                            dynamic_data = item.get('dynamic_data', {})
-                            instrument_code = dynamic_data.get('Instrument code', '')
-                            item_code = item.get('item_code', '')
-                            
-                            # Check if a Bluetooth address exists in dynamic_data
-                            bluetooth_address = dynamic_data.get('Bluetooth Address', None)
-                            
-                            # Create instrument data from the item
-                            instrument_data = {
-                                'name': instrument_code or item_code or 'Instrument',  # Use instrument code as name
-                                'id': item.get('id'),
-                                'subcategory_id': subcategory_id,
-                                'subcategory_name': subcategory_name,
-                                'instrument_code': instrument_code,
-                                'item_code': item_code,
-                                'size': dynamic_data.get('Size', ''),
-                                'equipment_no': dynamic_data.get('Equipment No.', ''),
-                                'location': dynamic_data.get('Location', ''),
-                                'bluetooth_address': bluetooth_address  # Use existing Bluetooth address if available
-                            }
-                            
-                            self.instruments.append(instrument_data)
-                            
-                            # Create item widget
-                            list_item = QListWidgetItem()
-                            widget = self.create_instrument_widget(instrument_data)
-                            list_item.setSizeHint(widget.sizeHint())
-                            self.instrument_list.addItem(list_item)
-                            self.instrument_list.setItemWidget(list_item, widget)
-                            total_items += 1
+            for subcategory, item in instrument_items:
+                subcategory_id = subcategory['id']
+                subcategory_name = subcategory['name']
+                
+                # Extract instrument code from dynamic_data
+                dynamic_data = item.get('dynamic_data', {})
+                instrument_code = dynamic_data.get('Instrument code', '')
+                item_code = item.get('item_code', '')
+                
+                # Check if a Bluetooth address exists in dynamic_data
+                bluetooth_address = dynamic_data.get('Bluetooth Address', None)
+                
+                # Create instrument data from the item
+                instrument_data = {
+                    'name': instrument_code or item_code or 'Instrument',  # Use instrument code as name
+                    'id': item.get('id'),
+                    'subcategory_id': subcategory_id,
+                    'subcategory_name': subcategory_name,
+                    'instrument_code': instrument_code,
+                    'item_code': item_code,
+                    'size': dynamic_data.get('Size', ''),
+                    'equipment_no': dynamic_data.get('Equipment No.', ''),
+                    'location': dynamic_data.get('Location', ''),
+                    'bluetooth_address': bluetooth_address  # Use existing Bluetooth address if available
+                }
+                
+                self.instruments.append(instrument_data)
+                
+                # Create item widget
+                list_item = QListWidgetItem()
+                widget = self.create_instrument_widget(instrument_data)
+                list_item.setSizeHint(widget.sizeHint())
+                self.instrument_list.addItem(list_item)
+                self.instrument_list.setItemWidget(list_item, widget)
+                total_items += 1
 
             # Update count label
             self.instrument_count_label.setText(f"Total: {total_items}")
+            self.instrument_search.set_entries(
+                "\n".join(str(instrument.get(field) or '') for field in (
+                    'name', 'subcategory_name', 'instrument_code', 'description', 'serial_number'
+                ))
+                for instrument in self.instruments
+            )
             
             # Pre-select the instrument if instrument_code_to_select is provided
             if self.instrument_code_to_select:
@@ -452,7 +441,7 @@ class BluetoothConnectivityDialog(QDialog):
         except Exception as e:
             error_msg = f"Error loading instruments: {str(e)}"
             self.instrument_count_label.setText(error_msg)
-            print(error_msg)
+            logger.error("%s", error_msg)
     
     def create_instrument_widget(self, instrument_data):
         """Create a custom widget for instrument list item"""
@@ -480,7 +469,7 @@ class BluetoothConnectivityDialog(QDialog):
             header_layout.addWidget(code_label)
             
             # Print debug info
-            print(f"Displaying instrument: {display_text} with code {instrument_code}")
+            logger.debug("Displaying instrument: %s with code %s", display_text, instrument_code)
         else:
             # Fallback to item code if no instrument code
             display_text = f"{subcategory_name} ({item_code})" if subcategory_name and item_code else (item_code or 'Unknown')
@@ -489,7 +478,7 @@ class BluetoothConnectivityDialog(QDialog):
             header_layout.addWidget(code_label)
             
             # Print debug info
-            print(f"Displaying instrument with item code: {display_text}")
+            logger.debug("Displaying instrument with item code: %s", display_text)
             
         header_layout.addStretch()
             
@@ -533,67 +522,15 @@ class BluetoothConnectivityDialog(QDialog):
         
         return widget
     
-    def filter_instruments(self, text):
-        """Filter instruments based on search text"""
-        search_text = self.instrument_search_box.text().strip().lower()
-        visible_count = 0
-        total_count = self.instrument_list.count()
-        
-        for i in range(self.instrument_list.count()):
-            item = self.instrument_list.item(i)
-            widget = self.instrument_list.itemWidget(item)
-            if widget:
-                instrument_data = widget.property("instrument_data")
-                if instrument_data:
-                    # Search in multiple fields
-                    searchable_fields = [
-                        instrument_data.get('name', '').lower(),
-                        instrument_data.get('subcategory_name', '').lower(),
-                        instrument_data.get('instrument_code', '').lower(),
-                        instrument_data.get('description', '').lower(),
-                        instrument_data.get('serial_number', '').lower()
-                    ]
-                    
-                    # Match if any field contains the search text
-                    search_match = not search_text or any(search_text in field for field in searchable_fields)
-                    
-                    # Show/hide based on matches
-                    item.setHidden(not search_match)
-                    if not item.isHidden():
-                        visible_count += 1
-        
-        # Update count label based on filter state
+    def filter_instruments(self, visible_count, total_count, search_text):
+        """Update the instrument count label after a search"""
         if not search_text:
             self.instrument_count_label.setText(f"Total: {total_count}")
         else:
             self.instrument_count_label.setText(f"Showing {visible_count} of {total_count}")
     
-    def filter_devices(self, text):
-        """Filter devices based on search text"""
-        search_text = self.device_search_box.text().strip().lower()
-        visible_count = 0
-        total_count = self.device_list.count()
-        
-        for i in range(self.device_list.count()):
-            item = self.device_list.item(i)
-            widget = self.device_list.itemWidget(item)
-            if widget:
-                device = widget.property("device")
-                if device:
-                    # Match by device name or address
-                    device_name = device.name.lower() if device.name else ""
-                    device_address = device.address.lower()
-                    
-                    search_match = (not search_text or 
-                                  search_text in device_name or
-                                  search_text in device_address)
-                    
-                    # Show/hide based on matches
-                    item.setHidden(not search_match)
-                    if not item.isHidden():
-                        visible_count += 1
-        
-        # Update count label based on filter state
+    def filter_devices(self, visible_count, total_count, search_text):
+        """Update the device count label after a search"""
         if not search_text:
             self.device_count_label.setText(f"Total: {total_count}")
         else:
@@ -647,95 +584,83 @@ class BluetoothConnectivityDialog(QDialog):
             self.associate_button.setEnabled(False)
     
     def discover_bluetooth_devices(self):
-        """Discover Bluetooth devices using Bleak"""
+        """Scan for Bluetooth devices; each one is listed as soon as it is heard"""
         try:
             # Clear the list
             self.device_list.clear()
+            self.device_rows = {}
+            self.bluetooth_devices = []
+            self.device_search.set_entries([])
             
             # Show loading indicator
             self.loading_label.setText("Scanning for Bluetooth devices...")
             self.loading_label.show()
             self.device_list.setVisible(False)
+            self.device_count_label.setText("Scanning...")
             self.status_label.setText("")
             
-            # Import required libraries
-            from PyQt5.QtCore import QTimer
-            
-            # Create a scanner thread to avoid blocking the GUI
-            self.scanner_thread = BluetoothScannerThread(self)
-            self.scanner_thread.devices_found.connect(self.on_devices_found)
-            self.scanner_thread.error_occurred.connect(self.on_scan_error)
-            self.scanner_thread.start()
-            
-            # Set a timeout for the scan (10 seconds)
-            QTimer.singleShot(10000, self.check_scan_timeout)
-        
-        except ImportError as e:
-            # Handle missing dependencies
-            self.loading_label.setText("Error: Required libraries not installed. Please install 'bleak'.")
-            self.status_label.setText(f"Error: {str(e)}")
-            print(f"Error: Missing dependencies - {str(e)}")
+            # Gauges already associated with an instrument are listed even if they don't advertise the UART service
+            ble_service.start_scan(
+                uart_only=not self.show_all_devices_checkbox.isChecked(),
+                known_addresses=inventory.known_bluetooth_addresses()
+            )
         
         except Exception as e:
             # Handle other errors
             self.loading_label.setText(f"Error scanning for devices: {str(e)}")
             self.status_label.setText(f"Error: {str(e)}")
-            print(f"Error discovering Bluetooth devices: {str(e)}")
-            
-    def on_devices_found(self, devices):
-        """Handle found devices from the scanner thread"""
-        # Import needed for QListWidgetItem
-        from PyQt5.QtWidgets import QListWidgetItem
-        
-        # Add devices to the list
-        if devices:
-            for device in devices:
-                item = QListWidgetItem()
-                widget = self.create_device_widget(device)
-                item.setSizeHint(widget.sizeHint())
-                self.device_list.addItem(item)
-                self.device_list.setItemWidget(item, widget)
-            
-            # Show list and hide loading
-            self.loading_label.hide()
-            self.device_list.setVisible(True)
-            
-            # Update count label
-            total_count = len(devices)
-            # Use device_count_label instead of count_label
-            self.device_count_label.setText(f"Total: {total_count}")
-            self.status_label.setText(f"Found {total_count} Bluetooth devices")
-        else:
+            logger.error("Error discovering Bluetooth devices: %s", e)
+            
+    def on_device_advertised(self, device, rssi):
+        """Add a newly heard device, or refresh its signal strength"""
+        widget = self.create_device_widget(device, rssi)
+        row = self.device_rows.get(device.address)
+        if row is not None:
+            item = self.device_list.item(row)
+            self.device_list.setItemWidget(item, widget)
+            return
+        
+        item = QListWidgetItem()
+        item.setSizeHint(widget.sizeHint())
+        self.device_list.addItem(item)
+        self.device_list.setItemWidget(item, widget)
+        self.device_rows[device.address] = self.device_list.count() - 1
+        self.bluetooth_devices.append(device)
+        
+        # Show list and hide loading
+        self.loading_label.hide()
+        self.device_list.setVisible(True)
+        
+        # Index just this device; the search also updates the count label
+        self.status_label.setText(f"Found {len(self.bluetooth_devices)} Bluetooth devices")
+        self.device_search.add_entry(f"{device.name or ''}\n{device.address}")
+    
+    def on_scan_finished(self, device_count):
+        """Handle the end of a scan"""
+        if not self.bluetooth_devices:
             # No devices found
             self.loading_label.setText("No Bluetooth devices found. Click Refresh to scan again.")
             self.device_count_label.setText("Total: 0")
             self.status_label.setText("No devices found")
     
     def on_scan_error(self, error_message):
-        """Handle errors from the scanner thread"""
+        """Handle errors from the scanner"""
         self.loading_label.setText(f"Error scanning for devices: {error_message}")
         self.status_label.setText(f"Error: {error_message}")
-        print(f"Error discovering Bluetooth devices: {error_message}")
-        
-    def check_scan_timeout(self):
-        """Check if the scan has timed out"""
-        # If the thread is still running and we haven't found any devices yet
-        if hasattr(self, 'scanner_thread') and self.scanner_thread.isRunning() and self.device_list.count() == 0:
-            # Stop the thread
-            self.scanner_thread.stop()
-            self.scanner_thread.wait()
-            
-            # Update UI
-            self.loading_label.setText("Scan timed out. Click Refresh to try again.")
-            self.status_label.setText("Scan timed out")
-            
-    def closeEvent(self, event):
-        """Handle dialog close event"""
-        # Make sure to stop the scanner thread if it's running
-        if hasattr(self, 'scanner_thread') and self.scanner_thread.isRunning():
-            self.scanner_thread.stop()
-            self.scanner_thread.wait()
-        event.accept()
+        logger.error("Error discovering Bluetooth devices: %s", error_message)
+    
+    def release_scanner(self):
+        """Stop scanning and stop listening to the shared BLE service"""
+        ble_service.stop_scan()
+        for signal, slot in (
+            (ble_service.device_advertised, self.on_device_advertised),
+            (ble_service.scan_finished, self.on_scan_finished),
+            (ble_service.scan_error, self.on_scan_error)
+        ):
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass
     
     def get_selected_device(self):
         """Get the selected device"""
@@ -760,9 +685,9 @@ class BluetoothConnectivityDialog(QDialog):
             )
             return
         
-        print("=== Starting device association ===")
-        print(f"Selected instrument: {self.selected_instrument}")
-        print(f"Selected device: {self.selected_device.address}")
+        logger.debug("=== Starting device association ===")
+        logger.debug("Selected instrument: %s", self.selected_instrument)
+        logger.debug("Selected device: %s", self.selected_device.address)
         
         try:
             # Update the instrument data with the Bluetooth address
@@ -774,7 +699,7 @@ class BluetoothConnectivityDialog(QDialog):
             subcategory_id = self.selected_instrument.get('subcategory_id')
             instrument_code = self.selected_instrument.get('instrument_code')
             
-            print(f"Selected instrument details: code={item_code}, id={item_id}, instrument_code={instrument_code}")
+            logger.debug("Selected instrument details: code=%s, id=%s, instrument_code=%s", item_code, item_id, instrument_code)
             
             # Prepare dynamic_data with Bluetooth address
             dynamic_data = {}
@@ -786,12 +711,12 @@ class BluetoothConnectivityDialog(QDialog):
                 if widget:
                     instrument_data = widget.property("instrument_data")
                     if instrument_data and instrument_data['id'] == item_id:
-                        print(f"Found matching instrument: {instrument_data}")
+                        logger.debug("Found matching instrument: %s", instrument_data)
                         # Get existing dynamic data fields
                         if 'dynamic_data' in instrument_data:
                             # If the instrument already has dynamic_data, use it
                             dynamic_data = instrument_data['dynamic_data'].copy()
-                            print(f"Using existing dynamic_data: {dynamic_data}")
+                            logger.debug("Using existing dynamic_data: %s", dynamic_data)
                         else:
                             # Otherwise build it from individual fields
                             if 'size' in instrument_data and instrument_data['size']:
@@ -802,18 +727,18 @@ class BluetoothConnectivityDialog(QDialog):
                                 dynamic_data['Location'] = instrument_data['location']
                             if 'instrument_code' in instrument_data and instrument_data['instrument_code']:
                                 dynamic_data['Instrument code'] = instrument_data['instrument_code']
-                            print(f"Built dynamic_data from fields: {dynamic_data}")
+                            logger.debug("Built dynamic_data from fields: %s", dynamic_data)
             
             # Add Bluetooth address to dynamic_data
-            print(f"Adding Bluetooth address: {self.selected_device.address}")
+            logger.debug("Adding Bluetooth address: %s", self.selected_device.address)
             dynamic_data['Bluetooth Address'] = self.selected_device.address
             
             # Ensure instrument code is always included
             if instrument_code and 'Instrument code' not in dynamic_data:
                 dynamic_data['Instrument code'] = instrument_code
-                print(f"Added instrument code to dynamic_data: {instrument_code}")
+                logger.debug("Added instrument code to dynamic_data: %s", instrument_code)
                 
-            print(f"Final dynamic_data: {dynamic_data}")
+            logger.debug("Final dynamic_data: %s", dynamic_data)
             
             # Prepare the payload for the API
             payload = {
@@ -826,27 +751,30 @@ class BluetoothConnectivityDialog(QDialog):
                 "created_by": 0  # This should be replaced with the actual user ID if available
             }
             
-            print(f"API Payload: {payload}")
-            print(f"Bluetooth Address in dynamic_data: {dynamic_data.get('Bluetooth Address')}")
+            logger.debug("API Payload: %s", payload)
+            logger.debug("Bluetooth Address in dynamic_data: %s", dynamic_data.get('Bluetooth Address'))
             
             # Make the API request using the endpoint from api_endpoints.py
             api_url = api.base_url + APIEndpoints.INVENTORY_ITEMS
-            print(f"API URL: {api_url}")
+            logger.debug("API URL: %s", api_url)
             
             if item_id:
                 # If item exists, update it (PUT request)
-                print(f"Updating existing item with ID: {item_id}")
+                logger.debug("Updating existing item with ID: %s", item_id)
                 response = requests.put(f"{api_url}{item_id}/", json=payload)
             else:
                 # If new item, create it (POST request)
-                print("Creating new item")
+                logger.debug("Creating new item")
                 response = requests.post(api_url, json=payload)
                 
-            print(f"API Response status: {response.status_code}")
-            print(f"API Response: {response.text}")
+            logger.debug("API Response status: %s", response.status_code)
+            logger.debug("API Response: %s", response.text)
             
             # Check if the request was successful
             if response.status_code in [200, 201, 204]:
+                # The cached inventory no longer matches the server
+                inventory.invalidate()
+                
                 # Update the UI to show the Bluetooth address
                 for i in range(self.instrument_list.count()):
                     item = self.instrument_list.item(i)
@@ -904,7 +832,7 @@ class BluetoothConnectivityDialog(QDialog):
                 "Error",
                 f"An error occurred while associating the device: {str(e)}"
             )
-            print(f"Error associating device: {str(e)}")
+            logger.error("Error associating device: %s", e)
     
     def accept(self):
         """Override accept to validate selection"""
@@ -1,3 +1,4 @@
+import logging
 from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QIcon, QKeySequence, QDoubleValidator, QColor, QStandardItem, QStandardItemModel
@@ -11,12 +12,17 @@ from PyQt5.QtWidgets import (
 import fitz
 import requests
 import json
-from api_endpoints import api
+from api_endpoints import api, inventory
+from drawing_cache import drawing_cache
+from prefetcher import drawing_hash
+from search_index import SearchController, SearchIndex
+from startup import warm_up, WarmUpTask
 from typing import Optional, Dict
 import os
-import tempfile
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 
 class GDTSymbolButton(QtWidgets.QPushButton):
     def __init__(self, symbol, name, parent=None):
@@ -279,13 +285,22 @@ class DimensionDialog(QtWidgets.QDialog):
         except ValueError:
             return None
 
+def open_pdf_bytes(pdf_content: bytes) -> fitz.Document:
+    """Open a downloaded PDF straight from memory"""
+    return fitz.open(stream=pdf_content, filetype="pdf")
+
 class PDFPreviewDialog(QtWidgets.QDialog):
     def __init__(self, pdf_path, parent=None, open_drawing=False):
+        """pdf_path may be a file path or an already open fitz.Document, which is shared, not copied"""
         super().__init__(parent)
-        self.pdf_path = pdf_path
         self.current_page = 0
         self.rotation = 0
-        self.pdf_doc = fitz.open(pdf_path)
+        if isinstance(pdf_path, fitz.Document):
+            self.pdf_path = pdf_path.name
+            self.pdf_doc = pdf_path
+        else:
+            self.pdf_path = pdf_path
+            self.pdf_doc = fitz.open(pdf_path)
         self.open_drawing = open_drawing  # Flag to indicate if drawing should be opened directly
         
         self.setup_ui()
@@ -509,6 +524,10 @@ class PDFPreviewDialog(QtWidgets.QDialog):
 
     def get_rotation(self):
         return self.rotation
+
+    def get_document(self):
+        """Get the open document so callers can reuse it instead of opening the file again"""
+        return self.pdf_doc
         
     def accept(self):
         # If this dialog was opened with open_drawing=True, set a flag on the parent
@@ -519,19 +538,143 @@ class PDFPreviewDialog(QtWidgets.QDialog):
     
 # Add this new class for background loading
 class DataLoaderThread(QThread):
-    data_loaded = pyqtSignal(list)
+    data_loaded = pyqtSignal(list, object)  # orders, SearchIndex over them
     error_occurred = pyqtSignal(str)
     
     def run(self):
         try:
-            data = api.get_all_orders()
+            # Orders fetched at login are used once; reopening the dialog fetches fresh ones
+            data = warm_up.take(WarmUpTask.ORDERS, timeout=30)
+            if data is None:
+                data = api.get_all_orders()
             if data is not None:
-                self.data_loaded.emit(data)
+                # Indexing thousands of orders takes a while, so not on the GUI thread
+                self.data_loaded.emit(data, OrderListModel.build_search_index(data))
             else:
                 self.error_occurred.emit("Failed to fetch data from API")
         except Exception as e:
             self.error_occurred.emit(f"Error loading data: {str(e)}")
 
+class OrderListModel(QtCore.QAbstractListModel):
+    """Flat list of (part number, production order) pairs for PartNumberDialog"""
+    OrderRole = Qt.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._orders = []
+        self._rows = []  # Indexes into _orders that pass the current search
+
+    @staticmethod
+    def order_entries(data):
+        """(part number, production order) per order as returned by api.get_all_orders"""
+        return [
+            (order.get('part_number', '') or '', order.get('production_order', '') or '')
+            for order in data
+        ]
+
+    @staticmethod
+    def build_search_index(data):
+        """SearchIndex over orders as returned by api.get_all_orders; ids are their rows"""
+        return SearchIndex(
+            f"{part_number}\n{production_order}"
+            for part_number, production_order in OrderListModel.order_entries(data)
+        )
+
+    def set_orders(self, data):
+        """Replace the list with orders as returned by api.get_all_orders"""
+        self.beginResetModel()
+        self._orders = self.order_entries(data)
+        self._rows = list(range(len(self._orders)))
+        self.endResetModel()
+
+    def set_visible_orders(self, order_ids):
+        """Show only the given orders, keeping their original order
+
+        Done as a layout change that carries the persistent indexes along, so the view
+        keeps its selection and scroll position while the operator types.
+        """
+        rows = sorted(order_ids)
+        if rows == self._rows:
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_ids = [self._rows[index.row()] if index.row() < len(self._rows) else None for index in old_indexes]
+        self._rows = rows
+        positions = {order_id: row for row, order_id in enumerate(rows)}
+        self.changePersistentIndexList(old_indexes, [
+            self.index(positions[order_id], 0) if order_id in positions else QtCore.QModelIndex()
+            for order_id in old_ids
+        ])
+        self.layoutChanged.emit()
+
+    def total_count(self):
+        return len(self._orders)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        order = self._orders[self._rows[index.row()]]
+        if role == Qt.DisplayRole:
+            return f"{order[0]} - {order[1]}"
+        if role == self.OrderRole:
+            return order
+        return None
+
+class OrderItemDelegate(QStyledItemDelegate):
+    """Paints an order row as two labelled fields instead of a widget per row"""
+    ROW_HEIGHT = 44
+
+    def paint(self, painter, option, index):
+        part_number, production_order = index.data(OrderListModel.OrderRole)
+        painter.save()
+
+        # Background: selected / hover / plain, plus the row divider
+        rect = option.rect
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(rect, QColor("#e3f2fd"))
+        elif option.state & QStyle.State_MouseOver:
+            painter.fillRect(rect, QColor("#f5f9ff"))
+        painter.setPen(QColor("#f0f0f0"))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+
+        content = rect.adjusted(10, 4, -8, -4)
+        half = content.width() // 2
+        self._paint_field(painter, QtCore.QRect(content.left(), content.top(), half - 12, content.height()),
+                          "Part Number", part_number, bold=True)
+
+        # Separator
+        painter.setPen(QColor("#e0e0e0"))
+        separator_x = content.left() + half - 6
+        painter.drawLine(separator_x, content.top() + 2, separator_x, content.bottom() - 2)
+
+        self._paint_field(painter, QtCore.QRect(separator_x + 12, content.top(), content.right() - separator_x - 12, content.height()),
+                          "Production Order", production_order, bold=False)
+        painter.restore()
+
+    def _paint_field(self, painter, rect, caption, value, bold):
+        caption_font = QtGui.QFont(painter.font())
+        caption_font.setPixelSize(10)
+        painter.setFont(caption_font)
+        painter.setPen(QColor("#666666"))
+        caption_height = QtGui.QFontMetrics(caption_font).height()
+        painter.drawText(QtCore.QRect(rect.left(), rect.top(), rect.width(), caption_height),
+                         Qt.AlignLeft | Qt.AlignVCenter, caption)
+
+        value_font = QtGui.QFont(painter.font())
+        value_font.setPixelSize(13)
+        value_font.setBold(bold)
+        painter.setFont(value_font)
+        painter.setPen(QColor("#2c3e50"))
+        value_rect = QtCore.QRect(rect.left(), rect.top() + caption_height, rect.width(), rect.height() - caption_height)
+        elided = QtGui.QFontMetrics(value_font).elidedText(value, Qt.ElideRight, value_rect.width())
+        painter.drawText(value_rect, Qt.AlignLeft | Qt.AlignVCenter, elided)
+
+    def sizeHint(self, option, index):
+        return QtCore.QSize(option.rect.width(), self.ROW_HEIGHT)
+
 class PartNumberDialog(QDialog):
     def __init__(self, parent=None):
         """Initialize dialog and load data from API"""
@@ -580,33 +723,33 @@ class PartNumberDialog(QDialog):
                 background-color: white;
             }
         """)
-        self.search_box.textChanged.connect(self.filter_items)
         search_layout.addWidget(self.search_box)
         layout.addWidget(search_container)
         
-        # List widget with improved styling
-        self.list_widget = QListWidget(self)
+        # Model-based list: rows are painted by the delegate, so cost doesn't grow with widgets per order
+        self.order_model = OrderListModel(self)
+        self.order_search = SearchController(
+            self.search_box,
+            on_results=self.order_model.set_visible_orders,
+            on_filtered=self.filter_items
+        )
+
+        self.list_widget = QtWidgets.QListView(self)
+        self.list_widget.setModel(self.order_model)
+        self.list_widget.setItemDelegate(OrderItemDelegate(self.list_widget))
+        self.list_widget.setUniformItemSizes(True)
+        self.list_widget.setMouseTracking(True)
         self.list_widget.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
         self.list_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.list_widget.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_widget.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.list_widget.setStyleSheet("""
-            QListWidget {
+            QListView {
                 border: 1px solid #e0e0e0;
                 border-radius: 4px;
                 background-color: white;
                 outline: none;
             }
-            QListWidget::item {
-                padding: 2px;
-                border-bottom: 1px solid #f0f0f0;
-            }
-            QListWidget::item:selected {
-                background-color: #e3f2fd;
-                border-bottom: 1px solid #bbdefb;
-            }
-            QListWidget::item:hover:!selected {
-                background-color: #f5f9ff;
-            }
         """)
         
         # Loading indicator with improved styling
@@ -690,10 +833,11 @@ class PartNumberDialog(QDialog):
         QShortcut(QKeySequence("Escape"), self, self.reject)
         
         # Connect double-click signal
-        self.list_widget.itemDoubleClicked.connect(self.handle_item_activation)
+        self.list_widget.doubleClicked.connect(self.handle_item_activation)
         
         # Initialize attributes for PDF handling
         self.downloaded_file = None
+        self.downloaded_document = None
         self.selected_page = 0
         self.selected_rotation = 0
         self.selected_production_order = None  # Add this line
@@ -713,61 +857,13 @@ class PartNumberDialog(QDialog):
         self.loader_thread.error_occurred.connect(self.on_loading_error)
         self.loader_thread.start()
         
-    def on_data_loaded(self, data):
-        """Handle the loaded data"""
+    def on_data_loaded(self, data, search_index):
+        """Handle the loaded data and the search index built over it"""
         self.loading_label.hide()
         self.list_widget.setVisible(True)
         
-        for order in data:
-            item_widget = QWidget()
-            item_layout = QHBoxLayout(item_widget)
-            item_layout.setContentsMargins(8, 4, 8, 4)
-            item_layout.setSpacing(12)
-            
-            # Part number container
-            part_container = QWidget()
-            part_layout = QVBoxLayout(part_container)
-            part_layout.setContentsMargins(0, 0, 0, 0)
-            part_layout.setSpacing(0)
-            
-            part_label = QLabel("Part Number")
-            part_label.setStyleSheet("color: #666; font-size: 10px;")
-            part_number_value = QLabel(order.get('part_number', ''))
-            part_number_value.setStyleSheet("font-size: 13px; font-weight: bold; color: #2c3e50;")
-            
-            part_layout.addWidget(part_label)
-            part_layout.addWidget(part_number_value)
-            item_layout.addWidget(part_container)
-            
-            # Separator
-            separator = QFrame()
-            separator.setFrameShape(QFrame.VLine)
-            separator.setStyleSheet("color: #e0e0e0;")
-            item_layout.addWidget(separator)
-            
-            # Production order container
-            order_container = QWidget()
-            order_layout = QVBoxLayout(order_container)
-            order_layout.setContentsMargins(0, 0, 0, 0)
-            order_layout.setSpacing(0)
-            
-            order_label = QLabel("Production Order")
-            order_label.setStyleSheet("color: #666; font-size: 10px;")
-            order_value = QLabel(order.get('production_order', ''))
-            order_value.setStyleSheet("font-size: 13px; color: #2c3e50;")
-            
-            order_layout.addWidget(order_label)
-            order_layout.addWidget(order_value)
-            item_layout.addWidget(order_container)
-            
-            # Add to list widget
-            list_item = QListWidgetItem()
-            list_item.setSizeHint(item_widget.sizeHint())
-            list_item.setData(Qt.UserRole, (order.get('part_number', ''), order.get('production_order', '')))
-            
-            self.list_widget.addItem(list_item)
-            self.list_widget.setItemWidget(list_item, item_widget)
-        
+        self.order_model.set_orders(data)
+        self.order_search.set_index(search_index)
         self.update_status()
         
     def on_loading_error(self, error_message):
@@ -781,21 +877,8 @@ class PartNumberDialog(QDialog):
             }
         """)
 
-    def filter_items(self):
-        """Filter items based on search text"""
-        search_text = self.search_box.text().lower()
-        visible_count = 0
-        
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            part_number, production_order = item.data(Qt.UserRole)
-            matches = (search_text in part_number.lower() or 
-                      search_text in production_order.lower())
-                
-            item.setHidden(not matches)
-            if matches:
-                visible_count += 1
-        
+    def filter_items(self, visible_count, total_count, search_text):
+        """Update the status once the search index has filtered the list"""
         if search_text:
             self.status_label.setText(f"Found {visible_count} matching items")
         else:
@@ -803,18 +886,18 @@ class PartNumberDialog(QDialog):
     
     def update_status(self):
         """Update status label"""
-        total_items = self.list_widget.count()
-        visible_items = sum(1 for i in range(total_items) if not self.list_widget.item(i).isHidden())
+        total_items = self.order_model.total_count()
+        visible_items = self.order_model.rowCount()
         self.status_label.setText(f"Showing {visible_items} of {total_items} items")
     
-    def handle_item_activation(self, item=None):
+    def handle_item_activation(self, index=None):
         """Handle item selection via double-click or select button and open operations dialog"""
-        if not item:
-            item = self.list_widget.currentItem()
-        if not item:
+        if not isinstance(index, QtCore.QModelIndex) or not index.isValid():
+            index = self.list_widget.currentIndex()
+        if not index.isValid():
             return
             
-        selected_data = item.data(Qt.UserRole)
+        selected_data = index.data(OrderListModel.OrderRole)
         if not selected_data:
             return
             
@@ -835,6 +918,7 @@ class PartNumberDialog(QDialog):
         if result == QDialog.Accepted:
             # If operations dialog was accepted, accept this dialog too
             self.downloaded_file = self.operations_dialog.get_downloaded_file()
+            self.downloaded_document = self.operations_dialog.get_downloaded_document()
             self.selected_page = self.operations_dialog.get_selected_page()
             self.selected_rotation = self.operations_dialog.get_selected_rotation()
             self.accept()
@@ -845,7 +929,7 @@ class PartNumberDialog(QDialog):
 
     def handle_return_key(self):
         """Handle Return/Enter key press"""
-        if self.list_widget.currentItem():
+        if self.list_widget.currentIndex().isValid():
             self.handle_item_activation()
 
     def get_selected_part_number(self):
@@ -858,17 +942,20 @@ class PartNumberDialog(QDialog):
 
     def keyPressEvent(self, event):
         """Handle keyboard navigation"""
-        if event.key() == Qt.Key_Up and self.list_widget.currentRow() == 0:
+        if event.key() == Qt.Key_Up and self.list_widget.currentIndex().row() == 0:
             self.search_box.setFocus()
         elif event.key() == Qt.Key_Down and self.search_box.hasFocus():
             self.list_widget.setFocus()
-            self.list_widget.setCurrentRow(0)
+            self.list_widget.setCurrentIndex(self.order_model.index(0, 0))
         else:
             super().keyPressEvent(event)
 
     def get_downloaded_file(self):
         return self.downloaded_file
 
+    def get_downloaded_document(self):
+        return self.downloaded_document
+
     def get_selected_page(self):
         return self.selected_page
 
@@ -1020,8 +1107,7 @@ class DocumentVersionDialog(QDialog):
                     doc_id = version.get('document_id')
                     version_id = version.get('id')
                     
-                    # Debug print
-                    print(f"Version data: doc_id={doc_id}, version_id={version_id}")
+                    logger.debug("Version data: doc_id=%s, version_id=%s", doc_id, version_id)
                     
                     # Build version text
                     version_text = f"Version {version_num}"
@@ -1049,7 +1135,7 @@ class DocumentVersionDialog(QDialog):
                 self.ok_button.setEnabled(False)
                 
         except Exception as e:
-            print(f"Error loading versions: {str(e)}")
+            logger.error("Error loading versions: %s", e)
             self.loading_label.setText(f"Error loading versions: {str(e)}")
             self.loading_label.show()
             self.ok_button.setEnabled(False)
@@ -1057,33 +1143,27 @@ class DocumentVersionDialog(QDialog):
     def select_latest_version(self):
         """Download and open the latest version"""
         try:
-            # Create temporary directory if it doesn't exist
-            temp_dir = os.path.join(os.path.expanduser("~"), ".smartmetrology", "temp")
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # Generate temp file path
-            temp_file = os.path.join(temp_dir, f"drawing_{self.production_order}.pdf")
-            
             # Show download progress
             self.loading_label.setText("Downloading latest version...")
             self.loading_label.show()
             self.ok_button.setEnabled(False)
             QtWidgets.QApplication.processEvents()
             
-            # Download the file
-            if api.download_latest_document(self.production_order, temp_file):
+            # Download into memory
+            pdf_content = api.get_latest_document(self.production_order)
+            if pdf_content:
                 self.loading_label.hide()
                 self.ok_button.setEnabled(True)
                 
-                # Store the file path
-                self.downloaded_file = temp_file
+                # Store the open document
+                self.downloaded_document = open_pdf_bytes(pdf_content)
                 self.accept()
             else:
                 self.loading_label.setText("Failed to download document")
                 self.loading_label.show()
                 
         except Exception as e:
-            print(f"Error downloading latest version: {str(e)}")
+            logger.error("Error downloading latest version: %s", e)
             self.loading_label.setText(f"Error: {str(e)}")
             self.loading_label.show()
             self.ok_button.setEnabled(True)
@@ -1095,13 +1175,6 @@ class DocumentVersionDialog(QDialog):
             return
             
         try:
-            # Create temporary directory if it doesn't exist
-            temp_dir = os.path.join(os.path.expanduser("~"), ".smartmetrology", "temp")
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # Generate temp file path
-            temp_file = os.path.join(temp_dir, f"drawing_{self.production_order}.pdf")
-            
             # Show download progress
             self.loading_label.setText("Downloading selected version...")
             self.loading_label.show()
@@ -1115,24 +1188,22 @@ class DocumentVersionDialog(QDialog):
             if not doc_id or not version_id:
                 raise ValueError("Missing document or version ID")
             
-            # Download the specific version
-            if api.download_specific_version(doc_id, version_id, temp_file):
+            # Download the specific version into memory, or read it from the local cache
+            pdf_content = drawing_cache.get_document_version(doc_id, version_id)
+            if pdf_content:
                 self.loading_label.hide()
                 
-                # Show PDF Preview Dialog
-                preview_dialog = PDFPreviewDialog(temp_file, self)
+                # Show PDF Preview Dialog on the same document the caller will get
+                pdf_doc = open_pdf_bytes(pdf_content)
+                preview_dialog = PDFPreviewDialog(pdf_doc, self)
                 if preview_dialog.exec_() == QtWidgets.QDialog.Accepted:
-                    # Store the file path and preview dialog results
-                    self.downloaded_file = temp_file
+                    # Store the document and preview dialog results
+                    self.downloaded_document = pdf_doc
                     self.selected_page = preview_dialog.get_selected_page()
                     self.selected_rotation = preview_dialog.get_rotation()
                     super().accept()
                 else:
-                    # Clean up temp file if preview was cancelled
-                    try:
-                        os.remove(temp_file)
-                    except:
-                        pass
+                    pdf_doc.close()
                     self.reject()
             else:
                 self.loading_label.setText("Failed to download document")
@@ -1140,7 +1211,7 @@ class DocumentVersionDialog(QDialog):
                 self.ok_button.setEnabled(True)
                 
         except Exception as e:
-            print(f"Error downloading version: {str(e)}")
+            logger.error("Error downloading version: %s", e)
             self.loading_label.setText(f"Error: {str(e)}")
             self.loading_label.show()
             self.ok_button.setEnabled(True)
@@ -1156,6 +1227,10 @@ class DocumentVersionDialog(QDialog):
         """Get the path to the downloaded file"""
         return getattr(self, 'downloaded_file', None)
 
+    def get_downloaded_document(self) -> Optional[fitz.Document]:
+        """Get the downloaded document, opened in memory"""
+        return getattr(self, 'downloaded_document', None)
+
     def get_selected_page(self) -> int:
         """Get the selected page number"""
         return getattr(self, 'selected_page', 0)
@@ -1167,11 +1242,9 @@ class DocumentVersionDialog(QDialog):
     def download_latest_version(self):
         """Download the latest version of the document"""
         try:
-            # Create temporary file
-            temp_file_path = os.path.join(tempfile.gettempdir(), f"drawing_{self.production_order}.pdf")
-            
-            if api.download_latest_document(self.production_order, temp_file_path):
-                self.downloaded_file = temp_file_path
+            pdf_content = api.get_latest_document(self.production_order)
+            if pdf_content:
+                self.downloaded_document = open_pdf_bytes(pdf_content)
                 self.accept()  # Just accept directly, preview will be shown by parent dialog
             else:
                 QtWidgets.QMessageBox.critical(
@@ -1308,7 +1381,7 @@ class LoginDialog(QDialog):
                 self.parent().handle_login_success(username, role)
                 self.accept()
             else:
-                print(f"Error getting user role: {role_response.text}")
+                logger.error("Error getting user role: %s", role_response.text)
                 self.show_error("Failed to get user role")
         else:
             self.show_error("Invalid credentials")
@@ -1319,6 +1392,8 @@ class OperationsDialog(QtWidgets.QDialog):
         self.part_number = part_number
         self.production_order = production_order
         self.downloaded_file = None
+        self.downloaded_document = None  # Open fitz.Document handed on to the main window
+        self.drawing_hash = None  # Content hash of that drawing, matches pre-rendered pages
         self.selected_operation = None
         self.selected_page = 0
         self.selected_rotation = 0
@@ -1522,7 +1597,7 @@ class OperationsDialog(QtWidgets.QDialog):
                 item.setData(Qt.UserRole, operation)
                 
         except Exception as e:
-            print(f"Error loading operations: {e}")
+            logger.error("Error loading operations: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to load operations: {str(e)}")
 
     def on_selection_changed(self):
@@ -1537,38 +1612,37 @@ class OperationsDialog(QtWidgets.QDialog):
         operation_number = operation_data['operation_number']
         
         # Add detailed debug prints
-        print(f"\nView Drawing Details:")
-        print(f"Part Number: {self.part_number}")
-        print(f"Production Order: {self.production_order}")
-        print(f"Operation Number: {operation_number}")
-        print(f"Operation Data: {operation_data}")
+        logger.debug("View Drawing Details:")
+        logger.debug("Part Number: %s", self.part_number)
+        logger.debug("Production Order: %s", self.production_order)
+        logger.debug("Operation Number: %s", operation_number)
+        logger.debug("Operation Data: %s", operation_data)
         
         # Store the operation number
         self.op_no = operation_number
         
         try:
-            print(f"\nMaking API request:")
-            print(f"URL will be: {api.base_url}/document-management/documents/download-latest_new/{self.production_order}/ENGINEERING_DRAWING")
+            logger.debug("Making API request:")
+            logger.debug("URL will be: %s/document-management/documents/download-latest_new/%s/ENGINEERING_DRAWING", api.base_url, self.production_order)
             
             # Get order data first
             order_data = api._make_request("/planning/all_orders")
             
-            pdf_content = api.get_ipid_drawing(
+            pdf_content = drawing_cache.get_ipid_drawing(
                 self.production_order,
                 operation_number
             )
             
             if pdf_content:
-                # Save to temp file
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-                temp_file.write(pdf_content)
-                temp_file.close()
+                # Open straight from memory; the same document goes on to the main window
+                pdf_doc = open_pdf_bytes(pdf_content)
                 
                 # Show PDF Preview Dialog with open_drawing flag set to True
-                preview_dialog = PDFPreviewDialog(temp_file.name, self, open_drawing=True)
+                preview_dialog = PDFPreviewDialog(pdf_doc, self, open_drawing=True)
                 if preview_dialog.exec_() == QDialog.Accepted:
-                    # Store the file path and metadata
-                    self.downloaded_file = temp_file.name
+                    # Store the document and metadata
+                    self.downloaded_document = pdf_doc
+                    self.drawing_hash = drawing_hash(pdf_content)
                     operation_data['order_data'] = order_data  # Store order data
                     self.selected_operation = operation_data
                     self.selected_page = preview_dialog.get_selected_page()
@@ -1580,11 +1654,7 @@ class OperationsDialog(QtWidgets.QDialog):
                     # The main application will handle opening the drawing
                     self.accept()
                 else:
-                    # Clean up temp file if preview was cancelled
-                    try:
-                        os.remove(temp_file.name)
-                    except:
-                        pass
+                    pdf_doc.close()
             else:
                 QMessageBox.warning(
                     self, 
@@ -1593,7 +1663,7 @@ class OperationsDialog(QtWidgets.QDialog):
                 )
                 
         except Exception as e:
-            print(f"Error downloading drawing: {e}")
+            logger.error("Error downloading drawing: %s", e)
             QMessageBox.critical(
                 self, 
                 "Error", 
@@ -1606,23 +1676,17 @@ class OperationsDialog(QtWidgets.QDialog):
             # Set operation number for final inspection
             self.op_no = "999"
             
-            # Use the new endpoint format with part number
-            endpoint = f"/document-management/documents/download-latest_new/{self.part_number}/ENGINEERING_DRAWING"
-            print(f"Downloading final inspection drawing from: {endpoint}")
-            
-            # Make the request with stream=True
-            pdf_content = api._make_request(endpoint, stream=True)
+            logger.debug("Downloading final inspection drawing for part: %s", self.part_number)
+            pdf_content = drawing_cache.get_engineering_drawing(self.part_number)
             
             if pdf_content:
-                # Save to temp file
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-                temp_file.write(pdf_content)
-                temp_file.close()
+                pdf_doc = open_pdf_bytes(pdf_content)
                 
                 # Show PDF Preview Dialog
-                preview_dialog = PDFPreviewDialog(temp_file.name, self)
+                preview_dialog = PDFPreviewDialog(pdf_doc, self)
                 if preview_dialog.exec_() == QDialog.Accepted:
-                    self.downloaded_file = temp_file.name
+                    self.downloaded_document = pdf_doc
+                    self.drawing_hash = drawing_hash(pdf_content)
                     self.selected_page = preview_dialog.get_selected_page()
                     self.selected_rotation = preview_dialog.get_rotation()  # Fixed method name
                     
@@ -1636,11 +1700,7 @@ class OperationsDialog(QtWidgets.QDialog):
                     
                     self.accept()
                 else:
-                    # Clean up temp file if preview was cancelled
-                    try:
-                        os.remove(temp_file.name)
-                    except:
-                        pass
+                    pdf_doc.close()
             else:
                 QMessageBox.warning(
                     self, 
@@ -1649,7 +1709,7 @@ class OperationsDialog(QtWidgets.QDialog):
                 )
                 
         except Exception as e:
-            print(f"Error opening final inspection: {e}")
+            logger.error("Error opening final inspection: %s", e)
             QMessageBox.critical(
                 self, 
                 "Error", 
@@ -1681,6 +1741,14 @@ class OperationsDialog(QtWidgets.QDialog):
         """Get the path to the downloaded file"""
         return self.downloaded_file
 
+    def get_downloaded_document(self):
+        """Get the drawing opened in memory, if it was not saved to a file"""
+        return self.downloaded_document
+
+    def get_drawing_hash(self):
+        """Get the content hash of the downloaded drawing"""
+        return self.drawing_hash
+
     def get_selected_page(self):
         """Get the selected page number"""
         return getattr(self, 'selected_page', 0)
@@ -1696,7 +1764,7 @@ class OperationsDialog(QtWidgets.QDialog):
                 return self.selected_operation.get('order_id') or self.production_order
             return self.production_order
         except Exception as e:
-            print(f"Error getting order ID: {e}")
+            logger.error("Error getting order ID: %s", e)
             return self.production_order
 
     def get_document_id(self):
@@ -1706,27 +1774,18 @@ class OperationsDialog(QtWidgets.QDialog):
                 return self.selected_operation.get('document_id') or self.production_order
             return self.production_order
         except Exception as e:
-            print(f"Error getting document ID: {e}")
+            logger.error("Error getting document ID: %s", e)
             return self.production_order
 
     def download_drawing(self):
         """Download the engineering drawing"""
         try:
-            # Use the new endpoint format with part number
-            endpoint = f"/document-management/documents/download-latest_new/{self.part_number}/ENGINEERING_DRAWING"
-            print(f"Downloading drawing from: {endpoint}")
-            
-            # Make the request
-            response = api._make_request(endpoint, stream=True)
+            logger.debug("Downloading drawing for part: %s", self.part_number)
+            response = drawing_cache.get_engineering_drawing(self.part_number)
             
             if response:
-                # Create temp file
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-                temp_file.write(response)
-                temp_file.close()
-                
-                self.downloaded_file = temp_file.name
-                print(f"Drawing downloaded to: {self.downloaded_file}")
+                self.downloaded_document = open_pdf_bytes(response)
+                logger.debug("Drawing downloaded: %s bytes", len(response))
                 
                 # Load PDF preview
                 self.load_pdf_preview()
@@ -1734,7 +1793,7 @@ class OperationsDialog(QtWidgets.QDialog):
                 raise Exception("Failed to download drawing")
                 
         except Exception as e:
-            print(f"Error downloading drawing: {e}")
+            logger.error("Error downloading drawing: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to download drawing: {str(e)}")
 
 class MeasurementInstrumentDialog(QDialog):
@@ -1824,7 +1883,11 @@ class MeasurementInstrumentDialog(QDialog):
                 background-color: white;
             }
         """)
-        self.search_box.textChanged.connect(self.filter_instruments)
+        self.instrument_search = SearchController(
+            self.search_box,
+            set_visible=lambda row, visible: self.instrument_list.item(row).setHidden(not visible),
+            on_filtered=self.filter_instruments
+        )
         search_layout.addWidget(self.search_box)
         layout.addWidget(search_container)
         
@@ -1995,32 +2058,11 @@ class MeasurementInstrumentDialog(QDialog):
         else:
             self.count_label.setText(f"Showing {visible_count} of {total_count}")
 
-    def filter_instruments(self, text):
-        """Filter instruments based on search text"""
-        search_text = self.search_box.text().strip().lower()
-        visible_count = 0
-        total_count = self.instrument_list.count()
-        
-        for i in range(self.instrument_list.count()):
-            item = self.instrument_list.item(i)
-            widget = self.instrument_list.itemWidget(item)
-            if widget:
-                instrument_data = widget.property("instrument_data")
-                if instrument_data:
-                    # Get category name properly for matching
-                    category_name = instrument_data['name']
-                    if " - " in category_name:
-                        category_name = category_name.split(" - ")[0]
-                    
-                    # Match by category name only
-                    search_match = (not search_text or 
-                                  search_text in category_name.lower())
-                    
-                    # Show/hide based on matches
-                    item.setHidden(not search_match)
-                    if not item.isHidden():
-                        visible_count += 1
-        
+        # Rows were shown/hidden here, so the next search has to reapply to all of them
+        self.instrument_search.invalidate()
+
+    def filter_instruments(self, visible_count, total_count, search_text):
+        """Update the count once the search index has filtered the list"""
         # Update count label based on filter state
         if not search_text:
             self.count_label.setText(f"Total: {total_count}")
@@ -2051,10 +2093,10 @@ class MeasurementInstrumentDialog(QDialog):
             self.instrument_list.setVisible(False)
 
             # Use fixed category ID for Instruments
-            instruments_category_id = 2  # Changed back to 3 from 5
+            instruments_category_id = inventory.INSTRUMENTS_CATEGORY_ID
 
-            # Get subcategories for Instruments category
-            subcategories = api.get_inventory_subcategories(instruments_category_id)
+            # Get subcategories for Instruments category from the shared inventory cache
+            subcategories = inventory.get_subcategories()
             if not subcategories:
                 raise Exception("Failed to fetch subcategories")
 
@@ -2066,6 +2108,7 @@ class MeasurementInstrumentDialog(QDialog):
 
             # Track unique categories to avoid duplicates
             added_categories = set()
+            category_names = []
             
             # Add each unique category once
             for subcategory in subcategories:
@@ -2073,6 +2116,7 @@ class MeasurementInstrumentDialog(QDialog):
                     category_name = subcategory['name']
                     if category_name not in added_categories:
                         added_categories.add(category_name)
+                        category_names.append(category_name.split(" - ")[0])
                         
                         # Create item with just the category name
                         item = QListWidgetItem()
@@ -2094,10 +2138,13 @@ class MeasurementInstrumentDialog(QDialog):
             total_count = len(added_categories)
             self.count_label.setText(f"Total: {total_count}")
 
+            # Index the names for search, one entry per list row
+            self.instrument_search.set_entries(category_names)
+
         except Exception as e:
             error_msg = f"Error loading instruments: {str(e)}"
             self.loading_label.setText(error_msg)
-            print(error_msg)
+            logger.error("%s", error_msg)
 
     def get_selected_instrument(self):
         """Get the selected instrument(s)"""
@@ -2152,18 +2199,14 @@ class MeasurementInstrumentDialog(QDialog):
     async def discover_devices(self):
         """Discover Bluetooth devices using Bleak"""
         try:
-            import asyncio
-            import nest_asyncio
             from bleak import BleakScanner
             
-            nest_asyncio.apply()
-            
             async with BleakScanner() as scanner:
                 devices = await scanner.discover()
                 return devices
                 
         except Exception as e:
-            print(f"Error discovering Bluetooth devices: {str(e)}")
+            logger.error("Error discovering Bluetooth devices: %s", e)
             raise e
 
 class DeviceDetailsDialog(QDialog):
@@ -2179,10 +2222,11 @@ class DeviceDetailsDialog(QDialog):
     def get_calibration_data(self):
         """Get calibration data for all instruments"""
         try:
-            # Get fresh calibration data from API
-            calibrations = api.get_calibrations()
+            # Calibrations fetched at login if that has already finished (this runs on the
+            # GUI thread, so it doesn't wait for it), else straight from the API
+            calibrations = warm_up.result(WarmUpTask.CALIBRATIONS, timeout=0) or api.get_calibrations()
             if not calibrations:
-                print("Warning: No calibration data found")
+                logger.warning("No calibration data found")
                 return {}
             
             # Process calibration data
@@ -2214,7 +2258,7 @@ class DeviceDetailsDialog(QDialog):
                             else:
                                 status = 'valid'
                     except Exception as e:
-                        print(f"Error calculating calibration status: {e}")
+                        logger.error("Error calculating calibration status: %s", e)
                     
                     calibration_map[item_id] = {
                         'status': status,
@@ -2233,7 +2277,7 @@ class DeviceDetailsDialog(QDialog):
             return calibration_map
             
         except Exception as e:
-            print(f"Error getting calibration data: {str(e)}")
+            logger.error("Error getting calibration data: %s", e)
             return {}
 
     def setup_ui(self):
@@ -2284,7 +2328,10 @@ class DeviceDetailsDialog(QDialog):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search instruments...")
-        self.search_input.textChanged.connect(self.filter_instruments)
+        self.instrument_search = SearchController(
+            self.search_input,
+            set_visible=self.filter_instruments
+        )
         self.search_input.setStyleSheet("""
             QLineEdit {
                 border: none;
@@ -2468,31 +2515,23 @@ class DeviceDetailsDialog(QDialog):
             # If no instruments provided, try to load them
             if not instruments:
                 # Try to load instruments if none were passed
-                instruments_category_id = 2
-                subcategories = api.get_inventory_subcategories(instruments_category_id)
-                
-                if subcategories:
-                    instruments = []
-                    for subcategory in subcategories:
-                        if subcategory.get('category_id') == instruments_category_id:
-                            items = api.get_inventory_items(subcategory['id'])
-                            if items:
-                                for item in items:
-                                    # Get instrument code
-                                    dynamic_data = item.get('dynamic_data', {})
-                                    instrument_code = dynamic_data.get('Instrument code')
-                                    
-                                    if not instrument_code:
-                                        continue
-                                        
-                                    instruments.append({
-                                        'name': f"{subcategory['name']} - {instrument_code}",
-                                        'id': item.get('id'),
-                                        'subcategory_id': subcategory['id'],
-                                        'subcategory_name': subcategory['name'],
-                                        'instrument_code': instrument_code,
-                                        'dynamic_data': dynamic_data
-                                    })
+                instruments = []
+                for subcategory, item in inventory.get_instrument_items():
+                    # Get instrument code
+                    dynamic_data = item.get('dynamic_data', {})
+                    instrument_code = dynamic_data.get('Instrument code')
+                    
+                    if not instrument_code:
+                        continue
+                        
+                    instruments.append({
+                        'name': f"{subcategory['name']} - {instrument_code}",
+                        'id': item.get('id'),
+                        'subcategory_id': subcategory['id'],
+                        'subcategory_name': subcategory['name'],
+                        'instrument_code': instrument_code,
+                        'dynamic_data': dynamic_data
+                    })
             
             # Clear existing widgets
             for widget in self.instrument_widgets:
@@ -2627,6 +2666,12 @@ class DeviceDetailsDialog(QDialog):
                 
                 row += 1
             
+            # Index category and code for search, one entry per widget
+            self.instrument_search.set_entries([
+                f"{instrument.get('subcategory_name', '')}\n{instrument.get('instrument_code', '')}"
+                for instrument in (widget.property('instrument_data') for widget in self.instrument_widgets)
+            ])
+            
             # Pre-select current instrument if it exists and is valid
             if self.instrument_data:
                 for widget in self.instrument_widgets:
@@ -2636,9 +2681,7 @@ class DeviceDetailsDialog(QDialog):
                         break
             
         except Exception as e:
-            print(f"Error populating instruments: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error populating instruments: %s", e)
     
     def select_instrument(self, widget):
         """Handle selection of an instrument"""
@@ -2674,16 +2717,9 @@ class DeviceDetailsDialog(QDialog):
         # Update current instrument data
         self.instrument_data = widget.property('instrument_data')
     
-    def filter_instruments(self, text):
-        """Filter instruments based on search text"""
-        text = text.lower()
-        for widget in self.instrument_widgets:
-            instrument = widget.property('instrument_data')
-            category = instrument.get('subcategory_name', '').lower()
-            code = instrument.get('instrument_code', '').lower()
-            
-            visible = text in category or text in code
-            widget.setVisible(visible)
+    def filter_instruments(self, index, visible):
+        """Show or hide one instrument row as the search narrows or widens"""
+        self.instrument_widgets[index].setVisible(visible)
             
     def save_selection(self):
         """Save the selected instrument and close dialog"""
@@ -2870,7 +2906,10 @@ class ReportFolderDialog(QDialog):
         search_icon = QLabel("🔍")
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("Search folders...")
-        self.search_box.textChanged.connect(self.filter_folders)
+        self.folder_search = SearchController(
+            self.search_box,
+            set_visible=self.filter_folders
+        )
         search_layout.addWidget(search_icon)
         search_layout.addWidget(self.search_box)
         tree_layout.addLayout(search_layout)
@@ -2945,28 +2984,16 @@ class ReportFolderDialog(QDialog):
         
         self.setLayout(main_layout)
         
-    def filter_folders(self, text):
-        """Filter folders in tree view based on search text"""
-        if not text:
-            # Show all items
-            self.populate_tree_view(self.folder_structure)
-            return
-            
-        def match_folder(folder, search_text):
-            if search_text.lower() in folder['name'].lower():
-                return True
-            if 'children' in folder:
-                return any(match_folder(child, search_text) for child in folder['children'])
-            return False
-            
-        # Filter the folder structure
-        filtered_structure = [
-            folder for folder in self.folder_structure
-            if match_folder(folder, text)
-        ]
-        
-        # Update tree view with filtered results
-        self.populate_tree_view(filtered_structure)
+    def filter_folders(self, row, visible):
+        """Show or hide a top-level folder; it stays visible if any folder under it matches"""
+        self.tree_view.setRowHidden(row, QtCore.QModelIndex(), not visible)
+
+    def folder_search_text(self, folder):
+        """All folder names in a subtree, one per line, so a match anywhere keeps the top-level folder"""
+        names = [folder.get('name', '')]
+        for child in folder.get('children') or []:
+            names.append(self.folder_search_text(child))
+        return "\n".join(names)
         
     def show_status(self, message, is_error=False):
         """Show status message with appropriate styling"""
@@ -3004,7 +3031,7 @@ class ReportFolderDialog(QDialog):
             self.accept()
             
         except Exception as e:
-            print(f"Error during save: {str(e)}")
+            logger.error("Error during save: %s", e)
             self.show_status(f"Error saving report: {str(e)}", True)
             self.save_successful = False
             self.is_saving = False
@@ -3131,12 +3158,15 @@ class ReportFolderDialog(QDialog):
         try:
             self.folder_structure = api.get_report_structure()
             if self.folder_structure:
-                print("Received folder structure:", self.folder_structure)
+                logger.debug("Received folder structure: %s", self.folder_structure)
                 self.populate_tree_view(self.folder_structure)
+                self.folder_search.set_entries(
+                    self.folder_search_text(folder) for folder in self.folder_structure
+                )
             else:
                 self.show_status("No folder structure received from API", True)
         except Exception as e:
-            print(f"Error loading folder structure: {str(e)}")
+            logger.error("Error loading folder structure: %s", e)
             self.show_status(f"Failed to load folder structure: {str(e)}", True)
             
     def populate_tree_view(self, folders, parent_item=None):
@@ -3158,10 +3188,10 @@ class ReportFolderDialog(QDialog):
                     if 'children' in folder and folder['children']:
                         self.populate_tree_view(folder['children'], item)
                 except KeyError as e:
-                    print(f"Error processing folder: {folder}, missing key: {str(e)}")
+                    logger.error("Error processing folder: %s, missing key: %s", folder, e)
                     continue
         except Exception as e:
-            print(f"Error populating tree view: {str(e)}")
+            logger.error("Error populating tree view: %s", e)
             self.show_status("Error loading folders", True)
             
     def handle_save(self):
@@ -3189,7 +3219,7 @@ class ReportFolderDialog(QDialog):
             self.accept()
             
         except Exception as e:
-            print(f"Error during save: {str(e)}")
+            logger.error("Error during save: %s", e)
             self.show_status(f"Error saving report: {str(e)}", True)
             self.save_successful = False
             self.is_saving = False
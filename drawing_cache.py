@@ -0,0 +1,264 @@
+import logging
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from api_endpoints import api
+
+logger = logging.getLogger(__name__)
+
+
+class DrawingCache:
+    """Content-addressed on-disk cache for downloaded drawings
+
+    PDFs are stored once per SHA-256 under the cache directory; index.json maps a
+    drawing key (e.g. IPID + operation, or doc_id + version_id) to its blob, the
+    server version it was fetched at and when it was last used. The cache is kept
+    under max_bytes by evicting the least recently used keys.
+
+    Before a cached drawing is reused, the server's current version is compared with
+    the one it was cached at: the latest version id from get_document_versions for an
+    engineering drawing. An IPID drawing is revalidated with a single conditional GET
+    carrying the ETag / Last-Modified it was cached with, and the cached copy is served
+    on 304; one the server gives neither for is always downloaded again. If the server
+    can't be reached the cached copy is used as is.
+    """
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+    # How long a latest-version lookup is trusted before asking the server again
+    VERSION_CHECK_TTL = 60.0
+
+    # Drawings without any version info from the server are refetched after this long
+    UNVERSIONED_MAX_AGE = 3600.0
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser("~"), ".smartmetrology", "drawings")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.RLock()
+        self._version_checks: Dict[str, tuple] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    # ------------------------------------------------------------------
+    # Drawing lookups, mirroring the APIHandler download methods
+    # ------------------------------------------------------------------
+    def get_ipid_drawing(self, production_order: str, operation_number: str,
+                         timeout: Optional[float] = None) -> Optional[bytes]:
+        """Get an IPID drawing, from disk when the server still has the same version
+
+        Args:
+            timeout: Seconds each request may take; None uses the APIHandler default
+        """
+        key = f"ipid/{production_order}/{operation_number}"
+        cached = self.get(key, allow_stale=True)
+        with self._lock:
+            entry = dict(self._index.get(key) or {}) if cached is not None else {}
+            checked = self._version_checks.get(key)
+        etag, last_modified = entry.get('etag'), entry.get('last_modified')
+        if (etag or last_modified) and checked and time.time() - checked[0] < self.VERSION_CHECK_TTL:
+            logger.debug("Drawing cache hit: %s", key)
+            return cached
+
+        download = api.get_ipid_drawing_if_modified(production_order, operation_number,
+                                                    etag=etag, last_modified=last_modified,
+                                                    timeout=timeout)
+        if download.not_modified:
+            logger.debug("Drawing cache hit: %s", key)
+            with self._lock:
+                self._version_checks[key] = (time.time(), etag or last_modified)
+            return cached
+
+        if download.content:
+            logger.debug("Drawing cache miss: %s", key)
+            self.put(key, download.content, download.etag or download.last_modified,
+                     etag=download.etag, last_modified=download.last_modified)
+            with self._lock:
+                self._version_checks[key] = (time.time(), download.etag or download.last_modified)
+            return download.content
+
+        # Download failed (offline?) - fall back to whatever we have, even if stale
+        return cached
+
+    def get_engineering_drawing(self, part_number: str) -> Optional[bytes]:
+        """Get the latest engineering drawing for a part number"""
+        return self._fetch(
+            f"engineering/{part_number}",
+            lambda: api.get_engineering_drawing(part_number),
+            self._latest_version_id(part_number)
+        )
+
+    def get_document_version(self, doc_id: int, version_id: int) -> Optional[bytes]:
+        """Get a specific document version; these never change, so a cached copy is always valid"""
+        return self._fetch(
+            f"version/{doc_id}/{version_id}",
+            lambda: api.get_document_version(doc_id, version_id),
+            str(version_id)
+        )
+
+    def _fetch(self, key: str, download: Callable[[], Optional[bytes]], version: Optional[str]) -> Optional[bytes]:
+        """Return cached bytes for key if still valid, otherwise download and store them"""
+        cached = self.get(key, version)
+        if cached is not None:
+            logger.debug("Drawing cache hit: %s", key)
+            return cached
+
+        logger.debug("Drawing cache miss: %s", key)
+        data = download()
+        if data:
+            self.put(key, data, version)
+            return data
+
+        # Download failed (offline?) - fall back to whatever we have, even if stale
+        return self.get(key, allow_stale=True)
+
+    def _latest_version_id(self, document_ref: str) -> Optional[str]:
+        """Latest version id the server reports for a document, or None if unknown"""
+        def lookup():
+            versions = api.get_document_versions(document_ref) or []
+            ids = [v.get('id') for v in versions if v.get('id') is not None]
+            return str(max(ids)) if ids else None
+
+        return self._checked_version(document_ref, lookup)
+
+    def _checked_version(self, ref: str, lookup: Callable[[], Optional[str]]) -> Optional[str]:
+        """Result of a version lookup, reused for VERSION_CHECK_TTL; None if unknown"""
+        now = time.time()
+        with self._lock:
+            checked = self._version_checks.get(ref)
+        if checked and now - checked[0] < self.VERSION_CHECK_TTL:
+            return checked[1]
+
+        # Looked up outside the lock, so a slow server doesn't hold up other cache users
+        version = None
+        try:
+            version = lookup()
+        except Exception as e:
+            logger.error("Error checking drawing version: %s", e)
+
+        with self._lock:
+            self._version_checks[ref] = (now, version)
+        return version
+
+    # ------------------------------------------------------------------
+    # Cache storage
+    # ------------------------------------------------------------------
+    def get(self, key: str, version: Optional[str] = None, allow_stale: bool = False) -> Optional[bytes]:
+        """
+        Get cached bytes for a key
+
+        Args:
+            key: Drawing key
+            version: Expected server version; None accepts any cached copy
+            allow_stale: Return the cached copy even if it is out of date
+
+        Returns:
+            The cached PDF bytes, or None if missing or out of date
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if not entry:
+                return None
+            if not allow_stale:
+                if version is not None and entry.get('version') != version:
+                    return None
+                if version is None and entry.get('version') is None:
+                    if time.time() - entry.get('stored_at', 0) > self.UNVERSIONED_MAX_AGE:
+                        return None
+
+            try:
+                with open(self._blob_path(entry['sha256']), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                self._index.pop(key, None)
+                self._save_index()
+                return None
+
+            entry['last_access'] = time.time()
+            self._save_index()
+            return data
+
+    def put(self, key: str, data: bytes, version: Optional[str] = None,
+            etag: Optional[str] = None, last_modified: Optional[str] = None) -> str:
+        """Store bytes under key, with the validators to revalidate them with, and return their SHA-256"""
+        sha256 = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            blob_path = self._blob_path(sha256)
+            if not os.path.exists(blob_path):
+                temp_path = f"{blob_path}.tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, blob_path)
+
+            now = time.time()
+            self._index[key] = {
+                'sha256': sha256,
+                'version': version,
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': len(data),
+                'stored_at': now,
+                'last_access': now
+            }
+            self._evict()
+            self._save_index()
+        return sha256
+
+    def clear(self):
+        """Remove every cached drawing"""
+        with self._lock:
+            for sha256 in {entry['sha256'] for entry in self._index.values()}:
+                self._remove_blob(sha256)
+            self._index = {}
+            self._version_checks = {}
+            self._save_index()
+
+    def _evict(self):
+        """Drop least recently used keys until the unique blobs fit in max_bytes"""
+        blob_sizes = {entry['sha256']: entry['size'] for entry in self._index.values()}
+        total = sum(blob_sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            del self._index[key]
+            sha256 = entry['sha256']
+            if not any(e['sha256'] == sha256 for e in self._index.values()):
+                self._remove_blob(sha256)
+                total -= blob_sizes[sha256]
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.cache_dir, f"{sha256}.pdf")
+
+    def _remove_blob(self, sha256: str):
+        try:
+            os.remove(self._blob_path(sha256))
+        except OSError:
+            pass
+
+    def _load_index(self) -> Dict[str, dict]:
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        try:
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(self._index, f)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            logger.error("Error saving drawing cache index: %s", e)
+
+
+# Create singleton instance
+drawing_cache = DrawingCache()
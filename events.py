@@ -1,3 +1,4 @@
+import logging
 from PyQt5.QtCore import Qt, QRectF, QEvent, QPointF
 from PyQt5.QtGui import QPen, QMouseEvent, QBrush, QColor, QPainterPath, QPolygonF
 from PyQt5.QtWidgets import QGraphicsPolygonItem, QGraphicsRectItem, QGraphicsView, QDialog, QMenu, QGraphicsTextItem, \
@@ -5,6 +6,8 @@ from PyQt5.QtWidgets import QGraphicsPolygonItem, QGraphicsRectItem, QGraphicsVi
 from dialogs import DimensionDialog
 from highlight_manager import HighlightManager
 
+logger = logging.getLogger(__name__)
+
 class EventHandler:
     @staticmethod
     def mousePressEvent(view, event):
@@ -207,7 +210,7 @@ class EventHandler:
             else:
                 QGraphicsView.wheelEvent(view, event)
         except Exception as e:
-            print(f"Error in wheelEvent: {str(e)}")
+            logger.error("Error in wheelEvent: %s", e)
             QGraphicsView.wheelEvent(view, event)
 
     @staticmethod
@@ -436,6 +439,8 @@ class TableEvents:
                 
                 # Remove the row from table
                 window.ui.dimtable.removeRow(row)
+                if hasattr(window, 'measurement_ingestor'):
+                    window.measurement_ingestor.remove_row(row)
 
                 # Clear any highlight if present
                 window.clear_highlighted_bbox()
@@ -466,9 +471,7 @@ class TableEvents:
                                     
 
         except Exception as e:
-            print(f"Error deleting table row and bbox: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error deleting table row and bbox: %s", e)
         
  
     @staticmethod
@@ -481,14 +484,14 @@ class TableEvents:
             # Get bbox data from table
             nominal_item = window.ui.dimtable.item(row, 2)
             if not nominal_item:
-                print("No nominal item found")
+                logger.debug("No nominal item found")
                 return
                 
             points = nominal_item.data(Qt.UserRole)  # Now getting points directly
-            print(f"\nHighlight points data for row {row}: {points}")  # Debug print
+            logger.debug("Highlight points data for row %s: %s", row, points)
             
             if not points:
-                print("No points data found")
+                logger.debug("No points data found")
                 return
                 
             # Create highlight polygon
@@ -514,7 +517,7 @@ class TableEvents:
                     top_y = y_min - 50  # Position balloon above bbox
                     circle_radius = 12
                     
-                    print(f"Balloon position: center_x={center_x}, top_y={top_y}")  # Debug print
+                    logger.debug("Balloon position: center_x=%s, top_y=%s", center_x, top_y)
                     
                     # Create balloon elements
                     window.balloon_circle = QGraphicsEllipseItem(
@@ -551,15 +554,15 @@ class TableEvents:
                     window.ui.pdf_view.scene().addItem(window.balloon_text)
                     
                 except Exception as balloon_error:
-                    print(f"Error creating balloon: {balloon_error}")
-                    print(f"Points: {points}")
+                    logger.error("Error creating balloon: %s", balloon_error)
+                    logger.debug("Points: %s", points)
                     
             except Exception as e:
-                print(f"Error creating highlight polygon: {e}")
-                print(f"Points data: {points}")
+                logger.error("Error creating highlight polygon: %s", e)
+                logger.debug("Points data: %s", points)
                 
         except Exception as e:
-            print(f"Error highlighting bbox: {str(e)}")
+            logger.error("Error highlighting bbox: %s", e)
 
 class VisualizationEvents:
     @staticmethod
@@ -613,7 +616,7 @@ class VisualizationEvents:
             return True
 
         except Exception as e:
-            print(f"Error adding to table and scene: {str(e)}")
+            logger.error("Error adding to table and scene: %s", e)
             return False
 
     @staticmethod
@@ -737,4 +740,4 @@ class VisualizationEvents:
                 window.ui.pdf_view.scene().addItem(window.balloon_text)
 
         except Exception as e:
-            print(f"Error highlighting bbox: {str(e)}") 
\ No newline at end of file
+            logger.error("Error highlighting bbox: %s", e) 
\ No newline at end of file
@@ -0,0 +1,69 @@
+from typing import Dict, Optional, Tuple
+
+from ble_service import ble_service, SessionState
+from instrument_resolver import instrument_resolver, AddressMatch
+
+
+class GaugeConnectionManager:
+    """Which gauges are connected, for which instrument, and where to find them
+
+    Resolved addresses are cached per Instrument column text, so measuring the next
+    row or operation with the same gauge neither resolves nor reconnects: the session
+    stays open in the BLE service, which reconnects by itself when the gauge drops out.
+    Only exact matches are cached; call forget() after an association changes.
+    """
+
+    def __init__(self):
+        self._addresses: Dict[str, AddressMatch] = {}
+        # Address -> (instrument code, instrument column text)
+        self.sessions: Dict[str, Tuple[str, str]] = {}
+
+    def resolve(self, instrument_text: str, row_text: str = "") -> Optional[AddressMatch]:
+        """Address for an instrument, from the cache when it has been resolved before"""
+        match = self._addresses.get(instrument_text)
+        if match:
+            return match
+
+        match = instrument_resolver.resolve(instrument_text, row_text)
+        if match and match.exact:
+            self._addresses[instrument_text] = match
+        return match
+
+    def cached(self, instrument_text: str) -> Optional[AddressMatch]:
+        """Previously resolved address for an instrument, without looking it up"""
+        return self._addresses.get(instrument_text)
+
+    def forget(self, instrument_text: Optional[str] = None):
+        """Drop a cached address, or all of them"""
+        if instrument_text is None:
+            self._addresses.clear()
+            instrument_resolver.invalidate()
+        else:
+            self._addresses.pop(instrument_text, None)
+
+    def is_connected(self, address: str) -> bool:
+        """True while the gauge has a session, including while it is being reconnected"""
+        return address in self.sessions and ble_service.session_state(address) != SessionState.CLOSED
+
+    def connect(self, match: AddressMatch, instrument_text: str):
+        """Open a session for a resolved gauge; an open session is reused"""
+        self.sessions[match.bluetooth_address] = (match.instrument_code, instrument_text)
+        ble_service.connect_device(match.bluetooth_address, match.instrument_code)
+
+    def disconnect(self, address: str):
+        self.sessions.pop(address, None)
+        ble_service.disconnect_device(address)
+
+    def disconnect_all(self):
+        self.sessions.clear()
+        ble_service.disconnect_all()
+
+    def session_closed(self, address: str):
+        """The BLE service ended a session on its own, e.g. the first connect failed"""
+        # A quick reconnect may already have opened a new session for the same gauge
+        if ble_service.session_state(address) == SessionState.CLOSED:
+            self.sessions.pop(address, None)
+
+
+# Create singleton instance
+gauge_connections = GaugeConnectionManager()
@@ -1,3 +1,4 @@
+import logging
 import math
 import fitz
 from PyQt5 import QtGui, QtCore, QtWidgets
@@ -5,12 +6,9 @@ from PyQt5.QtCore import Qt, QRectF, QPointF
 from PyQt5.QtWidgets import (QGraphicsItem, QGraphicsView, QGraphicsPolygonItem, QGraphicsTextItem,
                              QTableWidgetItem, QGraphicsEllipseItem, QGraphicsRectItem, QMessageBox, QPushButton)
 from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QPainterPath, QPolygonF, QImage
-from ultralytics import YOLO
 from events import EventHandler
 import os
 import sys
-from utils import resource_path  # Add import for resource_path
-import cv2
 import numpy as np
 
 import types
@@ -20,6 +18,10 @@ from PyQt5.QtGui import QBrush
 from highlight_manager import HighlightManager  # Update this import
 from algorithms import ClusterDetector, DimensionParser
 from algorithms import ZoneDetector
+from profiling import profiler
+from model_loader import yolo_models
+
+logger = logging.getLogger(__name__)
 
 
 class CustomGraphicsView(QGraphicsView):
@@ -38,15 +40,6 @@ class CustomGraphicsView(QGraphicsView):
         self.stamp_start = None
         self.stamp_rect = None
 
-        try:
-            model_path = os.path.abspath(resource_path('best.pt'))
-            print(f"Graphics View - Loading YOLO model from: {model_path}")
-            print(f"Graphics View - File exists: {os.path.exists(model_path)}")
-            self.yolo_model = YOLO(model_path)
-        except Exception as e:
-            print(f"Graphics View - Error loading YOLO model: {str(e)}")
-            self.yolo_model = None
-
         self.setRenderHints(
             QPainter.Antialiasing |
             QPainter.SmoothPixmapTransform |
@@ -82,14 +75,14 @@ class CustomGraphicsView(QGraphicsView):
     def reset_view(self):
         """Completely reset the view and scene state"""
         try:
-            print("\n=== RESETTING VIEW ===")
-            print(f"Current scene: {self.scene()}")
-            print(f"Scene items before clear: {len(self.scene().items()) if self.scene() else 0}")
+            logger.debug("=== RESETTING VIEW ===")
+            logger.debug("Current scene: %s", self.scene())
+            logger.debug("Scene items before clear: %s", len(self.scene().items()) if self.scene() else 0)
             
             # Clear all items from scene
             if self.scene():
                 self.scene().clear()
-                print("Scene cleared")
+                logger.debug("Scene cleared")
             
             # Reset internal state
             self.pdf_items = []
@@ -99,21 +92,19 @@ class CustomGraphicsView(QGraphicsView):
             self.move_mode = False
             self.dynamic_zoom_mode = False
             self.zoom_area_mode = False
-            print("Internal state reset")
+            logger.debug("Internal state reset")
             
             # Reset view transformation
             self.resetTransform()
-            print("View transformation reset")
+            logger.debug("View transformation reset")
             
             # Force viewport update
             self.viewport().update()
-            print(f"Scene items after clear: {len(self.scene().items()) if self.scene() else 0}")
-            print("=== VIEW RESET COMPLETE ===\n")
+            logger.debug("Scene items after clear: %s", len(self.scene().items()) if self.scene() else 0)
+            logger.debug("=== VIEW RESET COMPLETE ===")
             
         except Exception as e:
-            print(f"Error in reset_view: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in reset_view: %s", e)
 
     def clearOCRItems(self, clear_all=True):
         """Safely clear OCR items"""
@@ -124,7 +115,7 @@ class CustomGraphicsView(QGraphicsView):
                     if item and not item.scene() is None:  # Check if item still exists in scene
                         self.scene().removeItem(item)
                 except (RuntimeError, Exception) as e:
-                    print(f"Error removing item: {str(e)}")
+                    logger.error("Error removing item: %s", e)
                     continue
             self.pdf_items.clear()
 
@@ -152,7 +143,7 @@ class CustomGraphicsView(QGraphicsView):
                     continue
 
         except Exception as e:
-            print(f"Error in updateBBoxScaling: {str(e)}")
+            logger.error("Error in updateBBoxScaling: %s", e)
 
     def clearYOLODetections(self):
         """Clear stored YOLO detections"""
@@ -233,6 +224,12 @@ class CustomGraphicsView(QGraphicsView):
             self.scene().removeItem(self.current_rect)
             self.current_rect = None
 
+    @property
+    def yolo_model(self):
+        """The YOLO model shared with the main window, loaded on first use"""
+        return yolo_models.get()
+
+    @profiler.action('auto_balloon')
     def processSelectedArea(self, rect):
         """Process only the selected area for detection"""
         try:
@@ -252,11 +249,11 @@ class CustomGraphicsView(QGraphicsView):
                     if bbox:
                         existing_boxes.append(bbox)
 
-            print(f"Found {len(existing_boxes)} existing bounding boxes")
+            logger.debug("Found %s existing bounding boxes", len(existing_boxes))
 
             # Check if loaded_page is available
             if not hasattr(self.main_window, 'loaded_page') or self.main_window.loaded_page is None:
-                print("Error: No PDF page is currently loaded. Cannot process selected area.")
+                logger.error("Error: No PDF page is currently loaded. Cannot process selected area.")
                 QtWidgets.QMessageBox.warning(self, "No Page Loaded", "No PDF page is currently loaded. Please load a drawing before selecting an area.")
                 return
 
@@ -292,19 +289,19 @@ class CustomGraphicsView(QGraphicsView):
                             for existing_box in existing_boxes:
                                 # Check for overlap
                                 if self.calculate_iou(scene_box, existing_box) > 0.1:
-                                    print(f"Skipping PDF detection - overlaps with existing box")
+                                    logger.debug("Skipping PDF detection - overlaps with existing box")
                                     is_valid = False
                                     break
                                 
                                 # Check if new box is inside existing box
                                 if self.is_box_inside(scene_box, existing_box):
-                                    print(f"Skipping PDF detection - inside existing box")
+                                    logger.debug("Skipping PDF detection - inside existing box")
                                     is_valid = False
                                     break
                                 
                                 # Check if existing box is inside new box
                                 if self.is_box_inside(existing_box, scene_box):
-                                    print(f"Skipping PDF detection - contains existing box")
+                                    logger.debug("Skipping PDF detection - contains existing box")
                                     is_valid = False
                                     break
 
@@ -321,6 +318,8 @@ class CustomGraphicsView(QGraphicsView):
             yolo_results = []
             if self.yolo_model:
                 try:
+                    import cv2
+
                     # Convert scene coordinates to image coordinates
                     scene_rect = QRectF(x0, y0, rect.width(), rect.height())
 
@@ -377,19 +376,19 @@ class CustomGraphicsView(QGraphicsView):
                                 for existing_box in existing_boxes:
                                     # Check for overlap
                                     if self.calculate_iou(yolo_box, existing_box) > 0.1:
-                                        print(f"Skipping YOLO detection - overlaps with existing box")
+                                        logger.debug("Skipping YOLO detection - overlaps with existing box")
                                         is_valid = False
                                         break
                                     
                                     # Check if new box is inside existing box
                                     if self.is_box_inside(yolo_box, existing_box):
-                                        print(f"Skipping YOLO detection - inside existing box")
+                                        logger.debug("Skipping YOLO detection - inside existing box")
                                         is_valid = False
                                         break
                                     
                                     # Check if existing box is inside new box
                                     if self.is_box_inside(existing_box, yolo_box):
-                                        print(f"Skipping YOLO detection - contains existing box")
+                                        logger.debug("Skipping YOLO detection - contains existing box")
                                         is_valid = False
                                         break
 
@@ -401,18 +400,16 @@ class CustomGraphicsView(QGraphicsView):
                                         'class_name': result.names[int(box.cls)]
                                     })
 
-                    print(f"Found {len(yolo_results)} new YOLO detections")
+                    logger.debug("Found %s new YOLO detections", len(yolo_results))
 
                 except Exception as e:
-                    print(f"Error in YOLO processing: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("Error in YOLO processing: %s", e)
 
             # Only add new detections that don't overlap with existing ones
             if pdf_results or yolo_results:
-                print(f"\n=== Processing New Detections ===")
-                print(f"New PDF detections: {len(pdf_results)}")
-                print(f"New YOLO detections: {len(yolo_results)}")
+                logger.debug("=== Processing New Detections ===")
+                logger.debug("New PDF detections: %s", len(pdf_results))
+                logger.debug("New YOLO detections: %s", len(yolo_results))
 
                 # Update the main window's detections with only new detections
                 self.main_window.ocr_results.extend(pdf_results)
@@ -428,9 +425,7 @@ class CustomGraphicsView(QGraphicsView):
                 )
 
         except Exception as e:
-            print(f"Error processing selected area: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error processing selected area: %s", e)
 
     def calculate_iou(self, box1, box2):
         """Calculate Intersection over Union between two bounding boxes"""
@@ -466,7 +461,7 @@ class CustomGraphicsView(QGraphicsView):
             return intersection_area / union_area if union_area > 0 else 0.0
 
         except Exception as e:
-            print(f"Error calculating IoU: {str(e)}")
+            logger.error("Error calculating IoU: %s", e)
             return 0.0
 
     def is_box_inside(self, inner_box, outer_box):
@@ -490,7 +485,7 @@ class CustomGraphicsView(QGraphicsView):
             return outer_rect.contains(inner_rect)
 
         except Exception as e:
-            print(f"Error checking box containment: {str(e)}")
+            logger.error("Error checking box containment: %s", e)
             return False
 
     def addCustomBBox(self, points, dimension_data):
@@ -554,12 +549,10 @@ class CustomGraphicsView(QGraphicsView):
                 self.scene().addItem(balloon_item)
                 # self.ocr_items.append(balloon_item)  # Add to ocr_items for tracking
 
-            print(f"Added custom bbox at {midpoint} in zone {zone}")
+            logger.debug("Added custom bbox at %s in zone %s", midpoint, zone)
 
         except Exception as e:
-            print(f"Error adding custom bbox: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error adding custom bbox: %s", e)
     def highlight_bbox(self, bbox, row_number):
         """Highlight a bounding box and show its row number"""
         try:
@@ -578,7 +571,7 @@ class CustomGraphicsView(QGraphicsView):
                     self.scene().addItem(item)
 
         except Exception as e:
-            print(f"Error in highlight_bbox: {str(e)}")
+            logger.error("Error in highlight_bbox: %s", e)
             
     def get_balloon_bboxes(self, row):
         """Get all balloon bboxes for a specific row"""
@@ -608,17 +601,17 @@ class CustomGraphicsView(QGraphicsView):
                                 x1, y2   # Bottom-left
                             ]
                         else:
-                            print(f"Invalid balloon bbox format: {bbox}")
+                            logger.debug("Invalid balloon bbox format: %s", bbox)
                             continue
 
                         # Only add if not already present
                         if converted_bbox not in balloon_bboxes:
                             balloon_bboxes.append(converted_bbox)
-                            print(f"Added balloon bbox: {converted_bbox}")
+                            logger.debug("Added balloon bbox: %s", converted_bbox)
 
                     except (TypeError, ValueError, IndexError) as e:
-                        print(f"Error converting balloon bbox: {e}")
-                        print(f"Balloon bbox format: {bbox}")
+                        logger.error("Error converting balloon bbox: %s", e)
+                        logger.debug("Balloon bbox format: %s", bbox)
                         continue
 
         return balloon_bboxes
@@ -640,15 +633,15 @@ class CustomGraphicsView(QGraphicsView):
                     elif len(detection_bbox) == 8:  # Already in flattened format
                         converted_bbox = [float(x) for x in detection_bbox]
                     else:
-                        print(f"Invalid detection bbox format: {detection_bbox}")
+                        logger.debug("Invalid detection bbox format: %s", detection_bbox)
                         return bboxes
 
                     # Add to bboxes list
                     bboxes.append(converted_bbox)
-                    print(f"Added detection bbox: {converted_bbox}")
+                    logger.debug("Added detection bbox: %s", converted_bbox)
                 except (TypeError, ValueError, IndexError) as e:
-                    print(f"Error converting detection bbox: {e}")
-                    print(f"Detection bbox format: {detection_bbox}")
+                    logger.error("Error converting detection bbox: %s", e)
+                    logger.debug("Detection bbox format: %s", detection_bbox)
 
         return bboxes
 
@@ -678,6 +671,6 @@ class CustomGraphicsView(QGraphicsView):
                 self.main_window.ui.dimtable.setItem(row, 10, mean_item)
 
         except Exception as e:
-            print(f"Error calculating mean: {str(e)}")
+            logger.error("Error calculating mean: %s", e)
 
     
\ No newline at end of file
@@ -1,9 +1,12 @@
+import logging
 from PyQt5.QtCore import Qt, QPointF
 from PyQt5 import QtWidgets
 from PyQt5.QtWidgets import QTableWidgetItem
 from PyQt5.QtWidgets import QGraphicsPolygonItem, QGraphicsPathItem, QGraphicsTextItem, QGraphicsEllipseItem
 from PyQt5.QtGui import QPen, QColor, QPainterPath, QPolygonF, QBrush
 
+logger = logging.getLogger(__name__)
+
 class HighlightManager:
     @staticmethod
     def create_highlight(view, bbox):
@@ -21,7 +24,7 @@ class HighlightManager:
             return highlight_item
 
         except Exception as e:
-            print(f"Error creating highlight: {str(e)}")
+            logger.error("Error creating highlight: %s", e)
             return None
 
     @staticmethod
@@ -98,7 +101,7 @@ class HighlightManager:
             return balloon_items
 
         except Exception as e:
-            print(f"Error creating balloon: {str(e)}")
+            logger.error("Error creating balloon: %s", e)
             return []
 
     @staticmethod
@@ -185,7 +188,7 @@ class HighlightManager:
             }
 
         except Exception as e:
-            print(f"Error creating highlight elements: {str(e)}")
+            logger.error("Error creating highlight elements: %s", e)
             return None
         
     
@@ -233,12 +236,10 @@ class HighlightManager:
                 if hasattr(view, 'ocr_items') and item in view.ocr_items:
                     view.ocr_items.remove(item)
             
-            print(f"Deleted {len(balloon_items)} balloon items")
+            logger.debug("Deleted %s balloon items", len(balloon_items))
             return len(balloon_items)  # Return number of balloons deleted
         
         except Exception as e:
-            print(f"Error deleting balloons: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error deleting balloons: %s", e)
             return 0
  
\ No newline at end of file
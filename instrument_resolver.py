@@ -0,0 +1,163 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from api_endpoints import inventory
+
+
+# Instrument codes look like L02-8087
+INSTRUMENT_CODE_PATTERN = re.compile(r'([A-Z][0-9]{2}-[0-9]{4})')
+NAME_CODE_PATTERN = re.compile(r'(.*?)\s*\(([^)]+)\)')
+TOKEN_PATTERN = re.compile(r'[0-9a-z]+')
+
+
+def extract_instrument_code(instrument_text: str) -> str:
+    """Instrument code from a table cell: a code pattern, 'Name (Code)', or the text as is"""
+    code_match = INSTRUMENT_CODE_PATTERN.search(instrument_text)
+    if code_match:
+        return code_match.group(1)
+    name_code_match = NAME_CODE_PATTERN.search(instrument_text)
+    if name_code_match:
+        return name_code_match.group(2).strip()
+    return instrument_text.strip()
+
+
+def normalize_name(text: str) -> str:
+    """Case- and whitespace-insensitive form used for name lookups"""
+    return " ".join((text or "").casefold().split())
+
+
+@dataclass
+class AddressMatch:
+    bluetooth_address: str
+    instrument_code: str
+    exact: bool
+    reason: str
+
+
+class InstrumentAddressResolver:
+    """Resolve a measurement table row's instrument to the Bluetooth address of its gauge
+
+    Only inventory items that have a Bluetooth address are indexed. Exact lookups go
+    through hash maps on instrument code and normalised name; the fuzzy fallback
+    (partial code, name or dynamic_data match) intersects a token prefix index first
+    and only substring-checks the few items left. The indexes are rebuilt whenever the
+    inventory cache has been refreshed.
+    """
+    MIN_PREFIX = 2
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built_from = None
+        self._entries: List[Dict] = []
+        self._by_code: Dict[str, int] = {}
+        self._by_name: Dict[str, int] = {}
+        self._tokens: Dict[str, Set[int]] = {}
+
+    def resolve(self, instrument_text: str, row_text: str = "") -> Optional[AddressMatch]:
+        """
+        Find the Bluetooth address for an instrument
+
+        Args:
+            instrument_text: Text of the instrument cell
+            row_text: Text of the whole row, used when the cell holds a subcategory name
+
+        Returns:
+            AddressMatch, or None if no associated gauge was found. Only matches with
+            exact=True identify the instrument unambiguously.
+        """
+        self._refresh()
+        instrument_code = extract_instrument_code(instrument_text)
+
+        entry_id = self._by_code.get(instrument_code)
+        if entry_id is not None:
+            return self._match(entry_id, True, "instrument code")
+
+        # A subcategory name in the cell; the code may be elsewhere in the row
+        if not INSTRUMENT_CODE_PATTERN.search(instrument_code):
+            for candidate in INSTRUMENT_CODE_PATTERN.findall(row_text) + row_text.split():
+                entry_id = self._by_code.get(candidate.strip(" ,;()[]"))
+                if entry_id is not None:
+                    return self._match(entry_id, True, "row text")
+
+        entry_id = self._by_name.get(normalize_name(instrument_code))
+        if entry_id is None:
+            entry_id = self._fuzzy_lookup(instrument_code)
+        if entry_id is not None:
+            return self._match(entry_id, False, "partial match")
+        return None
+
+    def invalidate(self):
+        """Rebuild from the inventory on the next lookup"""
+        with self._lock:
+            self._built_from = None
+
+    def _refresh(self):
+        # Touching the inventory refreshes it if its TTL expired
+        items = inventory.get_instrument_items()
+        with self._lock:
+            if self._built_from == inventory.loaded_at:
+                return
+            self._build(items)
+            self._built_from = inventory.loaded_at
+
+    def _build(self, items):
+        entries, by_code, by_name, tokens = [], {}, {}, {}
+        for _, item in items:
+            dynamic_data = item.get('dynamic_data') or {}
+            bluetooth_address = dynamic_data.get('Bluetooth Address')
+            if not bluetooth_address:
+                continue
+
+            entry_id = len(entries)
+            instrument_code = (dynamic_data.get('Instrument code') or '').strip()
+            name = item.get('name') or ''
+            values = [str(value) for value in dynamic_data.values() if isinstance(value, str)]
+            entries.append({
+                'bluetooth_address': bluetooth_address,
+                'instrument_code': instrument_code,
+                'search_text': "\n".join([instrument_code, name] + values).casefold()
+            })
+
+            if instrument_code:
+                by_code.setdefault(instrument_code, entry_id)
+            if name:
+                by_name.setdefault(normalize_name(name), entry_id)
+            for token in set(TOKEN_PATTERN.findall(entries[-1]['search_text'])):
+                for end in range(min(self.MIN_PREFIX, len(token)), len(token) + 1):
+                    tokens.setdefault(token[:end], set()).add(entry_id)
+
+        self._entries = entries
+        self._by_code = by_code
+        self._by_name = by_name
+        self._tokens = tokens
+
+    def _fuzzy_lookup(self, instrument_code: str) -> Optional[int]:
+        """First item whose code, name or dynamic_data contains the code, via the token index"""
+        query = instrument_code.casefold()
+        query_tokens = [token for token in TOKEN_PATTERN.findall(query) if len(token) >= self.MIN_PREFIX]
+        if not query_tokens:
+            return None
+
+        candidates = None
+        for token in sorted(query_tokens, key=lambda t: len(self._tokens.get(t, ()))):
+            postings = self._tokens.get(token)
+            if not postings:
+                return None
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return None
+
+        for entry_id in sorted(candidates):
+            if query in self._entries[entry_id]['search_text']:
+                return entry_id
+        return None
+
+    def _match(self, entry_id: int, exact: bool, reason: str) -> AddressMatch:
+        entry = self._entries[entry_id]
+        return AddressMatch(entry['bluetooth_address'], entry['instrument_code'], exact, reason)
+
+
+# Create singleton instance
+instrument_resolver = InstrumentAddressResolver()
@@ -0,0 +1,231 @@
+import re
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from PyQt5 import QtGui, QtWidgets
+from PyQt5.QtCore import Qt
+
+from measurement_store import MeasurementStore
+
+
+READING_PREFIX = "Measured value:"
+NUMBER_PATTERN = re.compile(r'[-+]?(?:\d+(?:[.,]\d*)?|[.,]\d+)')
+
+# Row colours for in / out of tolerance, and the highlight on the newest reading
+VALID_COLOR = QtGui.QColor(210, 242, 210)
+INVALID_COLOR = QtGui.QColor(255, 200, 200)
+READING_COLOR = QtGui.QColor(200, 255, 200)
+
+
+def parse_reading(text: str) -> Optional[float]:
+    """Value of a gauge notification such as '12.345' or 'Measured value: 12,345', or None"""
+    if READING_PREFIX in text:
+        text = text.split(READING_PREFIX)[-1]
+    text = text.strip()
+    if not NUMBER_PATTERN.fullmatch(text):
+        return None
+    return float(text.replace(',', '.'))
+
+
+def parse_limit(text: str) -> Optional[float]:
+    """Value of a nominal or tolerance cell, accepting anything float() does after a comma swap, or None"""
+    try:
+        return float(str(text).strip().replace(',', '.'))
+    except (TypeError, ValueError):
+        return None
+
+
+class MeasurementIngestor:
+    """Write gauge readings into the measurement table in batches
+
+    Readings arrive already parsed (see BleService). A batch is written with the
+    table's signals blocked and repaints suspended, so cellChanged doesn't re-run the
+    mean and tolerance check once per cell. Readings also go into the MeasurementStore
+    under the current quantity; once the batch is in, the store evaluates every row
+    in one pass and each touched row gets its mean and, only when its tolerance state
+    actually changed, a new colour. Limits are pushed into the store once per
+    distinct nominal/tolerance text.
+    """
+    NOMINAL_COLUMN = 2
+    UPPER_TOL_COLUMN = 3
+    LOWER_TOL_COLUMN = 4
+    FIRST_MEASUREMENT_COLUMN = 8
+    LAST_MEASUREMENT_COLUMN = 10
+    MEAN_COLUMN = 11
+
+    def __init__(self, table: QtWidgets.QTableWidget, set_row_color, store: MeasurementStore,
+                 current_quantity: Callable[[], int]):
+        """
+        Args:
+            table: The dimension table
+            set_row_color: callable(row, is_valid) colouring a whole row
+            store: Store the readings are recorded in
+            current_quantity: callable returning the 0-based quantity being measured
+        """
+        self.table = table
+        self.set_row_color = set_row_color
+        self.store = store
+        self.current_quantity = current_quantity
+        self._next_column: Dict[int, int] = {}
+        self._limits: Dict[int, tuple] = {}
+
+    def next_column(self, row: int) -> int:
+        """Measurement column the next reading for this row goes into"""
+        return self._next_column.get(row, self.FIRST_MEASUREMENT_COLUMN)
+
+    def has_free_column(self, row: int) -> bool:
+        return self.next_column(row) <= self.LAST_MEASUREMENT_COLUMN
+
+    def reset(self):
+        """Forget per-row progress and stored readings, e.g. after the table was reloaded"""
+        self._next_column.clear()
+        self._limits.clear()
+        self.store.reset()
+
+    def remove_row(self, row: int):
+        """A table row was deleted; shift the per-row state of the rows below it"""
+        self.store.remove(row)
+        self._next_column = {r - (r > row): c for r, c in self._next_column.items() if r != row}
+        self._limits = {r - (r > row): l for r, l in self._limits.items() if r != row}
+
+    def ingest(self, entries: Iterable[Tuple[int, float]]) -> Optional[Tuple[int, int, float, bool]]:
+        """
+        Write (row, value) readings in one pass
+
+        Returns:
+            (row, column, value, started_new_set) for the last reading written, or None
+        """
+        last = None
+        touched = set()
+        quantity = self.current_quantity()
+        self.table.blockSignals(True)
+        self.table.setUpdatesEnabled(False)
+        try:
+            for row, value in entries:
+                column = self.next_column(row)
+                started_new_set = False
+                if column > self.LAST_MEASUREMENT_COLUMN:
+                    # All of M1-M3 are filled; start a new set
+                    column = self.FIRST_MEASUREMENT_COLUMN
+                    started_new_set = True
+                    for col in range(self.FIRST_MEASUREMENT_COLUMN, self.LAST_MEASUREMENT_COLUMN + 1):
+                        self._set_text(row, col, "")
+                    self.store.set_quantity_readings(row, quantity, ())
+
+                item = self._set_text(row, column, str(value))
+                item.setBackground(READING_COLOR)
+                self.store.set_reading(row, quantity, column - self.FIRST_MEASUREMENT_COLUMN, value)
+                self._next_column[row] = column + 1
+                touched.add(row)
+                last = (row, column, value, started_new_set)
+
+            if touched:
+                self.update_rows(touched, quantity)
+        finally:
+            self.table.setUpdatesEnabled(True)
+            self.table.blockSignals(False)
+        return last
+
+    def update_rows(self, rows: Iterable[int], quantity: int):
+        """Write the mean of the given rows and recolour those whose tolerance state changed"""
+        rows = list(rows)
+        for row in rows:
+            self._sync_limits(row)
+        means = self.store.means(quantity)
+        states = self.store.evaluate(quantity)
+
+        for row in rows:
+            if np.isnan(means[row]):
+                # No readings, but the mean may have been typed in directly
+                item = self.table.item(row, self.MEAN_COLUMN)
+                mean = parse_reading(item.text()) if item and item.text() else None
+                if mean is None or np.isnan(self.store.lower[row]) or np.isnan(self.store.upper[row]):
+                    continue
+                is_valid = self.store.lower[row] <= mean <= self.store.upper[row]
+            else:
+                self._set_text(row, self.MEAN_COLUMN, f"{means[row]:.3f}")
+                if states[row] == MeasurementStore.UNKNOWN:
+                    continue
+                is_valid = states[row] == MeasurementStore.IN_TOLERANCE
+
+            first_item = self.table.item(row, 0)
+            applied = first_item.data(Qt.BackgroundRole) if first_item else None
+            if applied != (VALID_COLOR if is_valid else INVALID_COLOR):
+                self.set_row_color(row, is_valid)
+
+    def refresh_rows(self, rows: Optional[Iterable[int]] = None):
+        """Re-read rows (all of them by default) from the table and re-evaluate them in one pass"""
+        if rows is None:
+            rows = range(self.table.rowCount())
+        rows = list(rows)
+        quantity = self.current_quantity()
+        self.table.blockSignals(True)
+        try:
+            for row in rows:
+                self.sync_row(row, quantity)
+            if rows:
+                self.update_rows(rows, quantity)
+        finally:
+            self.table.blockSignals(False)
+
+    def load_quantity(self, quantity: int):
+        """Show the stored M1-M3 readings of another quantity (blank where it has none) and re-evaluate
+
+        Called when the operator switches quantity, so the cells left over from the previous
+        one are not synced into the new one by the next refresh.
+        """
+        rows = list(range(self.table.rowCount()))
+        self.store.ensure_characteristics(len(rows))
+        readings = self.store.readings(quantity)
+        self.table.blockSignals(True)
+        self.table.setUpdatesEnabled(False)
+        try:
+            for row in rows:
+                filled = 0
+                for offset, value in enumerate(readings[row]):
+                    text = "" if np.isnan(value) else str(float(value))
+                    item = self.table.item(row, self.FIRST_MEASUREMENT_COLUMN + offset)
+                    if item is not None or text:
+                        self._set_text(row, self.FIRST_MEASUREMENT_COLUMN + offset, text)
+                    if text:
+                        filled = offset + 1
+                self._next_column[row] = self.FIRST_MEASUREMENT_COLUMN + filled
+                if not filled and self.table.item(row, self.MEAN_COLUMN) is not None:
+                    self._set_text(row, self.MEAN_COLUMN, "")
+            if rows:
+                self.update_rows(rows, quantity)
+        finally:
+            self.table.setUpdatesEnabled(True)
+            self.table.blockSignals(False)
+
+    def sync_row(self, row: int, quantity: int):
+        """Copy a row's limits and M1-M3 text into the store, e.g. after a manual edit"""
+        self._sync_limits(row)
+        values = []
+        for col in range(self.FIRST_MEASUREMENT_COLUMN, self.LAST_MEASUREMENT_COLUMN + 1):
+            item = self.table.item(row, col)
+            values.append(parse_reading(item.text()) if item and item.text() else None)
+        self.store.set_quantity_readings(row, quantity, values)
+
+    def _sync_limits(self, row: int):
+        """Push a row's limits into the store, parsed once per distinct nominal/tolerance text"""
+        texts = tuple(
+            self.table.item(row, col).text() if self.table.item(row, col) else ""
+            for col in (self.NOMINAL_COLUMN, self.UPPER_TOL_COLUMN, self.LOWER_TOL_COLUMN)
+        )
+        if self._limits.get(row) == texts and row < self.store.characteristics:
+            return
+        numbers = [parse_limit(text) if text else None for text in texts]
+        self.store.set_limits(row, *numbers)
+        self._limits[row] = texts
+
+    def _set_text(self, row: int, column: int, text: str) -> QtWidgets.QTableWidgetItem:
+        """Reuse the cell's item rather than replacing it"""
+        item = self.table.item(row, column)
+        if item is None:
+            item = QtWidgets.QTableWidgetItem(text)
+            item.setTextAlignment(Qt.AlignCenter)
+            self.table.setItem(row, column, item)
+        else:
+            item.setText(text)
+        return item
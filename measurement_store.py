@@ -0,0 +1,214 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class MeasurementStore:
+    """Readings of every characteristic as one characteristics x quantities x readings array
+
+    Unset readings are NaN. Tolerance evaluation works on whole columns of that array
+    at once, and per-characteristic statistics (count, mean, standard deviation,
+    min/max, range, Cp, Cpk) are kept up to date as readings are set: sums are
+    adjusted per reading, and min/max are only rescanned for a characteristic whose
+    extreme value was overwritten. Sums are taken relative to the first reading of
+    each characteristic so that small spreads around large nominals stay accurate.
+    """
+    READINGS_PER_QUANTITY = 3
+
+    # evaluate() status codes
+    UNKNOWN = -1
+    OUT_OF_TOLERANCE = 0
+    IN_TOLERANCE = 1
+
+    def __init__(self, characteristics: int = 0, quantities: int = 1, readings: int = READINGS_PER_QUANTITY):
+        self.reset(characteristics, quantities, readings)
+
+    def reset(self, characteristics: int = 0, quantities: int = 1, readings: int = READINGS_PER_QUANTITY):
+        """Drop every reading and limit"""
+        self.values = np.full((characteristics, quantities, readings), np.nan)
+        self.lower = np.full(characteristics, np.nan)
+        self.upper = np.full(characteristics, np.nan)
+        self._count = np.zeros(characteristics, dtype=np.int64)
+        self._shift = np.full(characteristics, np.nan)
+        self._sum = np.zeros(characteristics)
+        self._sumsq = np.zeros(characteristics)
+        self._min = np.full(characteristics, np.inf)
+        self._max = np.full(characteristics, -np.inf)
+        self._stale_extremes = np.zeros(characteristics, dtype=bool)
+
+    @property
+    def characteristics(self) -> int:
+        return self.values.shape[0]
+
+    # ------------------------------------------------------------------
+    # Shape
+    # ------------------------------------------------------------------
+    def ensure_characteristics(self, count: int):
+        """Grow the characteristic axis to at least count"""
+        extra = count - self.characteristics
+        if extra <= 0:
+            return
+        self.values = np.concatenate(
+            [self.values, np.full((extra,) + self.values.shape[1:], np.nan)], axis=0
+        )
+        self.lower = np.concatenate([self.lower, np.full(extra, np.nan)])
+        self.upper = np.concatenate([self.upper, np.full(extra, np.nan)])
+        self._count = np.concatenate([self._count, np.zeros(extra, dtype=np.int64)])
+        self._shift = np.concatenate([self._shift, np.full(extra, np.nan)])
+        self._sum = np.concatenate([self._sum, np.zeros(extra)])
+        self._sumsq = np.concatenate([self._sumsq, np.zeros(extra)])
+        self._min = np.concatenate([self._min, np.full(extra, np.inf)])
+        self._max = np.concatenate([self._max, np.full(extra, -np.inf)])
+        self._stale_extremes = np.concatenate([self._stale_extremes, np.zeros(extra, dtype=bool)])
+
+    def remove(self, index: int):
+        """Remove one characteristic, shifting the ones after it up"""
+        if not 0 <= index < self.characteristics:
+            return
+        for name in ('values', 'lower', 'upper', '_count', '_shift', '_sum', '_sumsq',
+                     '_min', '_max', '_stale_extremes'):
+            setattr(self, name, np.delete(getattr(self, name), index, axis=0))
+
+    def _ensure_quantity(self, quantity: int):
+        if quantity < self.values.shape[1]:
+            return
+        extra = max(quantity + 1, self.values.shape[1] * 2) - self.values.shape[1]
+        padding = np.full((self.values.shape[0], extra, self.values.shape[2]), np.nan)
+        self.values = np.concatenate([self.values, padding], axis=1)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def set_limits(self, index: int, nominal: Optional[float], upper_tol: Optional[float],
+                   lower_tol: Optional[float]):
+        """Set the tolerance band of one characteristic; None leaves it unknown"""
+        self.ensure_characteristics(index + 1)
+        if None in (nominal, upper_tol, lower_tol):
+            self.lower[index] = self.upper[index] = np.nan
+        else:
+            # lower_tol is already negative
+            self.lower[index] = nominal + lower_tol
+            self.upper[index] = nominal + upper_tol
+
+    def set_reading(self, index: int, quantity: int, reading: int, value: Optional[float]):
+        """Set or clear (value None) one reading; quantity and reading are 0-based"""
+        self.ensure_characteristics(index + 1)
+        self._ensure_quantity(quantity)
+
+        old = self.values[index, quantity, reading]
+        if not np.isnan(old):
+            shifted = old - self._shift[index]
+            self._count[index] -= 1
+            self._sum[index] -= shifted
+            self._sumsq[index] -= shifted * shifted
+            if old <= self._min[index] or old >= self._max[index]:
+                self._stale_extremes[index] = True
+
+        if value is None or np.isnan(value):
+            self.values[index, quantity, reading] = np.nan
+        else:
+            if self._count[index] == 0:
+                # Re-anchor the running sums on a value from this characteristic
+                self._shift[index] = value
+                self._sum[index] = 0.0
+                self._sumsq[index] = 0.0
+            shifted = value - self._shift[index]
+            self._count[index] += 1
+            self._sum[index] += shifted
+            self._sumsq[index] += shifted * shifted
+            self._min[index] = min(self._min[index], value)
+            self._max[index] = max(self._max[index], value)
+            self.values[index, quantity, reading] = value
+
+        if self._count[index] == 0:
+            self._min[index] = np.inf
+            self._max[index] = -np.inf
+            self._stale_extremes[index] = False
+
+    def set_quantity_readings(self, index: int, quantity: int, values):
+        """Replace all readings of one characteristic for one quantity"""
+        self.ensure_characteristics(index + 1)
+        self._ensure_quantity(quantity)
+        for reading in range(self.values.shape[2]):
+            value = values[reading] if reading < len(values) else None
+            if not self._same(self.values[index, quantity, reading], value):
+                self.set_reading(index, quantity, reading, value)
+
+    @staticmethod
+    def _same(old: float, value: Optional[float]) -> bool:
+        if value is None or np.isnan(value):
+            return bool(np.isnan(old))
+        return old == value
+
+    # ------------------------------------------------------------------
+    # Vectorised queries
+    # ------------------------------------------------------------------
+    def readings(self, quantity: int) -> np.ndarray:
+        """characteristics x readings array of one quantity; all NaN if it has none yet"""
+        if quantity >= self.values.shape[1]:
+            return np.full((self.characteristics, self.values.shape[2]), np.nan)
+        return self.values[:, quantity, :].copy()
+
+    def means(self, quantity: int) -> np.ndarray:
+        """Mean of each characteristic's readings for one quantity; NaN where there are none"""
+        if quantity >= self.values.shape[1]:
+            return np.full(self.characteristics, np.nan)
+        readings = self.values[:, quantity, :]
+        counts = np.count_nonzero(~np.isnan(readings), axis=1)
+        totals = np.nansum(readings, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, totals / counts, np.nan)
+
+    def evaluate(self, quantity: int) -> np.ndarray:
+        """IN_TOLERANCE / OUT_OF_TOLERANCE / UNKNOWN for every characteristic, from its mean"""
+        means = self.means(quantity)
+        known = ~(np.isnan(means) | np.isnan(self.lower) | np.isnan(self.upper))
+        with np.errstate(invalid='ignore'):
+            inside = (means >= self.lower) & (means <= self.upper)
+        return np.where(known, np.where(inside, self.IN_TOLERANCE, self.OUT_OF_TOLERANCE), self.UNKNOWN)
+
+    def statistics(self) -> Dict[str, np.ndarray]:
+        """Per-characteristic statistics over every quantity and reading
+
+        Returns:
+            Arrays keyed count, mean, std, min, max, range, cp and cpk; NaN where undefined
+            (no readings, fewer than two readings for std/Cp/Cpk, no limits, zero spread)
+        """
+        self._refresh_extremes()
+        count = self._count.astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_shifted = np.where(count > 0, self._sum / count, np.nan)
+            mean = mean_shifted + self._shift
+            variance = np.where(
+                count > 1,
+                (self._sumsq - count * mean_shifted * mean_shifted) / (count - 1),
+                np.nan
+            )
+            std = np.sqrt(np.clip(variance, 0.0, None))
+            spread = np.where(std > 0, std, np.nan)
+            cp = (self.upper - self.lower) / (6 * spread)
+            cpk = np.minimum(self.upper - mean, mean - self.lower) / (3 * spread)
+
+        has_values = self._count > 0
+        minimum = np.where(has_values, self._min, np.nan)
+        maximum = np.where(has_values, self._max, np.nan)
+        return {
+            'count': self._count.copy(),
+            'mean': mean,
+            'std': std,
+            'min': minimum,
+            'max': maximum,
+            'range': maximum - minimum,
+            'cp': cp,
+            'cpk': cpk,
+        }
+
+    def _refresh_extremes(self):
+        stale = np.flatnonzero(self._stale_extremes)
+        if not len(stale):
+            return
+        flat = self.values[stale].reshape(len(stale), -1)
+        has_values = ~np.all(np.isnan(flat), axis=1)
+        self._min[stale] = np.where(has_values, np.min(np.where(np.isnan(flat), np.inf, flat), axis=1), np.inf)
+        self._max[stale] = np.where(has_values, np.max(np.where(np.isnan(flat), -np.inf, flat), axis=1), -np.inf)
+        self._stale_extremes[stale] = False
@@ -0,0 +1,99 @@
+import glob
+import logging
+import os
+import sys
+import threading
+import time
+
+from utils import resource_path
+
+logger = logging.getLogger(__name__)
+
+
+class YoloModelLoader:
+    """The detector shared by the main window and the graphics view, loaded once
+
+    Importing ultralytics pulls in torch, which dominates a cold start, so nothing is
+    imported until the model is first needed: either by get() on first use, or by the
+    warm-up after login, which also runs one dummy inference so the first real one
+    doesn't pay for allocation and lazy initialisation. Concurrent callers wait for the
+    load (and dummy inference) in progress. A failed load is not retried, so a missing
+    model file doesn't cost a second torch import on every page.
+    """
+
+    # Side of the blank image used for the dummy inference
+    PRIME_SIZE = 640
+    # Versioned model files shipped beside the executable by the slim build
+    SIDECAR_DIR = 'models'
+    SIDECAR_PATTERNS = ('best-*.pt', 'best-*.onnx')
+
+    def __init__(self, model_path=None):
+        self._model_path = model_path
+        self._lock = threading.Lock()
+        self._model = None
+        self._attempted = False
+
+    @property
+    def model_path(self) -> str:
+        return (self._model_path or os.environ.get('YOLO_MODEL_PATH') or self.sidecar_path()
+                or os.path.abspath(resource_path('best.pt')))
+
+    @classmethod
+    def sidecar_path(cls):
+        """The newest versioned model in the models folder beside the executable (or script), if any"""
+        base = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(sys.argv[0]))
+        candidates = [path for pattern in cls.SIDECAR_PATTERNS
+                      for path in glob.glob(os.path.join(base, cls.SIDECAR_DIR, pattern))]
+        return max(candidates, key=os.path.getmtime) if candidates else None
+
+    @property
+    def loaded(self) -> bool:
+        return self._attempted
+
+    def get(self, prime: bool = False):
+        """
+        The YOLO model, loading it on the calling thread if no one has yet
+
+        Args:
+            prime: If this call loads the model, also run a dummy inference before returning
+
+        Returns:
+            The model, or None if loading failed
+        """
+        if self._attempted:
+            return self._model
+        with self._lock:
+            if not self._attempted:
+                self._model = self._load()
+                if self._model is not None and prime:
+                    self._prime(self._model)
+                self._attempted = True
+        return self._model
+
+    def _load(self):
+        path = self.model_path
+        try:
+            start = time.perf_counter()
+            from ultralytics import YOLO
+            imported = time.perf_counter()
+            model = YOLO(path)
+            logger.info("Loaded YOLO model from %s (import %.2f s, load %.2f s)",
+                        path, imported - start, time.perf_counter() - imported)
+            return model
+        except Exception as e:
+            logger.exception("Error loading YOLO model from %s: %s", path, e)
+            return None
+
+    def _prime(self, model):
+        import numpy as np
+
+        try:
+            start = time.perf_counter()
+            model(np.zeros((self.PRIME_SIZE, self.PRIME_SIZE, 3), dtype=np.uint8), verbose=False)
+            logger.info("Primed YOLO model in %.2f s", time.perf_counter() - start)
+        except Exception as e:
+            logger.error("Error priming YOLO model: %s", e)
+
+
+# Create singleton instance
+yolo_models = YoloModelLoader()
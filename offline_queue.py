@@ -0,0 +1,302 @@
+import logging
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from api_endpoints import api
+
+logger = logging.getLogger(__name__)
+
+
+class SubmissionKind:
+    STAGE_INSPECTION = "stage_inspection"
+    MASTER_BOC = "master_boc"
+
+
+class OfflineSubmissionQueue:
+    """Durable outbox for stage inspection and master BOC payloads
+
+    Every payload is written here before it is sent, so readings survive a dropped
+    connection or a crash. Rows move pending -> inflight -> sent; a failed send puts
+    them back to pending for the flusher, until the backend rejects them outright (a
+    4xx) or they have failed MAX_ATTEMPTS times, which moves them to dead so they stop
+    holding up the rows behind them. Rows belong to the operator who saved them and
+    are only sent while that operator is logged in. Each row has an idempotency key,
+    stored beside the payload and sent as a header the backend deduplicates on, so a
+    retry after a lost response doesn't create the row twice.
+
+    The database is opened on first use rather than at import.
+    """
+    PENDING = "pending"
+    INFLIGHT = "inflight"
+    SENT = "sent"
+    DEAD = "dead"
+
+    MAX_ATTEMPTS = 10
+
+    # Sent rows are kept for a while for troubleshooting, then pruned
+    SENT_RETENTION_SECONDS = 7 * 24 * 3600
+
+    def __init__(self, db_path: Optional[str] = None):
+        self._db_path = db_path
+        self._lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @property
+    def db_path(self) -> str:
+        if self._db_path is None:
+            self._db_path = os.path.join(os.path.expanduser("~"), ".smartmetrology", "outbox.db")
+        return self._db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self._init_db()
+        return self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps this safe to use from any thread
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_db(self):
+        with self._init_lock:
+            if self._initialized:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            with self._open() as conn:
+                self._create_schema(conn)
+            self._initialized = True
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS submissions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                kind TEXT NOT NULL,
+                operator TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions (status, kind, id)")
+        # Anything still inflight was interrupted by a crash or exit; send it again
+        conn.execute(
+            "UPDATE submissions SET status = ? WHERE status = ?",
+            (self.PENDING, self.INFLIGHT)
+        )
+
+    def enqueue(self, kind: str, payloads: List[dict], operator: Optional[str],
+                inflight: bool = False) -> List[Tuple[int, str, dict]]:
+        """
+        Record payloads before sending them
+
+        Args:
+            kind: SubmissionKind value
+            payloads: Payloads to record, as they are to be sent
+            operator: Username of the operator saving them; only sent while they are logged in
+            inflight: True when the caller sends them right away, so the flusher leaves them alone
+
+        Returns:
+            (queue_id, idempotency_key, payload) per input payload, in order
+        """
+        now = time.time()
+        status = self.INFLIGHT if inflight else self.PENDING
+        entries = []
+        with self._lock, self._connect() as conn:
+            for payload in payloads:
+                key = uuid.uuid4().hex
+                cursor = conn.execute(
+                    "INSERT INTO submissions (idempotency_key, kind, operator, payload, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, kind, operator, json.dumps(payload), status, now, now)
+                )
+                entries.append((cursor.lastrowid, key, payload))
+        return entries
+
+    def claim_batch(self, kind: str, operator: str, limit: int) -> List[Tuple[int, str, dict]]:
+        """Move up to limit pending rows of one kind and operator to inflight and return them
+
+        Rows that have failed fewer times go first, oldest first among those. Each is
+        returned as (queue_id, idempotency_key, payload).
+        """
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, idempotency_key, payload FROM submissions WHERE status = ? AND kind = ? AND operator = ? "
+                "ORDER BY attempts, id LIMIT ?",
+                (self.PENDING, kind, operator, limit)
+            ).fetchall()
+            if not rows:
+                return []
+            ids = [row[0] for row in rows]
+            conn.executemany(
+                "UPDATE submissions SET status = ?, updated_at = ? WHERE id = ?",
+                [(self.INFLIGHT, time.time(), queue_id) for queue_id in ids]
+            )
+        return [(queue_id, key, json.loads(payload)) for queue_id, key, payload in rows]
+
+    def mark_sent(self, ids: List[int]):
+        """Record rows the backend accepted"""
+        if not ids:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "UPDATE submissions SET status = ?, attempts = attempts + 1, last_error = NULL, updated_at = ? WHERE id = ?",
+                [(self.SENT, now, queue_id) for queue_id in ids]
+            )
+
+    def mark_failed(self, ids: List[int], error: str = "", permanent: bool = False):
+        """
+        Put rows back in the queue for the flusher, or move them to dead
+
+        Args:
+            ids: Rows that were not created
+            error: Reason, kept for troubleshooting
+            permanent: The backend rejected them, so they are not retried
+        """
+        if not ids:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "UPDATE submissions SET status = CASE WHEN ? OR attempts + 1 >= ? THEN ? ELSE ? END, "
+                "attempts = attempts + 1, last_error = ?, updated_at = ? WHERE id = ?",
+                [(permanent, self.MAX_ATTEMPTS, self.DEAD, self.PENDING, error, now, queue_id) for queue_id in ids]
+            )
+            dead = conn.execute(
+                "SELECT COUNT(*) FROM submissions WHERE status = ? AND id IN (%s)" % ",".join("?" * len(ids)),
+                [self.DEAD] + list(ids)
+            ).fetchone()[0]
+        if dead:
+            logger.warning("%s queued rows will not be retried: %s", dead, error)
+
+    def discard(self, ids: List[int]):
+        """Drop rows the user chose not to send"""
+        if not ids:
+            return
+        with self._lock, self._connect() as conn:
+            conn.executemany("DELETE FROM submissions WHERE id = ?", [(queue_id,) for queue_id in ids])
+
+    def pending_count(self, operator: Optional[str] = None) -> int:
+        """Number of rows waiting to be sent, of one operator or of everyone"""
+        query = "SELECT COUNT(*) FROM submissions WHERE status IN (?, ?)"
+        params = [self.PENDING, self.INFLIGHT]
+        if operator is not None:
+            query += " AND operator = ?"
+            params.append(operator)
+        with self._lock, self._connect() as conn:
+            return conn.execute(query, params).fetchone()[0]
+
+    def dead_count(self, operator: Optional[str] = None) -> int:
+        """Number of rows given up on, of one operator or of everyone"""
+        query = "SELECT COUNT(*) FROM submissions WHERE status = ?"
+        params = [self.DEAD]
+        if operator is not None:
+            query += " AND operator = ?"
+            params.append(operator)
+        with self._lock, self._connect() as conn:
+            return conn.execute(query, params).fetchone()[0]
+
+    def prune_sent(self):
+        """Remove sent rows past the retention period"""
+        cutoff = time.time() - self.SENT_RETENTION_SECONDS
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM submissions WHERE status = ? AND updated_at < ?", (self.SENT, cutoff))
+
+
+class OfflineQueueFlusher(QThread):
+    """Drain the outbox in the background, in batches, backing off while the network is down"""
+    queue_changed = pyqtSignal(int, int)     # rows still waiting, rows given up on
+    batch_flushed = pyqtSignal(str, int, int)  # kind, sent, failed
+
+    BATCH_SIZE = 100
+    IDLE_INTERVAL = 5.0
+    MAX_BACKOFF = 120.0
+
+    def __init__(self, queue: 'OfflineSubmissionQueue', parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+    def wake(self):
+        """Flush now instead of waiting for the next interval"""
+        self._wake_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def run(self):
+        senders: Dict[str, object] = {
+            SubmissionKind.STAGE_INSPECTION: api.create_stage_inspection_bulk,
+            SubmissionKind.MASTER_BOC: api.create_master_boc_bulk,
+        }
+        delay = self.IDLE_INTERVAL
+        try:
+            self.queue.prune_sent()
+        except Exception as e:
+            logger.error("Error pruning offline queue: %s", e)
+
+        while not self._stop_event.is_set():
+            had_failures = False
+            try:
+                # Only the logged-in operator's rows, sent with their own token
+                operator = api.username
+                for kind, send in senders.items():
+                    while not self._stop_event.is_set() and api.token and operator and api.username == operator:
+                        batch = self.queue.claim_batch(kind, operator, self.BATCH_SIZE)
+                        if not batch:
+                            break
+
+                        rejected = {}
+                        results = send(
+                            [payload for _, _, payload in batch],
+                            failure_callback=lambda index, error, permanent: rejected.update(
+                                {index: error} if permanent else {}
+                            ),
+                            idempotency_keys=[key for _, key, _ in batch]
+                        )
+                        sent_ids, retry_ids, rejected_ids = [], [], []
+                        for index, ((queue_id, _, _), result) in enumerate(zip(batch, results)):
+                            if result is not None:
+                                sent_ids.append(queue_id)
+                            elif index in rejected:
+                                rejected_ids.append(queue_id)
+                            else:
+                                retry_ids.append(queue_id)
+                        self.queue.mark_sent(sent_ids)
+                        self.queue.mark_failed(rejected_ids, next(iter(rejected.values()), ""), permanent=True)
+                        self.queue.mark_failed(retry_ids, "Send failed")
+                        self.batch_flushed.emit(kind, len(sent_ids), len(retry_ids) + len(rejected_ids))
+
+                        if retry_ids:
+                            # Likely offline; stop hammering and back off
+                            had_failures = True
+                            break
+
+                self.queue_changed.emit(self.queue.pending_count(operator), self.queue.dead_count(operator))
+            except Exception as e:
+                logger.error("Error flushing offline queue: %s", e)
+                had_failures = True
+
+            delay = min(delay * 2, self.MAX_BACKOFF) if had_failures else self.IDLE_INTERVAL
+            self._wake_event.wait(delay)
+            self._wake_event.clear()
+
+
+# Create singleton instance
+submission_queue = OfflineSubmissionQueue()
@@ -0,0 +1,196 @@
+import atexit
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Upper bounds of the histogram buckets in milliseconds; anything slower lands in a final overflow bucket
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+class Histogram:
+    """Duration histogram of one span name, with count, total and extremes"""
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, ms: float):
+        self.count += 1
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+        for index, bound in enumerate(BUCKET_BOUNDS_MS):
+            if ms <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples, capped at the max"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, hits in enumerate(self.buckets):
+            seen += hits
+            if seen >= target:
+                bound = BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'min_ms': round(self.min, 3) if self.count else 0.0,
+            'max_ms': round(self.max, 3),
+            'p50_ms': round(self.percentile(0.5), 3),
+            'p95_ms': round(self.percentile(0.95), 3),
+            'buckets': dict(zip([str(bound) for bound in BUCKET_BOUNDS_MS] + ['inf'], self.buckets)),
+        }
+
+
+class PerfRecorder:
+    """Timing spans aggregated into per-name histograms
+
+    Use perf.span(name) around a block or @perf.timed(name) on a function. Recording is
+    a clock read and a dictionary update under a lock, so spans can stay in production
+    code and be called from worker threads. Histograms are appended to a JSONL file
+    periodically (start_export) and at exit, one line per export, so a slow day on an
+    operator machine can be looked at afterwards.
+    """
+    EXPORT_FILE = 'perf_metrics.jsonl'
+    EXPORT_INTERVAL = 300.0
+    RECENT_SIZE = 50
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._recent = deque(maxlen=self.RECENT_SIZE)
+        self._dirty = False
+        self._export_path = None
+        self._export_stop = None
+
+    def record(self, name: str, seconds: float):
+        """Add one duration to the histogram of name"""
+        ms = seconds * 1000.0
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(ms)
+            self._recent.append((name, ms))
+            self._dirty = True
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block under name; exceptions are timed too"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name: Optional[str] = None):
+        """Decorator timing every call of a function, under name or its qualified name"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(span_name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Histogram of every span name, as plain dictionaries"""
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+
+    def recent(self) -> List[Tuple[str, float]]:
+        """The latest (name, milliseconds) samples, oldest first"""
+        with self._lock:
+            return list(self._recent)
+
+    def summary(self, limit: int = 4) -> str:
+        """One line with the latest duration of the most recently finished spans"""
+        latest = {}
+        for name, ms in reversed(self.recent()):
+            if name not in latest:
+                latest[name] = ms
+            if len(latest) >= limit:
+                break
+        return "  |  ".join(f"{name} {ms:.0f} ms" for name, ms in latest.items())
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._recent.clear()
+            self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def export(self, path: Optional[str] = None) -> bool:
+        """Append the current histograms as one JSON line, if anything was recorded since the last export"""
+        path = path or self._export_path or self.EXPORT_FILE
+        with self._lock:
+            if not self._dirty:
+                return False
+            self._dirty = False
+        line = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'pid': os.getpid(),
+            'spans': self.snapshot(),
+        }
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(line) + '\n')
+            return True
+        except Exception as e:
+            logger.error("Error exporting performance metrics: %s", e)
+            return False
+
+    def start_export(self, path: Optional[str] = None, interval: float = EXPORT_INTERVAL):
+        """Export every interval seconds on a daemon thread, and once more at exit"""
+        if self._export_stop is not None:
+            return
+        self._export_path = path or self.EXPORT_FILE
+        self._export_stop = threading.Event()
+
+        def loop(stop):
+            while not stop.wait(interval):
+                self.export()
+
+        threading.Thread(target=loop, args=(self._export_stop,), name='PerfExport', daemon=True).start()
+        atexit.register(self.stop_export)
+
+    def stop_export(self):
+        if self._export_stop is None:
+            return
+        self._export_stop.set()
+        self._export_stop = None
+        self.export()
+
+
+# Create singleton instance
+perf = PerfRecorder()
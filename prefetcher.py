@@ -0,0 +1,176 @@
+import logging
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import fitz
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from api_endpoints import api
+from drawing_cache import drawing_cache
+
+logger = logging.getLogger(__name__)
+
+
+def drawing_hash(pdf_content: bytes) -> str:
+    """Key used to match a downloaded drawing with its pre-rendered pages"""
+    return hashlib.sha256(pdf_content).hexdigest()
+
+
+class PrefetchStore:
+    """In-memory results of prefetching: rendered pages and master BOC rows
+
+    Rendered pages are kept as raw RGB samples (QPixmap can't be created off the GUI
+    thread) and keyed by the drawing's content hash, page and rotation, so a changed
+    drawing never picks up a stale render. Master BOC rows are handed out once and
+    expire after BOC_MAX_AGE, since an admin may still be editing them.
+    """
+    MAX_RENDERS = 4
+    BOC_MAX_AGE = 300.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._renders = OrderedDict()
+        self._bocs: Dict[tuple, tuple] = {}
+
+    def put_render(self, content_hash: str, page_number: int, rotation: int, pix: fitz.Pixmap):
+        key = (content_hash, page_number, rotation)
+        with self._lock:
+            self._renders[key] = (bytes(pix.samples), pix.width, pix.height, pix.stride)
+            self._renders.move_to_end(key)
+            while len(self._renders) > self.MAX_RENDERS:
+                self._renders.popitem(last=False)
+
+    def get_render(self, content_hash: str, page_number: int, rotation: int) -> Optional[tuple]:
+        """Get (samples, width, height, stride) for a pre-rendered page"""
+        key = (content_hash, page_number, rotation)
+        with self._lock:
+            render = self._renders.get(key)
+            if render is not None:
+                self._renders.move_to_end(key)
+            return render
+
+    def has_render(self, content_hash: str, page_number: int, rotation: int) -> bool:
+        with self._lock:
+            return (content_hash, page_number, rotation) in self._renders
+
+    def put_boc(self, order_id, operation_number, rows: List[Dict]):
+        with self._lock:
+            self._bocs[(str(order_id), str(operation_number))] = (time.time(), rows)
+
+    def take_boc(self, order_id, operation_number) -> Optional[List[Dict]]:
+        """Get prefetched master BOC rows, once, if they are still fresh"""
+        with self._lock:
+            entry = self._bocs.pop((str(order_id), str(operation_number)), None)
+        if entry and time.time() - entry[0] <= self.BOC_MAX_AGE:
+            return entry[1]
+        return None
+
+    def clear(self):
+        """Drop everything prefetched, e.g. for the previous user on logout"""
+        with self._lock:
+            self._renders.clear()
+            self._bocs.clear()
+
+
+class OperationPrefetcher(QThread):
+    """Fetch, cache and pre-render the operation after the current one
+
+    stop() is checked between steps, and every request has a REQUEST_TIMEOUT, so a
+    stopped prefetch finishes within STOP_WAIT_MS even while the server hangs.
+    detach() stops it without making the caller wait that long.
+    """
+    prefetched = pyqtSignal(str)  # operation number that is now ready
+
+    # Same scale the main window renders drawings at
+    RENDER_ZOOM = 2
+
+    REQUEST_TIMEOUT = 5
+    STOP_WAIT_MS = (REQUEST_TIMEOUT + 2) * 1000
+    # How long detach() waits for the thread before leaving it to finish on its own
+    DETACH_WAIT_MS = 100
+
+    # Detached threads still running, kept referenced until wait_detached()
+    _detached: List['OperationPrefetcher'] = []
+
+    def __init__(self, part_number, production_order, order_id, operation_number, parent=None):
+        super().__init__(parent)
+        self.part_number = part_number
+        self.production_order = production_order
+        self.order_id = order_id
+        self.operation_number = str(operation_number)
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Skip the remaining steps; a request in progress still runs to its timeout"""
+        self._stop_event.set()
+
+    def detach(self):
+        """Stop, and leave a request in progress to run out without blocking the caller
+
+        The thread is unparented so closing the window doesn't destroy it mid-request;
+        call wait_detached() once the event loop has exited.
+        """
+        self.stop()
+        if self.wait(self.DETACH_WAIT_MS):
+            return
+        self.setParent(None)
+        OperationPrefetcher._detached.append(self)
+
+    @classmethod
+    def wait_detached(cls):
+        """Wait for detached prefetches to finish, so none is destroyed while running at exit"""
+        while cls._detached:
+            cls._detached.pop().wait(cls.STOP_WAIT_MS)
+
+    def run(self):
+        try:
+            next_operation = self._next_operation_number()
+            if not next_operation or self._stop_event.is_set():
+                return
+            logger.debug("Prefetching operation %s for %s", next_operation, self.production_order)
+
+            # Drawing into the on-disk cache, then its first page into the render cache
+            pdf_content = drawing_cache.get_ipid_drawing(self.production_order, next_operation,
+                                                         timeout=self.REQUEST_TIMEOUT)
+            if self._stop_event.is_set():
+                return
+            if pdf_content:
+                content_hash = drawing_hash(pdf_content)
+                if not prefetch_store.has_render(content_hash, 0, 0):
+                    with fitz.open(stream=pdf_content, filetype="pdf") as doc:
+                        pix = doc[0].get_pixmap(matrix=fitz.Matrix(self.RENDER_ZOOM, self.RENDER_ZOOM))
+                    if not self._stop_event.is_set():
+                        prefetch_store.put_render(content_hash, 0, 0, pix)
+
+            # Master BOC rows the operator view loads for that operation
+            if self.order_id and not self._stop_event.is_set():
+                rows = api._make_request(f"/quality/master-boc/order/{self.order_id}?op_no={next_operation}",
+                                         timeout=self.REQUEST_TIMEOUT)
+                # Not after a stop: the store may have been cleared for the next user
+                if rows and not self._stop_event.is_set():
+                    prefetch_store.put_boc(self.order_id, next_operation, rows)
+
+            if self._stop_event.is_set():
+                return
+
+            self.prefetched.emit(next_operation)
+
+        except Exception as e:
+            logger.error("Error prefetching next operation: %s", e)
+
+    def _next_operation_number(self) -> Optional[str]:
+        """Operation that follows the current one in get_operations order"""
+        operations = api.get_operations(self.part_number, timeout=self.REQUEST_TIMEOUT)
+        numbers = [str(op.get('operation_number')) for op in operations]
+        if self.operation_number in numbers:
+            index = numbers.index(self.operation_number)
+            if index + 1 < len(numbers):
+                return numbers[index + 1]
+        return None
+
+
+# Create singleton instance
+prefetch_store = PrefetchStore()
@@ -0,0 +1,175 @@
+import cProfile
+import functools
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+# --profile[=cprofile|pyspy] and --profile-dir=PATH on the command line, or these variables
+PROFILE_ENV = 'SMARTMETROLOGY_PROFILE'
+PROFILE_DIR_ENV = 'SMARTMETROLOGY_PROFILE_DIR'
+DEFAULT_PROFILE_DIR = 'profiles'
+
+CPROFILE = 'cprofile'
+PYSPY = 'pyspy'
+OFF_VALUES = ('', '0', 'off', 'false', 'no')
+
+
+def profile_settings(argv: Sequence[str], environ) -> tuple:
+    """
+    Read the profiling mode and output directory from the command line, then the environment
+
+    Returns:
+        (mode, directory): mode is None when profiling is off, else CPROFILE or PYSPY
+    """
+    mode = environ.get(PROFILE_ENV, '')
+    directory = environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR
+    for arg in argv[1:]:
+        if arg == '--profile':
+            mode = CPROFILE
+        elif arg.startswith('--profile='):
+            mode = arg.split('=', 1)[1]
+        elif arg.startswith('--profile-dir='):
+            directory = arg.split('=', 1)[1]
+
+    mode = mode.strip().lower()
+    if mode in OFF_VALUES:
+        return None, directory
+    if mode in ('1', 'on', 'true', 'yes'):
+        mode = CPROFILE
+    if mode not in (CPROFILE, PYSPY):
+        logger.warning("Unknown profiling mode %r, using %s", mode, CPROFILE)
+        mode = CPROFILE
+    return mode, directory
+
+
+class ActionProfiler:
+    """Per-action profiles of user actions such as opening a drawing or saving
+
+    Methods decorated with profiler.action(name) are profiled on every call while
+    profiling is on, each call into its own file in the profile directory:
+    NAME-TIMESTAMP.pstats in cprofile mode (open with pstats or snakeviz), or
+    NAME-TIMESTAMP.speedscope.json in pyspy mode (open on speedscope.app). cProfile only
+    sees the calling thread; py-spy samples every thread, but needs a moment to attach,
+    so very short actions may come out empty.
+
+    The mode is read once at import. When it is off, action() hands back the undecorated
+    function, so operator builds pay nothing for the decorators.
+    """
+    PYSPY_RATE = 250
+    PYSPY_STOP_TIMEOUT = 30
+
+    def __init__(self, mode: Optional[str] = None, directory: str = DEFAULT_PROFILE_DIR):
+        self.mode = mode
+        self.directory = directory
+        self._local = threading.local()
+        if self.mode == PYSPY and not shutil.which('py-spy'):
+            logger.error("py-spy not found on PATH, profiling with %s instead", CPROFILE)
+            self.mode = CPROFILE
+        if self.mode:
+            logger.info("Profiling user actions with %s into %s", self.mode, os.path.abspath(self.directory))
+
+    @classmethod
+    def from_environment(cls):
+        mode, directory = profile_settings(sys.argv, os.environ)
+        return cls(mode, directory)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    def action(self, name: str):
+        """Decorator profiling each call of a user action; a no-op while profiling is off"""
+        def decorator(func):
+            if not self.enabled:
+                return func
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                # An action started from inside another one is part of the outer profile
+                if getattr(self._local, 'active', False):
+                    return func(*args, **kwargs)
+                self._local.active = True
+                try:
+                    return self._profile(name, func, args, kwargs)
+                finally:
+                    self._local.active = False
+            return wrapper
+        return decorator
+
+    def _output_path(self, name: str, suffix: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S') + f"-{int(time.time() * 1000) % 1000:03d}"
+        return os.path.join(self.directory, f"{name}-{stamp}{suffix}")
+
+    def _profile(self, name, func, args, kwargs):
+        if self.mode == PYSPY:
+            recorder = self._start_pyspy(self._output_path(name, '.speedscope.json'))
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._stop_pyspy(recorder)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler (a debugger, or cProfile run from outside) already owns the hook
+            logger.warning("Could not profile %s: %s", name, e)
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            path = self._output_path(name, '.pstats')
+            try:
+                profile.dump_stats(path)
+                logger.info("Profile of %s written to %s", name, path)
+            except OSError as e:
+                logger.error("Error writing profile of %s: %s", name, e)
+
+    def _start_pyspy(self, path: str):
+        command = ['py-spy', 'record', '--pid', str(os.getpid()), '--format', 'speedscope',
+                   '--rate', str(self.PYSPY_RATE), '--output', path]
+        kwargs = {'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
+        if os.name == 'nt':
+            # Own process group, so the stop signal reaches py-spy and not us
+            kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        try:
+            return subprocess.Popen(command, **kwargs), path
+        except OSError as e:
+            logger.error("Error starting py-spy: %s", e)
+            return None
+
+    def _stop_pyspy(self, recorder):
+        if recorder is None:
+            return
+        process, path = recorder
+        try:
+            process.send_signal(signal.CTRL_BREAK_EVENT if os.name == 'nt' else signal.SIGINT)
+        except OSError as e:
+            logger.error("Error stopping py-spy: %s", e)
+            return
+
+        def wait():
+            # py-spy writes the file after it stops; don't hold up the GUI for that
+            try:
+                process.wait(timeout=self.PYSPY_STOP_TIMEOUT)
+                logger.info("Profile written to %s", path)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                logger.error("py-spy did not stop in time, no profile for %s", path)
+
+        threading.Thread(target=wait, name='PySpyStop', daemon=True).start()
+
+
+# Create singleton instance
+profiler = ActionProfiler.from_environment()
@@ -0,0 +1,183 @@
+import logging
+import os
+import tempfile
+import threading
+import uuid
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from api_endpoints import api
+from offline_queue import submission_queue, SubmissionKind
+from perf_metrics import perf
+from profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+
+class SaveStage:
+    REPORT_RENDER = "Rendering inspection report..."
+    REPORT_UPLOAD = "Uploading inspection report..."
+    ROW_SUBMIT = "Saving rows..."
+    DRAWING_UPLOAD = "Uploading ballooned drawing..."
+
+
+class SavePipelineThread(QThread):
+    """Run the save stages in the background: report render, report upload, row submit, drawing upload
+
+    The ballooned drawing has to be rendered from the scene on the GUI thread. The caller starts
+    this thread first, renders the drawing while rows are being submitted and hands the file over
+    with set_drawing_file(). The caller owns that file and removes it once finished_saving fires.
+    """
+    stage_changed = pyqtSignal(str)
+    progress = pyqtSignal(str, int, int)   # stage, done, total
+    finished_saving = pyqtSignal(dict)
+
+    def __init__(self, payload_rows, stage_inspection=False, report_job=None, upload_drawing=None, parent=None):
+        """
+        Args:
+            payload_rows: List of (table_row, payload) tuples prepared on the GUI thread
+            stage_inspection: Submit stage inspection rows instead of master BOC rows
+            report_job: Optional dict with 'render' (callable(file_path) -> bool) and 'upload'
+                        (keyword arguments for api.upload_inspection_report, minus file_path)
+            upload_drawing: Optional dict with 'production_order' and 'ipid' for the ballooned drawing
+        """
+        super().__init__(parent)
+        self.payload_rows = payload_rows
+        self.stage_inspection = stage_inspection
+        self.report_job = report_job
+        self.upload_drawing = upload_drawing
+
+        self._cancel_event = threading.Event()
+        self._drawing_ready = threading.Event()
+        self._drawing_file = None
+
+    def cancel(self):
+        """Stop at the next stage or chunk boundary; rows already sent stay saved"""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def set_drawing_file(self, file_path):
+        """Hand over the rendered ballooned drawing, or None if rendering failed"""
+        self._drawing_file = file_path
+        self._drawing_ready.set()
+
+    @perf.timed('save.pipeline')
+    @profiler.action('save')
+    def run(self):
+        summary = {
+            'cancelled': False,
+            'error': None,
+            'report_uploaded': None,
+            'row_results': [],
+            'queued_rows': 0,
+            'drawing_uploaded': None
+        }
+        try:
+            if self.report_job and not self._run_report_stages(summary):
+                return
+
+            if self.is_cancelled():
+                return
+
+            self.stage_changed.emit(SaveStage.ROW_SUBMIT)
+            if self.stage_inspection:
+                kind, create_bulk = SubmissionKind.STAGE_INSPECTION, api.create_stage_inspection_bulk
+            else:
+                kind, create_bulk = SubmissionKind.MASTER_BOC, api.create_master_boc_bulk
+
+            # Record every row locally before sending so nothing is lost if the network drops
+            entries = submission_queue.enqueue(
+                kind, [payload for _, payload in self.payload_rows], api.username, inflight=True
+            )
+            rejected = {}
+            unsent = set()
+            results = create_bulk(
+                [payload for _, _, payload in entries],
+                progress_callback=lambda done, total: self.progress.emit(SaveStage.ROW_SUBMIT, done, total),
+                cancel_check=self.is_cancelled,
+                failure_callback=lambda index, error, permanent: rejected.update({index: error} if permanent else {}),
+                idempotency_keys=[key for _, key, _ in entries],
+                unsent_callback=unsent.add
+            )
+
+            sent_ids, rejected_ids, retry_ids, unsent_ids = [], [], [], []
+            for index, ((queue_id, _, _), result) in enumerate(zip(entries, results)):
+                if result is not None:
+                    sent_ids.append(queue_id)
+                elif index in rejected:
+                    rejected_ids.append(queue_id)
+                elif index in unsent:
+                    unsent_ids.append(queue_id)
+                else:
+                    retry_ids.append(queue_id)
+            submission_queue.mark_sent(sent_ids)
+            # Rows the backend refused would be refused again; they are reported as failed
+            submission_queue.mark_failed(rejected_ids, next(iter(rejected.values()), ""), permanent=True)
+            # Rows that were sent may have been created; only the flusher's resend, with the
+            # same idempotency key, can tell. Rows never sent after a cancel are dropped.
+            submission_queue.mark_failed(retry_ids, "Send failed during save")
+            submission_queue.discard(unsent_ids)
+            summary['queued_rows'] = len(retry_ids)
+
+            summary['row_results'] = [
+                (row, result) for (row, _), result in zip(self.payload_rows, results)
+            ]
+
+            saved_any = any(result is not None for _, result in summary['row_results'])
+            if self.upload_drawing and saved_any:
+                self._run_drawing_upload(summary)
+
+        except Exception as e:
+            logger.error("Error in save pipeline: %s", e)
+            summary['error'] = str(e)
+        finally:
+            summary['cancelled'] = self.is_cancelled()
+            self.finished_saving.emit(summary)
+
+    @perf.timed('save.report')
+    def _run_report_stages(self, summary):
+        """Render and upload the inspection report; False stops the pipeline"""
+        self.stage_changed.emit(SaveStage.REPORT_RENDER)
+        temp_pdf = os.path.join(tempfile.gettempdir(), f"report_{uuid.uuid4()}.pdf")
+        try:
+            if not self.report_job['render'](temp_pdf):
+                # Same as before: a report that fails to render doesn't hold back the rows
+                summary['report_uploaded'] = False
+                return True
+
+            if self.is_cancelled():
+                return False
+
+            self.stage_changed.emit(SaveStage.REPORT_UPLOAD)
+            summary['report_uploaded'] = api.upload_inspection_report(
+                file_path=temp_pdf, **self.report_job['upload']
+            )
+            if not summary['report_uploaded']:
+                summary['error'] = "Failed to upload inspection report"
+                return False
+            return True
+        finally:
+            try:
+                os.remove(temp_pdf)
+            except OSError:
+                pass
+
+    @perf.timed('save.drawing_upload')
+    def _run_drawing_upload(self, summary):
+        """Wait for the GUI thread to finish rendering the drawing, then upload it"""
+        while not self._drawing_ready.wait(0.1):
+            if self.is_cancelled():
+                return
+
+        if not self._drawing_file or self.is_cancelled():
+            summary['drawing_uploaded'] = False
+            return
+
+        self.stage_changed.emit(SaveStage.DRAWING_UPLOAD)
+        summary['drawing_uploaded'] = api.upload_ballooned_drawing(
+            self.upload_drawing['production_order'],
+            self.upload_drawing['ipid'],
+            self._drawing_file
+        )
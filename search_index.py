@@ -0,0 +1,179 @@
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+class SearchIndex:
+    """Case-insensitive substring search over a fixed list of entries
+
+    Every 1-, 2- and 3-character gram of each entry is indexed once when the data
+    loads. A query is answered by intersecting the postings of its grams (smallest
+    first) and confirming the substring on what is left, so the work depends on how
+    many entries share those grams, not on the total. When a query extends the
+    previous one, the previous result set is the starting point, since a longer
+    query can only match a subset of what the shorter one matched.
+    """
+    GRAM_SIZE = 3
+
+    def __init__(self, texts: Iterable[str] = ()):
+        self.build(texts)
+
+    def build(self, texts: Iterable[str]):
+        """Index entries; search results are positions in this sequence"""
+        self._texts: List[str] = [(text or "").casefold() for text in texts]
+        self._postings: Dict[str, Set[int]] = {}
+        for entry_id, text in enumerate(self._texts):
+            for gram in self._grams(text):
+                self._postings.setdefault(gram, set()).add(entry_id)
+        self._last_query = ""
+        self._last_result: Optional[Set[int]] = None
+
+    def add(self, text: str) -> int:
+        """Index one more entry and return its id"""
+        entry_id = len(self._texts)
+        text = (text or "").casefold()
+        self._texts.append(text)
+        for gram in self._grams(text):
+            self._postings.setdefault(gram, set()).add(entry_id)
+        # The cached result predates this entry
+        self._last_result = None
+        return entry_id
+
+    def matches(self, entry_id: int, query: str) -> bool:
+        """Whether one entry contains query"""
+        return (query or "").strip().casefold() in self._texts[entry_id]
+
+    def __len__(self):
+        return len(self._texts)
+
+    def search(self, query: str) -> Set[int]:
+        """Ids of all entries containing query; an empty query matches everything"""
+        query = (query or "").strip().casefold()
+        if not query:
+            result = set(range(len(self._texts)))
+        else:
+            candidates = None
+            if self._last_result is not None and self._last_query and self._last_query in query:
+                candidates = self._last_result
+
+            for gram in sorted(self._query_grams(query), key=lambda g: len(self._postings.get(g, ()))):
+                postings = self._postings.get(gram)
+                if not postings:
+                    candidates = set()
+                    break
+                candidates = set(postings) if candidates is None else candidates & postings
+                if not candidates:
+                    break
+
+            if len(query) <= self.GRAM_SIZE:
+                # Grams of up to GRAM_SIZE are indexed directly, nothing left to check
+                result = candidates
+            else:
+                result = {entry_id for entry_id in candidates if query in self._texts[entry_id]}
+
+        self._last_query = query
+        self._last_result = result
+        return result
+
+    def _grams(self, text: str) -> Set[str]:
+        grams = set()
+        for size in range(1, self.GRAM_SIZE + 1):
+            for start in range(len(text) - size + 1):
+                grams.add(text[start:start + size])
+        return grams
+
+    def _query_grams(self, query: str) -> Set[str]:
+        if len(query) <= self.GRAM_SIZE:
+            return {query}
+        return {query[start:start + self.GRAM_SIZE] for start in range(len(query) - self.GRAM_SIZE + 1)}
+
+
+class SearchController(QObject):
+    """Debounced search box driving item visibility through a SearchIndex
+
+    Keystrokes restart a short timer; when it fires the index is queried and only
+    entries whose visibility actually changed are passed to set_visible, so the
+    widgets touched per search scale with the change, not with the list size.
+    Model-based views can take the whole result set through on_results instead.
+    """
+    DEBOUNCE_MS = 150
+
+    def __init__(self, line_edit, set_visible: Optional[Callable[[int, bool], None]] = None,
+                 on_filtered: Optional[Callable[[int, int, str], None]] = None,
+                 on_results: Optional[Callable[[Set[int]], None]] = None,
+                 delay_ms: int = DEBOUNCE_MS, parent=None):
+        """
+        Args:
+            line_edit: QLineEdit to watch
+            set_visible: Optional callable(entry_id, visible) applying visibility to one entry
+            on_filtered: Optional callable(visible_count, total_count, query) after each search
+            on_results: Optional callable(matching_ids) with the full result set
+            delay_ms: Debounce delay
+        """
+        super().__init__(parent or line_edit)
+        self.line_edit = line_edit
+        self.set_visible = set_visible
+        self.on_filtered = on_filtered
+        self.on_results = on_results
+        self.index = SearchIndex()
+        self._visible: Optional[Set[int]] = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.apply)
+        line_edit.textChanged.connect(lambda _text: self._timer.start())
+
+    def set_entries(self, texts: Iterable[str]):
+        """Rebuild the index after the list has been (re)loaded and apply the current query"""
+        self.set_index(SearchIndex(texts))
+
+    def set_index(self, index: SearchIndex):
+        """Use an index built elsewhere, e.g. in the thread that loaded the list, and apply the current query"""
+        self.index = index
+        self._visible = set(range(len(self.index)))
+        if self.line_edit.text().strip():
+            self.apply()
+
+    def add_entry(self, text: str) -> int:
+        """Index one entry appended to the list and apply the current query to it alone"""
+        entry_id = self.index.add(text)
+        query = self.line_edit.text()
+        visible = self.index.matches(entry_id, query)
+        if self._visible is not None and visible:
+            self._visible = self._visible | {entry_id}
+        if self.set_visible:
+            self.set_visible(entry_id, visible)
+        if self.on_results and self._visible is not None:
+            self.on_results(self._visible)
+        if self.on_filtered:
+            visible_count = len(self._visible) if self._visible is not None else len(self.index)
+            self.on_filtered(visible_count, len(self.index), query.strip())
+        return entry_id
+
+    def invalidate(self):
+        """Visibility was changed elsewhere; the next search reapplies it to every entry"""
+        self._visible = None
+
+    def apply(self):
+        """Run the current query now"""
+        self._timer.stop()
+        query = self.line_edit.text()
+        result = self.index.search(query)
+
+        if self.set_visible:
+            if self._visible is None:
+                for entry_id in range(len(self.index)):
+                    self.set_visible(entry_id, entry_id in result)
+            else:
+                for entry_id in self._visible - result:
+                    self.set_visible(entry_id, False)
+                for entry_id in result - self._visible:
+                    self.set_visible(entry_id, True)
+        self._visible = result
+
+        if self.on_results:
+            self.on_results(result)
+
+        if self.on_filtered:
+            self.on_filtered(len(result), len(self.index), query.strip())
@@ -0,0 +1,200 @@
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from perf_metrics import perf
+
+logger = logging.getLogger(__name__)
+
+
+# Set to 1 to quit as soon as the window is painted, for timing launches from outside
+EXIT_AFTER_STARTUP_ENV = 'SMARTMETROLOGY_EXIT_AFTER_STARTUP'
+
+
+def bundle_layout() -> str:
+    """'source', or the PyInstaller layout running: 'onedir', or 'onefile' (unpacked to a temp folder)"""
+    if not getattr(sys, 'frozen', False):
+        return 'source'
+    bundle = os.path.abspath(getattr(sys, '_MEIPASS', ''))
+    exe_dir = os.path.dirname(os.path.abspath(sys.executable))
+    return 'onedir' if os.path.commonpath([bundle, exe_dir]) == exe_dir else 'onefile'
+
+
+class StartupTimer:
+    """Time spent in each startup stage, logged as one breakdown line when startup is done
+
+    Stages are measured from the previous mark, the first one from when this module was
+    imported, so importing it first puts the main module's own imports in the first stage.
+    Each stage is also recorded as a startup.<stage> span. A onefile build unpacks itself
+    before Python starts, which none of this sees; time those launches from outside.
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._last = self._started
+        self.stages = []
+        self.exit_after_report = os.environ.get(EXIT_AFTER_STARTUP_ENV, '') not in ('', '0')
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        perf.record(f"startup.{stage}", now - self._last)
+        self._last = now
+
+    def report(self):
+        total = self._last - self._started
+        logger.info("Startup took %.2f s (%s): %s", total, bundle_layout(),
+                    ", ".join(f"{stage} {seconds:.2f} s" for stage, seconds in self.stages))
+
+
+class WarmUpTask:
+    ORDERS = 'orders'
+    MODEL = 'model'
+    INVENTORY = 'inventory'
+    CALIBRATIONS = 'calibrations'
+    REPORTS = 'reports'
+    BLUETOOTH = 'bluetooth'
+
+
+def _fetch_orders():
+    from api_endpoints import api
+    orders = api.get_all_orders()
+    if orders is None:
+        raise RuntimeError("Failed to fetch orders")
+    return orders
+
+
+def _load_model():
+    from model_loader import yolo_models
+    return yolo_models.get(prime=True)
+
+
+def _fetch_inventory():
+    from api_endpoints import inventory
+    return inventory.get_instrument_items()
+
+
+def _fetch_calibrations():
+    from api_endpoints import api
+    calibrations = api.get_calibrations()
+    if calibrations is None:
+        raise RuntimeError("Failed to fetch calibrations")
+    return calibrations
+
+
+def _prepare_reports():
+    """Import the report modules and load the metrics of the fonts the report uses"""
+    importlib.import_module('reportlab.platypus')
+    importlib.import_module('reportlab.graphics.shapes')
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.pdfbase import pdfmetrics
+    for font in ('Helvetica', 'Helvetica-Bold'):
+        pdfmetrics.getFont(font)
+    return getSampleStyleSheet()
+
+
+def _import_bluetooth():
+    return importlib.import_module('bleak')
+
+
+class WarmUpCoordinator(QObject):
+    """Runs the work the first actions after login need, in parallel, and hands out the results
+
+    Right after login the user almost always picks a part number (orders), and then opens
+    a drawing (YOLO model for admins and supervisors, PyMuPDF) or a measurement
+    instrument (inventory, calibrations). start() submits all of that at once; dialogs
+    then call take() or result() to wait on the task instead of repeating the request,
+    and fall back to doing the work themselves when the task is missing, failed, or is
+    older than RESULT_MAX_AGE. Results are dropped on logout (reset()).
+    """
+    task_finished = pyqtSignal(str, bool)  # task name, succeeded
+
+    RESULT_MAX_AGE = 300.0
+    MAX_WORKERS = 6
+
+    TASKS: Dict[str, Callable[[], Any]] = {
+        WarmUpTask.ORDERS: _fetch_orders,
+        WarmUpTask.MODEL: _load_model,
+        WarmUpTask.INVENTORY: _fetch_inventory,
+        WarmUpTask.CALIBRATIONS: _fetch_calibrations,
+        WarmUpTask.REPORTS: _prepare_reports,
+        WarmUpTask.BLUETOOTH: _import_bluetooth,
+    }
+    # Only these roles run detection, so only they need the model
+    MODEL_ROLES = ('admin', 'supervisor')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._started_at = 0.0
+
+    def start(self, role: Optional[str]):
+        """Submit every warm-up task for a user that just logged in with the given role"""
+        names = [name for name in self.TASKS
+                 if name != WarmUpTask.MODEL or role in self.MODEL_ROLES]
+        executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix='WarmUp')
+        futures = {name: executor.submit(self._run, name) for name in names}
+        executor.shutdown(wait=False)
+        with self._lock:
+            self._futures = futures
+            self._started_at = time.time()
+        for name, future in futures.items():
+            future.add_done_callback(lambda done, name=name: self.task_finished.emit(name, done.exception() is None))
+
+    def _run(self, name: str):
+        with perf.span(f"warm_up.{name}"):
+            try:
+                return self.TASKS[name]()
+            except Exception as e:
+                logger.warning("Warm-up of %s failed: %s", name, e)
+                raise
+
+    def reset(self):
+        """Forget every task; tasks still running finish, but their results are not handed out"""
+        with self._lock:
+            self._futures = {}
+
+    def future(self, name: str) -> Optional[Future]:
+        """The task's future, if it was started for the current login and is still fresh"""
+        with self._lock:
+            if time.time() - self._started_at > self.RESULT_MAX_AGE:
+                return None
+            return self._futures.get(name)
+
+    def result(self, name: str, timeout: Optional[float] = None, default=None):
+        """Wait up to timeout for a task and return its result, or default if it is unavailable"""
+        future = self.future(name)
+        if future is None:
+            return default
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.debug("Warm-up of %s still running after %s s", name, timeout)
+            return default
+        except Exception:
+            return default
+
+    def take(self, name: str, timeout: Optional[float] = None, default=None):
+        """Like result(), but hands the result out once; later callers fetch fresh data themselves"""
+        value = self.result(name, timeout, default)
+        with self._lock:
+            self._futures.pop(name, None)
+        return value
+
+    def pending(self) -> list:
+        """Names of the tasks still running"""
+        with self._lock:
+            return [name for name, future in self._futures.items() if not future.done()]
+
+
+# Create singleton instance
+startup_timer = StartupTimer()
+warm_up = WarmUpCoordinator()
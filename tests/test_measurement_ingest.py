@@ -0,0 +1,72 @@
+import os
+import sys
+
+import pytest
+
+# Render off screen so the tests run on build machines without a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+
+from measurement_ingest import MeasurementIngestor, parse_limit
+from measurement_store import MeasurementStore
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def ingestor(qapp):
+    table = QtWidgets.QTableWidget(1, 12)
+    for column, text in ((2, "10"), (3, "0.1"), (4, "-0.1")):
+        table.setItem(0, column, QtWidgets.QTableWidgetItem(text))
+    quantity = {'index': 0}
+    ingestor = MeasurementIngestor(table, lambda row, is_valid: None, MeasurementStore(),
+                                   lambda: quantity['index'])
+    ingestor.quantity = quantity
+    return ingestor
+
+
+def measurement_texts(ingestor):
+    return [ingestor.table.item(0, column).text() if ingestor.table.item(0, column) else ""
+            for column in range(MeasurementIngestor.FIRST_MEASUREMENT_COLUMN,
+                                MeasurementIngestor.LAST_MEASUREMENT_COLUMN + 1)]
+
+
+def test_quantity_change_does_not_carry_readings_over(ingestor):
+    ingestor.ingest([(0, 10.01), (0, 10.02), (0, 10.03)])
+
+    ingestor.quantity['index'] = 1
+    ingestor.load_quantity(1)
+    assert measurement_texts(ingestor) == ["", "", ""]
+
+    # A full refresh, as the report runs, must not copy quantity 1's readings into quantity 2
+    ingestor.refresh_rows()
+    stats = ingestor.store.statistics()
+    assert stats['count'][0] == 3
+    assert stats['mean'][0] == pytest.approx(10.02)
+
+    ingestor.ingest([(0, 9.98)])
+    ingestor.refresh_rows()
+    stats = ingestor.store.statistics()
+    assert stats['count'][0] == 4
+    assert stats['min'][0] == pytest.approx(9.98)
+
+    ingestor.quantity['index'] = 0
+    ingestor.load_quantity(0)
+    assert measurement_texts(ingestor) == ["10.01", "10.02", "10.03"]
+    ingestor.refresh_rows()
+    assert ingestor.store.statistics()['count'][0] == 4
+
+
+def test_limits_accept_exponent_forms(ingestor):
+    ingestor.table.item(0, 3).setText("1e-1")
+    ingestor.table.item(0, 4).setText("-1E-1")
+    ingestor.ingest([(0, 10.05)])
+    assert ingestor.store.evaluate(0)[0] == MeasurementStore.IN_TOLERANCE
+    assert parse_limit("2,5e-2") == pytest.approx(0.025)
+    assert parse_limit("abc") is None
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("PyQt5.QtCore")
+pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+
+from offline_queue import OfflineSubmissionQueue, SubmissionKind
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return OfflineSubmissionQueue(str(tmp_path / "outbox.db"))
+
+
+def statuses(queue):
+    with sqlite3.connect(queue.db_path) as conn:
+        return dict(conn.execute("SELECT id, status FROM submissions"))
+
+
+def test_payload_is_stored_without_its_idempotency_key(queue):
+    payload = {'part_number': "P1", 'value': 1.0}
+    [(queue_id, key, stored)] = queue.enqueue(SubmissionKind.MASTER_BOC, [payload], "alice")
+    assert stored == payload
+    assert 'idempotency_key' not in payload
+
+    [(claimed_id, claimed_key, claimed)] = queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 10)
+    assert (claimed_id, claimed_key, claimed) == (queue_id, key, payload)
+
+
+def test_rows_move_from_pending_through_inflight_to_sent_or_dead(queue):
+    entries = queue.enqueue(SubmissionKind.MASTER_BOC, [{'row': 1}, {'row': 2}], "alice")
+    first, second = [queue_id for queue_id, _, _ in entries]
+    assert statuses(queue) == {first: queue.PENDING, second: queue.PENDING}
+
+    queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 10)
+    assert statuses(queue) == {first: queue.INFLIGHT, second: queue.INFLIGHT}
+    assert queue.pending_count("alice") == 2
+
+    queue.mark_sent([first])
+    queue.mark_failed([second], "Rejected", permanent=True)
+    assert statuses(queue) == {first: queue.SENT, second: queue.DEAD}
+    assert queue.pending_count("alice") == 0
+    assert queue.dead_count("alice") == 1
+
+
+def test_inflight_rows_are_sent_again_after_a_restart(queue):
+    [(queue_id, _, _)] = queue.enqueue(SubmissionKind.MASTER_BOC, [{'row': 1}], "alice", inflight=True)
+    assert queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 10) == []
+
+    restarted = OfflineSubmissionQueue(queue.db_path)
+    assert [row[0] for row in restarted.claim_batch(SubmissionKind.MASTER_BOC, "alice", 10)] == [queue_id]
+
+
+def test_claim_batch_is_scoped_to_operator_and_kind(queue):
+    queue.enqueue(SubmissionKind.MASTER_BOC, [{'row': 1}], "alice")
+    queue.enqueue(SubmissionKind.MASTER_BOC, [{'row': 2}], "bob")
+    queue.enqueue(SubmissionKind.STAGE_INSPECTION, [{'row': 3}], "alice")
+
+    batch = queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 10)
+    assert [payload for _, _, payload in batch] == [{'row': 1}]
+    assert queue.pending_count("bob") == 1
+    assert queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 10) == []
+
+
+def test_claim_batch_sends_rows_that_failed_less_first(queue):
+    entries = queue.enqueue(SubmissionKind.MASTER_BOC, [{'row': n} for n in range(3)], "alice")
+    retried = entries[0][0]
+    queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 1)
+    queue.mark_failed([retried], "Send failed")
+
+    batch = queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 2)
+    assert [payload for _, _, payload in batch] == [{'row': 1}, {'row': 2}]
+    assert [queue_id for queue_id, _, _ in queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 2)] == [retried]
+
+
+def test_mark_failed_gives_up_after_max_attempts(queue):
+    [(queue_id, _, _)] = queue.enqueue(SubmissionKind.MASTER_BOC, [{'row': 1}], "alice")
+    for _ in range(queue.MAX_ATTEMPTS - 1):
+        assert queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 10)
+        queue.mark_failed([queue_id], "Send failed")
+        assert statuses(queue)[queue_id] == queue.PENDING
+
+    queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 10)
+    queue.mark_failed([queue_id], "Send failed")
+    assert statuses(queue)[queue_id] == queue.DEAD
+    assert queue.claim_batch(SubmissionKind.MASTER_BOC, "alice", 10) == []
+    assert queue.dead_count("alice") == 1
+    assert queue.dead_count("bob") == 0
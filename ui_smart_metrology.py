@@ -1,8 +1,7 @@
+import logging
 import sys
-import traceback
 import threading
 import queue
-from datetime import datetime
 import weakref
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QMainWindow, QApplication, QWidget
@@ -10,6 +9,8 @@ from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QFont, QPainter, QPen, QColor
 from utils import resource_path  # Import the resource_path function
 
+logger = logging.getLogger(__name__)
+
 # Thread-local storage for exception handling state
 _exception_state = threading.local()
 _exception_refs = weakref.WeakSet()
@@ -22,22 +23,8 @@ def safe_exception_hook(exctype, value, tb):
         
     try:
         _exception_state.handling = True
-        
-        # Generate error message
-        error_msg = ''.join(traceback.format_exception(exctype, value, tb))
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_msg = f"\n[{timestamp}]\n{'-'*50}\n{error_msg}"
-        
-        # Print to stderr
-        print(f"Uncaught exception:\n{error_msg}", file=sys.stderr)
-        
-        try:
-            # Log to file with atomic write
-            with open('error.log', 'a') as f:
-                f.write(log_msg)
-        except:
-            pass
-            
+        # error.log is written by the logging listener, which also collapses repeated tracebacks
+        logger.critical("Uncaught exception", exc_info=(exctype, value, tb))
     finally:
         _exception_state.handling = False
 
@@ -790,7 +777,7 @@ class Ui_MainWindow(object):
             if result == QtWidgets.QDialog.Accepted:
                 device = dialog.selected_device
                 if device:
-                    print(f"Connected to {device.name if device.name else 'Unknown Device'} ({device.address})")
+                    logger.info("Connected to %s (%s)", device.name if device.name else 'Unknown Device', device.address)
                     # Show a success message
                     QtWidgets.QMessageBox.information(
                         self.mainwindow,
@@ -802,9 +789,9 @@ class Ui_MainWindow(object):
             QtWidgets.QMessageBox.warning(
                 self.mainwindow,
                 "Missing Dependencies",
-                "Required libraries are not installed. Please install 'bleak' and 'nest_asyncio' packages."
+                "Required libraries are not installed. Please install the 'bleak' package."
             )
-            print(f"Error: {str(e)}")
+            logger.error("Error: %s", e)
         except Exception as e:
             # Show error message for other errors
             QtWidgets.QMessageBox.warning(
@@ -812,7 +799,7 @@ class Ui_MainWindow(object):
                 "Error",
                 f"An error occurred: {str(e)}"
             )
-            print(f"Error opening Bluetooth Connectivity dialog: {str(e)}")
+            logger.error("Error opening Bluetooth Connectivity dialog: %s", e)
     
     def retranslateUi(self, MainWindow):
         """Set up all the UI text elements"""
@@ -1,6 +1,9 @@
+import logging
 import os
 import sys
 
+logger = logging.getLogger(__name__)
+
 def resource_path(relative_path):
     """Get the absolute path to a resource, works for dev and for PyInstaller"""
     try:
@@ -38,5 +41,5 @@ def resource_path(relative_path):
         return os.path.abspath(os.path.join(current_dir, relative_path))
 
     except Exception as e:
-        print(f"Error in resource_path: {str(e)}")
+        logger.error("Error in resource_path: %s", e)
         return os.path.abspath(relative_path)
\ No newline at end of file